@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+Core_Cache.py
+Content-addressed cache of run results: the key hashes the input file content, the normalized
+parameters and the IPD-IMGT/HLA data files (no GUI dependencies)
+
+@author: Ute Solloch
+'''
+
+# import modules:
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+import time
+
+# import own modules
+import Core_Params
+
+
+# folder of the cache inside the Hapl-o-Mat folder
+CACHE_DIR = 'cache'
+# version of the key computation and of the entry layout
+CACHE_VERSION = 1
+# bytes read per step when hashing files
+HASH_BLOCK = 16*1024*1024
+# parameter entries not part of the key (file names; the input is hashed by content)
+UNKEYED = Core_Params.PATH_KEYS + ['FILENAME_ANALYTICS']
+# files of the data folder written by the GUI itself, not part of the fingerprint
+DATA_SIDECARS = ('.index.json', '.idx', '.tmp')
+# name of the log file inside an entry
+LOG_NAME = 'log.dat'
+
+
+def normalized_parameters(params, inputForm):
+    """parameter entries relevant for the estimation as sorted 'KEY=value' lines;
+    numbers are normalized ('1e-6' == '0.000001')
+    """
+    lines = ['INPUT_FORMAT=' + inputForm]
+    for key in sorted(params):
+        if key in UNKEYED:
+            continue
+        value = str(params[key]).strip()
+        try:
+            value = repr(float(value))
+        except ValueError:
+            value = value.lower() if value.lower() in ('true', 'false') else value
+        lines.append(key + '=' + value)
+    return '\n'.join(lines)
+
+
+class ResultCache(object):
+    """result files of finished runs in '<cache>/<key[:2]>/<key>/', one entry per key;
+    entries are written under a temporary name and renamed when complete; used by the worker
+    threads of concurrent runs
+    """
+    def __init__(self, dirCache):
+        """constructor
+        """
+        self.dirCache = os.path.abspath(dirCache)
+        self.pathHashes = os.path.join(self.dirCache, 'hashes.json')
+        self.hashes = None
+        self.lock = threading.Lock()    # file hashes, shared by the worker threads
+
+    def load_hashes(self):
+        if self.hashes is None:
+            try:
+                with open(self.pathHashes, 'r') as fHashes:
+                    self.hashes = json.load(fHashes)
+            except (OSError, ValueError):
+                self.hashes = {}
+        return self.hashes
+
+    def save_hashes(self):
+        os.makedirs(self.dirCache, exist_ok=True)
+        pathTmp = self.pathHashes + '.' + str(os.getpid()) + '-' + str(threading.get_ident()) + '.tmp'
+        try:
+            with open(pathTmp, 'w') as fHashes:
+                with self.lock:
+                    json.dump(self.hashes, fHashes)
+            os.replace(pathTmp, self.pathHashes)
+        except OSError:
+            pass
+
+    def hash_file(self, path):
+        """sha256 of the file content; remembered by path, modification time and size
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        stamp = [st.st_mtime_ns, st.st_size]
+        with self.lock:
+            known = self.load_hashes().get(path)
+        if known is not None and known[:2] == stamp:
+            return known[2]
+        sha = hashlib.sha256()
+        with open(path, 'rb') as fIn:
+            for block in iter(lambda: fIn.read(HASH_BLOCK), b''):
+                sha.update(block)
+        digest = sha.hexdigest()
+        with self.lock:
+            self.hashes[path] = stamp + [digest]
+        self.save_hashes()
+        return digest
+
+    def data_fingerprint(self, dirData):
+        """hash over names and contents of the files of the IPD-IMGT/HLA data folder
+        """
+        sha = hashlib.sha256()
+        for root, dirs, files in os.walk(dirData):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(DATA_SIDECARS):
+                    continue
+                path = os.path.join(root, name)
+                sha.update(os.path.relpath(path, dirData).replace(os.sep, '/').encode('UTF-8') + b'\0')
+                sha.update(self.hash_file(path).encode('ascii') + b'\n')
+        return sha.hexdigest()
+
+    def key(self, run):
+        """cache key of a run (Core_Run.HaplomatRun): input content, normalized parameters, data files
+        """
+        sha = hashlib.sha256()
+        sha.update(('version=' + str(CACHE_VERSION) + '\n').encode('UTF-8'))
+        sha.update(('input=' + self.hash_file(run.result_path('FILENAME_INPUT')) + '\n').encode('UTF-8'))
+        sha.update(('data=' + self.data_fingerprint(os.path.join(run.dirHap, 'data')) + '\n').encode('UTF-8'))
+        sha.update(normalized_parameters(run.params, run.inputForm).encode('UTF-8'))
+        return sha.hexdigest()
+
+    def entry_dir(self, key):
+        return os.path.join(self.dirCache, key[:2], key)
+
+    def lookup(self, key):
+        """description of the cache entry, None if there is none
+        """
+        try:
+            with open(os.path.join(self.entry_dir(key), 'meta.json'), 'r') as fMeta:
+                return json.load(fMeta)
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key, run):
+        """saves the result files and the log of a finished run
+        """
+        if self.lookup(key) is not None:
+            return
+        dirParent = os.path.dirname(self.entry_dir(key))
+        os.makedirs(dirParent, exist_ok=True)
+        dirTmp = tempfile.mkdtemp(prefix='.tmp-', dir=dirParent)
+        try:
+            files = {}
+            for fileKey in Core_Params.OUTPUT_KEYS:
+                source = run.result_path(fileKey)
+                if os.path.isfile(source):
+                    shutil.copyfile(source, os.path.join(dirTmp, fileKey))
+                    files[fileKey] = os.path.basename(source)
+            shutil.copyfile(run.pathLog, os.path.join(dirTmp, LOG_NAME))
+            meta = {'key': key, 'version': CACHE_VERSION, 'runID': run.runID, 'created': time.time(),
+                    'duration': run.endTime - run.startTime, 'files': files,
+                    'parameters': normalized_parameters(run.params, run.inputForm).split('\n')}
+            with open(os.path.join(dirTmp, 'meta.json'), 'w') as fMeta:
+                json.dump(meta, fMeta, indent=2)
+            os.rename(dirTmp, self.entry_dir(key))
+        except OSError:     # e.g. entry stored concurrently by another run
+            shutil.rmtree(dirTmp, ignore_errors=True)
+
+    def restore(self, key, run):
+        """copies the cached result files to the result file names of run; returns the cached log text
+        """
+        meta = self.lookup(key)
+        if meta is None:
+            return None
+        dirEntry = self.entry_dir(key)
+        for fileKey in meta['files']:
+            target = run.result_path(fileKey)
+            pathTmp = target + '.tmp'
+            shutil.copyfile(os.path.join(dirEntry, fileKey), pathTmp)
+            os.replace(pathTmp, target)
+        with open(os.path.join(dirEntry, LOG_NAME), 'r', encoding='UTF-8', errors='replace') as fLog:
+            return fLog.read()
+
+    def remove(self, key):
+        shutil.rmtree(self.entry_dir(key), ignore_errors=True)
+
+
+def default_cache(dirHap):
+    """result cache of a Hapl-o-Mat folder
+    """
+    return ResultCache(os.path.join(dirHap, CACHE_DIR))
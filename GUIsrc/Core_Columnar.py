@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+Core_Columnar.py
+Binary columnar sidecars of result files ('<file>.cols'): NumPy arrays memory-mapped on load,
+haplotype names dictionary-encoded per locus (no GUI dependencies)
+
+@author: Ute Solloch
+'''
+
+# import modules:
+import os
+import json
+import shutil
+import threading
+import numpy as np
+
+
+# version of the sidecar layout
+COLUMNS_VERSION = 1
+# rows encoded per step
+ENCODE_ROWS = 1000000
+# separator of the alleles in a haplotype name
+LOCUS_SEPARATOR = '~'
+
+# sidecar writers running in the background
+_pending = []
+_pendingLock = threading.Lock()
+
+
+def sidecar_path(path):
+    return path + '.cols'
+
+def source_stamp(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+def write_columns(path, kind, columns, stamp, meta=None):
+    """saves columns (name -> array) as sidecar of the file path; written under a temporary name
+    and renamed when complete. stamp: source_stamp of the file when the columns were read from it;
+    returns False (nothing saved) if the file has changed since
+    """
+    stamp = list(stamp)
+    target = sidecar_path(path)
+    dirTmp = target + '.tmp-' + str(os.getpid()) + '-' + str(threading.get_ident())
+    os.makedirs(dirTmp)
+    try:
+        for name, arr in columns.items():
+            np.save(os.path.join(dirTmp, name + '.npy'), arr)
+        info = {'version': COLUMNS_VERSION, 'kind': kind, 'stamp': stamp, 'columns': sorted(columns)}
+        info.update(meta or {})
+        with open(os.path.join(dirTmp, 'meta.json'), 'w') as fMeta:
+            json.dump(info, fMeta)
+        if source_stamp(path) != stamp:     # rewritten while the columns were parsed or saved
+            shutil.rmtree(dirTmp, ignore_errors=True)
+            return False
+        if os.path.isdir(target):
+            dirOld = dirTmp + '.old'
+            os.rename(target, dirOld)
+            shutil.rmtree(dirOld, ignore_errors=True)
+        os.rename(dirTmp, target)
+    except BaseException:
+        shutil.rmtree(dirTmp, ignore_errors=True)
+        raise
+    return True
+
+def load_columns(path, kind):
+    """(meta, columns) of a valid sidecar of path, arrays memory-mapped; None if missing or outdated
+    """
+    target = sidecar_path(path)
+    try:
+        with open(os.path.join(target, 'meta.json'), 'r') as fMeta:
+            meta = json.load(fMeta)
+        if (meta.get('version') != COLUMNS_VERSION or meta.get('kind') != kind
+                or meta.get('stamp') != source_stamp(path)):
+            return None
+        columns = dict((name, np.load(os.path.join(target, name + '.npy'), mmap_mode='r'))
+                       for name in meta['columns'])
+    except (OSError, ValueError, KeyError):
+        return None
+    return meta, columns
+
+
+class EncodedNames(object):
+    """haplotype names stored as one code array per locus and the alleles of each locus;
+    names are assembled only for the requested rows
+    """
+    def __init__(self, alleles, codes):
+        """constructor
+        """
+        self.alleles = alleles
+        self.codes = codes
+
+    def __len__(self):
+        return len(self.codes[0]) if self.codes else 0
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            cols = [alleles[codes[key]] for alleles, codes in zip(self.alleles, self.codes)]
+            return np.array([LOCUS_SEPARATOR.join(row) for row in zip(*cols)], dtype=object)
+        return LOCUS_SEPARATOR.join(str(alleles[codes[key]]) for alleles, codes in zip(self.alleles, self.codes))
+
+
+def encode_names(names, n):
+    """per locus code arrays and allele dictionaries of the first n names; None if the names
+    do not all have the same number of loci
+    """
+    dicts = None
+    codes = None
+    for start in range(0, n, ENCODE_ROWS):
+        stop = min(start + ENCODE_ROWS, n)
+        for i, name in enumerate(names[start:stop], start):
+            alleles = str(name).split(LOCUS_SEPARATOR)
+            if dicts is None:
+                dicts = [{} for allele in alleles]
+                codes = [np.empty(n, dtype=np.uint32) for allele in alleles]
+            elif len(alleles) != len(dicts):
+                return None
+            for locus, allele in enumerate(alleles):
+                codes[locus][i] = dicts[locus].setdefault(allele, len(dicts[locus]))
+    if dicts is None:
+        return [], []
+    alleleArrs = [np.array(list(d), dtype=str) for d in dicts]
+    codeArrs = [c.astype(np.uint16) if len(d) <= 65536 else c for c, d in zip(codes, dicts)]
+    return alleleArrs, codeArrs
+
+def name_order(names, n):
+    """permutation sorting the first n haplotype names allele by allele; vectorized on the code
+    arrays of EncodedNames, other names are encoded first
+    """
+    if isinstance(names, EncodedNames):
+        alleleArrs, codeArrs = names.alleles, [codes[:n] for codes in names.codes]
+    else:
+        encoded = encode_names(names, n)
+        if encoded is None:     # names with different numbers of loci: compared as a whole
+            return np.argsort(np.array([str(name) for name in names[:n]]), kind='stable')
+        alleleArrs, codeArrs = encoded
+    keys = []
+    for alleles, codes in zip(alleleArrs, codeArrs):
+        ranks = np.empty(len(alleles), dtype=codes.dtype)
+        ranks[np.argsort(alleles, kind='stable')] = np.arange(len(alleles))
+        keys.append(ranks[codes])
+    if not keys:
+        return np.arange(n)
+    return np.lexsort(keys[::-1])
+
+def write_htf_sidecar(path, names, freqs, cum, stamp):
+    """writes the columnar sidecar of a haplotype frequency file parsed at stamp
+    """
+    encoded = encode_names(names, len(freqs))
+    if encoded is None:
+        return False
+    alleleArrs, codeArrs = encoded
+    columns = {'freqs': np.asarray(freqs, dtype=np.float64), 'cum': np.asarray(cum, dtype=np.float64)}
+    for locus, (alleles, codes) in enumerate(zip(alleleArrs, codeArrs)):
+        columns['alleles' + str(locus)] = alleles
+        columns['codes' + str(locus)] = codes
+    return write_columns(path, 'htf', columns, stamp, {'rows': len(freqs), 'loci': len(alleleArrs)})
+
+def load_htf_sidecar(path):
+    """(names, freqs, cum) from a valid sidecar, None otherwise
+    """
+    loaded = load_columns(path, 'htf')
+    if loaded is None:
+        return None
+    meta, columns = loaded
+    nLoci = meta['loci']
+    names = EncodedNames([columns['alleles' + str(i)] for i in range(nLoci)],
+                         [columns['codes' + str(i)] for i in range(nLoci)])
+    if nLoci == 0:
+        names = np.array([], dtype=object)
+    return names, columns['freqs'], columns['cum']
+
+def write_epsilon_sidecar(path, epsilon, logL, stamp):
+    return write_columns(path, 'epsilon', {'epsilon': np.asarray(epsilon, dtype=np.float64),
+                                           'logL': np.asarray(logL, dtype=np.float64)}, stamp)
+
+def load_epsilon_sidecar(path):
+    """(epsilon, logL) from a valid sidecar, None otherwise
+    """
+    loaded = load_columns(path, 'epsilon')
+    if loaded is None:
+        return None
+    return loaded[1]['epsilon'], loaded[1]['logL']
+
+def write_in_background(function, *args):
+    """runs a sidecar writer in a daemon thread; errors only cost the sidecar
+    """
+    def write():
+        try:
+            function(*args)
+        except (OSError, ValueError):
+            pass
+    thread = threading.Thread(target=write, daemon=True)
+    with _pendingLock:
+        _pending[:] = [t for t in _pending if t.is_alive()]
+        _pending.append(thread)
+    thread.start()
+    return thread
+
+def wait_pending():
+    """waits for all sidecar writers (e.g. before a command line program exits)
+    """
+    with _pendingLock:
+        threads = list(_pending)
+    for thread in threads:
+        thread.join()
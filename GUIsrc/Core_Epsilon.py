@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+Core_Epsilon.py
+Incremental reading of the epsilon/logL file of a Hapl-o-Mat run (no GUI dependencies)
+
+@author: Ute Solloch
+'''
+
+# import modules:
+import os
+import threading
+import numpy as np
+import Core_Columnar
+
+
+class EpsilonTail(object):
+    """follows an epsilon/logL file: remembers the byte offset of the last read
+    and appends only new lines to preallocated, growing arrays; reads may come from several threads
+    (run worker, scheduler, GUI), they are serialized by a lock
+    """
+    def __init__(self, path, capacity=1024):
+        """constructor
+        """
+        self.path = path
+        self.capacity = capacity
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """forgets everything read so far
+        """
+        with self.lock:
+            self.clear()
+
+    def clear(self):
+        self.stamp = None       # (mtime, size) of the file when it was last read
+        self.offset = 0
+        self.partial = b''
+        self.n = 0
+        self.epsArr = np.empty(self.capacity, dtype=np.float64)
+        self.logLArr = np.empty(self.capacity, dtype=np.float64)
+
+    def grow(self, nNew):
+        """doubles the arrays until nNew further values fit
+        """
+        size = len(self.epsArr)
+        while self.n + nNew > size:
+            size *= 2
+        if size != len(self.epsArr):
+            epsArr = np.empty(size, dtype=np.float64)
+            logLArr = np.empty(size, dtype=np.float64)
+            epsArr[:self.n] = self.epsArr[:self.n]
+            logLArr[:self.n] = self.logLArr[:self.n]
+            self.epsArr = epsArr
+            self.logLArr = logLArr
+
+    def poll(self, final=False):
+        """reads lines appended since the last call, returns the number of new values;
+        final: the file is complete, a last line without line break is read as well
+        """
+        with self.lock:
+            return self.read_new(final)
+
+    def read_new(self, final):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return 0
+        size = st.st_size
+        if size < self.offset:      # file was recreated by a new run
+            self.clear()
+        data = b''
+        if size > self.offset:
+            with open(self.path, 'rb') as fEps:
+                fEps.seek(self.offset)
+                data = fEps.read(size - self.offset)
+            self.offset += len(data)
+        if self.offset == size:     # the file is appended only: same size, same content
+            self.stamp = (st.st_mtime_ns, size)
+        if not data and not (final and self.partial):
+            return 0
+        lines = (self.partial + data).split(b'\n')
+        self.partial = lines.pop()     # incomplete last line, completed by the next read
+        if final:
+            lines.append(self.partial)
+            self.partial = b''
+        values = []
+        for line in lines:
+            sp = line.strip().split(b'\t')
+            if sp[0] == b'':
+                continue
+            eps = float(sp[0])
+            logL = float(sp[1]) if len(sp) > 1 else np.nan
+            values.append((eps, logL))
+        nNew = len(values)
+        if nNew > 0:
+            self.grow(nNew)
+            arr = np.array(values, dtype=np.float64)
+            self.epsArr[self.n:self.n+nNew] = arr[:, 0]
+            self.logLArr[self.n:self.n+nNew] = arr[:, 1]
+            self.n += nNew
+        return nNew
+
+    def load_sidecar(self):
+        """takes all values from a valid columnar sidecar instead of parsing the file
+        """
+        try:
+            st = os.stat(self.path)
+            columns = Core_Columnar.load_epsilon_sidecar(self.path)
+        except OSError:
+            return False
+        if columns is None:
+            return False
+        with self.lock:
+            self.clear()
+            self.grow(len(columns[0]))
+            self.n = len(columns[0])
+            self.epsArr[:self.n] = columns[0]
+            self.logLArr[:self.n] = columns[1]
+            self.offset = st.st_size
+            self.stamp = (st.st_mtime_ns, st.st_size)
+        return True
+
+    def save_sidecar(self):
+        """writes the values read so far as columnar sidecar of the file
+        """
+        with self.lock:
+            epsilon, logL, stamp, offset = self.epsilon, self.logL, self.stamp, self.offset
+        if stamp is None or stamp[1] != offset:     # file not read completely
+            return
+        try:
+            Core_Columnar.write_epsilon_sidecar(self.path, epsilon, logL, stamp)
+        except (OSError, ValueError):
+            pass
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def epsilon(self):
+        return self.epsArr[:self.n]
+
+    @property
+    def logL(self):
+        return self.logLArr[:self.n]
+
+    def iterations(self):
+        """iteration numbers 1..n of the values read so far
+        """
+        return np.arange(1, self.n+1)
+
+
+def read_epsilon(path):
+    """reads a complete epsilon/logL file, from its columnar sidecar if that is up to date
+    """
+    tail = EpsilonTail(path)
+    if not tail.load_sidecar():
+        tail.poll(final=True)
+    return tail
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+Core_History.py
+Run history: parameters, statistics, timings and file names of all runs in an SQLite catalogue
+(no GUI dependencies)
+
+@author: Ute Solloch
+'''
+
+# import modules:
+import os
+import json
+import sqlite3
+
+# import own modules
+import Core_Cache
+
+
+# catalogue file inside the Hapl-o-Mat folder
+HISTORY_FILE = 'history.sqlite'
+# version of the table layout (PRAGMA user_version)
+SCHEMA_VERSION = 2
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    runID TEXT NOT NULL,
+    state TEXT NOT NULL,
+    killReason TEXT,
+    inputFile TEXT,
+    inputHash TEXT,
+    inputFormat TEXT,
+    resolution TEXT,
+    startTime REAL,
+    endTime REAL,
+    duration REAL,
+    iterations INTEGER,
+    epsilon REAL,
+    logL REAL,
+    haplotypes INTEGER,
+    genotypes INTEGER,
+    epsilon2n REAL,
+    haplotypesAboveEpsilon2n INTEGER,
+    sumCut TEXT,
+    coverage TEXT,
+    cached INTEGER NOT NULL DEFAULT 0,
+    cacheKey TEXT,
+    parameters TEXT NOT NULL,
+    files TEXT NOT NULL,
+    log TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_runID ON runs (runID);
+CREATE INDEX IF NOT EXISTS runs_inputHash ON runs (inputHash);
+CREATE INDEX IF NOT EXISTS runs_startTime ON runs (startTime);
+CREATE INDEX IF NOT EXISTS runs_resolution ON runs (resolution);
+"""
+# columns shown when browsing the history
+LIST_COLUMNS = ['id', 'runID', 'state', 'startTime', 'duration', 'resolution', 'inputFile', 'inputHash',
+                'iterations', 'logL', 'haplotypes', 'genotypes', 'sumCut', 'cached', 'killReason']
+
+
+class RunHistory(object):
+    """SQLite catalogue of runs, indexed by RunID, input hash, start time and resolution
+    """
+    def __init__(self, path):
+        """constructor
+        """
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.row_factory = sqlite3.Row
+        with self.db:
+            self.db.executescript(SCHEMA)
+            if self.db.execute('PRAGMA user_version').fetchone()[0] < 2:
+                columns = [row['name'] for row in self.db.execute('PRAGMA table_info(runs)')]
+                if 'killReason' not in columns:     # catalogues of version 1
+                    self.db.execute('ALTER TABLE runs ADD COLUMN killReason TEXT')
+            self.db.execute('PRAGMA user_version = ' + str(SCHEMA_VERSION))
+
+    def close(self):
+        self.db.close()
+
+    def record(self, run, inputHash=None):
+        """adds a finished, cancelled or failed run (Core_Run.HaplomatRun); returns the row id
+        """
+        summary = run.summary()
+        stats = summary['statistics'] or {}
+        coverage = stats.get('coverage')
+        values = {
+            'runID': run.runID, 'state': summary['state'], 'killReason': run.killReason, 'inputFile': summary['files']['FILENAME_INPUT'],
+            'inputHash': inputHash, 'inputFormat': run.inputForm,
+            'resolution': run.params.get('LOCI_AND_RESOLUTIONS'),
+            'startTime': summary['start'], 'endTime': summary['end'], 'duration': summary['duration'],
+            'iterations': summary['iterations'], 'epsilon': summary['epsilon'], 'logL': summary['logL'],
+            'haplotypes': stats.get('haplotypes'), 'genotypes': stats.get('genotypes'),
+            'epsilon2n': stats.get('epsilon2n'), 'haplotypesAboveEpsilon2n': stats.get('haplotypesAboveEpsilon2n'),
+            'sumCut': stats.get('sumCut'),
+            'coverage': json.dumps(dict((str(k), v) for k, v in coverage.items())) if coverage else None,
+            'cached': 1 if summary.get('cached') else 0, 'cacheKey': summary.get('cacheKey'),
+            'parameters': json.dumps(run.params), 'files': json.dumps(summary['files']), 'log': run.pathLog
+        }
+        keys = sorted(values)
+        with self.db:
+            cursor = self.db.execute('INSERT INTO runs (' + ', '.join(keys) + ') VALUES (' + ', '.join('?' for k in keys) + ')',
+                                     [values[k] for k in keys])
+        return cursor.lastrowid
+
+    def query(self, runID=None, inputHash=None, resolution=None, since=None, until=None, state=None, limit=1000):
+        """runs matching all given filters, newest first; runID and resolution may contain '*' wildcards,
+        inputHash may be a prefix, since/until are epoch seconds
+        """
+        where = []
+        args = []
+        if runID:
+            where.append('runID GLOB ?')
+            args.append(runID)
+        if inputHash:
+            where.append('inputHash GLOB ?')
+            args.append(inputHash + '*')
+        if resolution:
+            where.append('resolution GLOB ?')
+            args.append(resolution)
+        if since is not None:
+            where.append('startTime >= ?')
+            args.append(since)
+        if until is not None:
+            where.append('startTime < ?')
+            args.append(until)
+        if state:
+            where.append('state = ?')
+            args.append(state)
+        sql = 'SELECT ' + ', '.join(LIST_COLUMNS) + ' FROM runs'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY startTime DESC, id DESC LIMIT ?'
+        args.append(int(limit))
+        return [dict(row) for row in self.db.execute(sql, args)]
+
+    def get(self, rowId):
+        """complete entry of a run (parameters, files and coverage decoded), None if unknown
+        """
+        row = self.db.execute('SELECT * FROM runs WHERE id = ?', (rowId,)).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        for key in ('parameters', 'files', 'coverage'):
+            if entry[key] is not None:
+                entry[key] = json.loads(entry[key])
+        return entry
+
+    def delete(self, rowId):
+        with self.db:
+            self.db.execute('DELETE FROM runs WHERE id = ?', (rowId,))
+
+    def __len__(self):
+        return self.db.execute('SELECT COUNT(*) FROM runs').fetchone()[0]
+
+
+def history_path(dirHap):
+    return os.path.join(dirHap, HISTORY_FILE)
+
+def record_run(run):
+    """adds a run to the history of its Hapl-o-Mat folder; the input hash is taken from the result cache
+    """
+    cache = run.cache if run.cache is not None else Core_Cache.default_cache(run.dirHap)
+    try:
+        inputHash = cache.hash_file(run.result_path('FILENAME_INPUT'))
+    except OSError:
+        inputHash = None
+    history = RunHistory(history_path(run.dirHap))
+    try:
+        return history.record(run, inputHash)
+    finally:
+        history.close()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+Core_Input.py
+Profiling of genotype input files: format, loci and number of donors; compressed input files
+(gzip, bzip2, xz) are read through the decompressor (no GUI dependencies)
+
+@author: Ute Solloch
+'''
+
+# import modules:
+import os
+import bz2
+import gzip
+import lzma
+import time
+import errno
+import threading
+import zlib
+
+
+# bytes read per block when counting records
+BLOCK_SIZE = 16*1024*1024
+# number of leading lines inspected to identify the input format
+FORMAT_LINES = 10
+# compressed formats: leading bytes -> file name suffix
+COMPRESSIONS = [(b'\x1f\x8b', '.gz'), (b'BZh', '.bz2'), (b'\xfd7zXZ\x00', '.xz')]
+OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+# assumed ratio of uncompressed to compressed size where the file does not store it
+COMPRESSION_RATIO = 5
+# errors raised while reading an input file; damaged compressed files raise more than OSError
+READ_ERRORS = (OSError, EOFError, zlib.error, lzma.LZMAError)
+
+
+class InputProfile(object):
+    """result of profiling a genotype input file
+    """
+    def __init__(self, path, inputForm, loci, n, size, compression=None):
+        """constructor
+        """
+        self.path = path
+        self.inputForm = inputForm      # 'MAC' or 'GLSC'
+        self.loci = loci                # sorted list of loci of the first line
+        self.n = n                      # number of records (lines after the first line)
+        self.size = size                # file size in bytes
+        self.compression = compression  # '.gz', '.bz2', '.xz' or None
+
+
+# cache of input profiles: absolute path -> ((size, mtime), InputProfile)
+_cacheProfiles = {}
+
+def profile_input(path, progress=None):
+    """identifies format and loci from the first lines and counts records with block reads;
+    results are cached by path, size and modification time;
+    progress: optional callable (bytes read, total bytes) called per block
+    """
+    st = os.stat(path)
+    stamp = (st.st_size, st.st_mtime_ns)
+    key = os.path.abspath(path)
+    cached = _cacheProfiles.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    nLines = 0
+    lastByte = b'\n'
+    head = b''
+    total = uncompressed_size(path) if progress is not None else 0
+    nRead = 0
+    with open_input(path) as f:
+        while True:
+            block = f.read(BLOCK_SIZE)
+            if not block:
+                break
+            nRead += len(block)
+            if progress is not None:
+                progress(nRead, total)
+            if nLines < FORMAT_LINES:
+                head += block[:1024*1024]
+            nLines += block.count(b'\n')
+            lastByte = block[-1:]
+    if lastByte != b'\n':      # last line without line break
+        nLines += 1
+
+    headLines = head.decode('UTF-8', 'replace').splitlines()
+    firstLines = headLines[:FORMAT_LINES]
+    # identification of input format
+    if any('*' in line for line in firstLines):
+        inputForm = 'GLSC'
+    else:
+        inputForm = 'MAC'
+    dictLoci = {}
+    if firstLines:
+        listLine1 = firstLines[0].split('\t')
+        for k in range(1, len(listLine1)):
+            if inputForm == 'MAC':
+                dictLoci[listLine1[k]] = 1
+            else:
+                dictLoci[listLine1[k].split('*',1)[0]] = 1
+    loci = sorted(dictLoci)
+
+    profile = InputProfile(path, inputForm, loci, max(0, nLines-1), st.st_size, compression(path))
+    _cacheProfiles[key] = (stamp, profile)
+    return profile
+
+def compression(path):
+    """suffix of the compression format of a file identified by its leading bytes, None if uncompressed
+    """
+    with open(path, 'rb') as f:
+        magic = f.read(6)
+    for start, suffix in COMPRESSIONS:
+        if magic.startswith(start):
+            return suffix
+    return None
+
+def open_input(path):
+    """binary file object of an input file, decompressing while reading
+    """
+    suffix = compression(path)
+    if suffix is None:
+        return open(path, 'rb')
+    return OPENERS[suffix](path, 'rb')
+
+def uncompressed_name(path):
+    """file name of an input file without its compression suffix
+    """
+    name = os.path.basename(path)
+    suffix = compression(path)
+    if suffix is not None and name.lower().endswith(suffix):
+        name = name[:-len(suffix)]
+    return name
+
+def uncompressed_size(path):
+    """size of an input file after decompression in bytes: stored size of gzip files
+    (modulo 4 GiB, so never less than the file), estimated for other formats
+    """
+    size = os.path.getsize(path)
+    suffix = compression(path)
+    if suffix is None:
+        return size
+    if suffix == '.gz' and size >= 4:
+        with open(path, 'rb') as f:
+            f.seek(-4, os.SEEK_END)
+            stored = int.from_bytes(f.read(4), 'little')
+        if stored >= size:
+            return stored
+    return size*COMPRESSION_RATIO
+
+def decompress_to(path, target):
+    """writes the decompressed content of an input file to target, blockwise
+    """
+    with open_input(path) as fIn, open(target, 'wb') as fOut:
+        while True:
+            block = fIn.read(BLOCK_SIZE)
+            if not block:
+                break
+            fOut.write(block)
+
+
+class InputFeeder(object):
+    """streams the decompressed content of an input file into a named pipe read by Hapl-o-Mat;
+    a worker thread waits for the reader, writes blockwise and ends with the reader or on stop()
+    """
+    def __init__(self, path, pathFifo):
+        """constructor
+        """
+        self.path = path
+        self.pathFifo = pathFifo
+        self.stopped = threading.Event()
+        self.error = None
+        self.worker = threading.Thread(target=self.feed, daemon=True)
+        self.worker.start()
+
+    def open_fifo(self):
+        """write end of the pipe once a reader has opened it, None if stopped before
+        """
+        while not self.stopped.is_set():
+            try:
+                fd = os.open(self.pathFifo, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError as e:
+                if e.errno != errno.ENXIO:      # ENXIO: no reader yet
+                    raise
+                time.sleep(0.05)
+                continue
+            os.set_blocking(fd, True)
+            return os.fdopen(fd, 'wb')
+        return None
+
+    def feed(self):
+        try:
+            fOut = self.open_fifo()
+            if fOut is None:
+                return
+            with open_input(self.path) as fIn, fOut:
+                while not self.stopped.is_set():
+                    block = fIn.read(BLOCK_SIZE)
+                    if not block:
+                        break
+                    fOut.write(block)
+        except BrokenPipeError:     # reader closed the pipe early
+            pass
+        except READ_ERRORS as e:
+            self.error = str(e)
+
+    def stop(self, timeout=None):
+        """stops feeding and waits for the worker thread
+        """
+        self.stopped.set()
+        self.worker.join(timeout)
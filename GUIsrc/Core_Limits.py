@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+Core_Limits.py
+Resource limits of Hapl-o-Mat runs: RSS and address-space cap, wall-clock limit, CPU affinity
+and nice level; checked by the watchdog of Core_Run.HaplomatRun (no GUI dependencies)
+
+@author: Ute Solloch
+'''
+
+# import modules:
+import os
+import json
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+
+# share of the physical memory a single run may use by default
+DEFAULT_MEMORY_SHARE = 0.9
+# seconds between terminate (SIGTERM) and kill of a run crossing a limit
+KILL_GRACE = 10.0
+# settings file of the GUI (next to 'pathHaplomat')
+LIMITS_FILE = 'runLimits'
+
+
+def physical_memory():
+    """total physical memory in bytes, None if unknown
+    """
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def parse_cpus(text):
+    """CPU list like '0-3,6' as sorted list of CPU numbers, None for an empty text
+    """
+    text = text.strip()
+    if text == '':
+        return None
+    cpus = set()
+    for part in text.split(','):
+        bounds = part.strip().split('-')
+        try:
+            if len(bounds) == 1:
+                cpus.add(int(bounds[0]))
+            elif len(bounds) == 2 and int(bounds[0]) <= int(bounds[1]):
+                cpus.update(range(int(bounds[0]), int(bounds[1])+1))
+            else:
+                raise ValueError
+        except ValueError:
+            raise ValueError('Invalid CPU list: ' + text)
+    return sorted(cpus)
+
+def format_cpus(cpus):
+    return ','.join(str(c) for c in cpus) if cpus else ''
+
+
+class RunLimits(object):
+    """limits of one run; None means unlimited
+    memory: RSS in bytes (watchdog), addressSpace: bytes (RLIMIT_AS), wallTime: seconds (watchdog),
+    cpus: list of CPU numbers (affinity), nice: nice increment
+    """
+    def __init__(self, memory=None, addressSpace=None, wallTime=None, cpus=None, nice=None):
+        """constructor
+        """
+        self.memory = memory
+        self.addressSpace = addressSpace
+        self.wallTime = wallTime
+        self.cpus = cpus
+        self.nice = nice
+
+    def to_dict(self):
+        return {'memory': self.memory, 'addressSpace': self.addressSpace, 'wallTime': self.wallTime,
+                'cpus': self.cpus, 'nice': self.nice}
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(values.get('memory'), values.get('addressSpace'), values.get('wallTime'),
+                   values.get('cpus'), values.get('nice'))
+
+    def apply(self, pid):
+        """applies address-space cap, affinity and nice level to a started process;
+        returns the list of limits that could not be applied on this system
+        """
+        failed = []
+        if self.addressSpace:
+            try:
+                resource.prlimit(pid, resource.RLIMIT_AS, (self.addressSpace, self.addressSpace))
+            except (AttributeError, OSError, ValueError):
+                failed.append('address space')
+        if self.cpus:
+            try:
+                os.sched_setaffinity(pid, self.cpus)
+            except (AttributeError, OSError, ValueError):
+                failed.append('CPU affinity')
+        if self.nice:
+            try:
+                os.setpriority(os.PRIO_PROCESS, pid, os.getpriority(os.PRIO_PROCESS, pid) + self.nice)
+            except (AttributeError, OSError):
+                failed.append('nice level')
+        return failed
+
+    def exceeded(self, rss, elapsed):
+        """reason if a run with the given RSS (bytes, None if unknown) and run time (seconds)
+        crosses a watchdog limit, None otherwise
+        """
+        if self.memory and rss is not None and rss > self.memory:
+            return 'memory budget exceeded'
+        if self.wallTime and elapsed > self.wallTime:
+            return 'wall-clock limit exceeded'
+        return None
+
+    def is_watched(self):
+        return bool(self.memory or self.wallTime)
+
+
+def default_limits():
+    """limits used if none are set: a single run may not take the whole memory of the machine
+    """
+    memory = physical_memory()
+    return RunLimits(memory=int(DEFAULT_MEMORY_SHARE*memory) if memory else None)
+
+def load_limits(path):
+    """limits saved by save_limits, default_limits() if there are none
+    """
+    try:
+        with open(path, 'r') as fLimits:
+            return RunLimits.from_dict(json.load(fLimits))
+    except (OSError, ValueError, AttributeError):
+        return default_limits()
+
+def save_limits(path, limits):
+    with open(path, 'w') as fLimits:
+        json.dump(limits.to_dict(), fLimits, indent=2)
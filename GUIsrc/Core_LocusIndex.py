@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+Core_LocusIndex.py
+Sidecar index of the loci in data/AllAllelesExpanded.txt (no GUI dependencies)
+
+@author: Ute Solloch
+'''
+
+# import modules:
+import os
+import json
+
+
+# version of the sidecar layout
+INDEX_VERSION = 2
+# lines read between two progress reports
+PROGRESS_LINES = 100000
+
+
+class LocusIndex(object):
+    """loci and number of alleles per locus
+    """
+    def __init__(self, counts):
+        """constructor; counts: dict locus -> number of alleles
+        """
+        self.counts = counts
+        self.loci = sorted(counts)
+
+
+def index_path(pathData):
+    return pathData + '.index.json'
+
+def data_stamp(pathData):
+    st = os.stat(pathData)
+    return [st.st_mtime_ns, st.st_size]
+
+def load_index(pathData):
+    """reads the sidecar index; None if it is missing or does not match the data file
+    """
+    try:
+        with open(index_path(pathData), 'r') as fi:
+            content = json.load(fi)
+        if content['version'] != INDEX_VERSION or content['stamp'] != data_stamp(pathData):
+            return None
+        return LocusIndex(content['counts'])
+    except (OSError, ValueError, KeyError):
+        return None
+
+def build_index(pathData, progress=None):
+    """scans the data file once and saves the sidecar index;
+    progress: optional callable (characters read, file size) called every PROGRESS_LINES lines
+    """
+    stamp = data_stamp(pathData)
+    size = os.path.getsize(pathData)
+    counts = {}
+    nRead = 0
+    with open(pathData, 'r') as f:
+        for i, line in enumerate(f):
+            nRead += len(line)
+            if progress is not None and i % PROGRESS_LINES == 0:
+                progress(nRead, size)
+            line = line.rstrip('\r\n')
+            if line == '':
+                continue
+            loc = line.split('*')[0]
+            counts[loc] = counts.get(loc, 0) + 1
+    index = LocusIndex(counts)
+    content = {'version': INDEX_VERSION, 'stamp': stamp, 'loci': index.loci, 'counts': index.counts}
+    pathTmp = index_path(pathData) + '.tmp'
+    try:
+        with open(pathTmp, 'w') as fo:
+            json.dump(content, fo)
+        os.replace(pathTmp, index_path(pathData))
+    except OSError:     # e.g. read-only data folder: index is rebuilt next time
+        pass
+    return index
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+Core_Params.py
+Reading and writing of Hapl-o-Mat parameter files (no GUI dependencies)
+
+@author: Ute Solloch
+'''
+
+# import modules:
+import os
+
+
+# layout of parameter files as written by the GUI
+PARAMETER_SECTIONS = [
+    ('#file name', ['FILENAME_INPUT', 'FILENAME_HAPLOTYPES', 'FILENAME_GENOTYPES',
+                    'FILENAME_HAPLOTYPEFREQUENCIES', 'FILENAME_EPSILON_LOGL', 'FILENAME_ANALYTICS']),
+    ('#reports', ['LOCI_AND_RESOLUTIONS', 'MINIMAL_FREQUENCY_GENOTYPES', 'DO_AMBIGUITYFILTER',
+                  'EXPAND_LINES_AMBIGUITYFILTER', 'WRITE_GENOTYPES', 'DO_ANALYTICS']),
+    ('#EM-algorithm', ['INITIALIZATION_HAPLOTYPEFREQUENCIES', 'EPSILON', 'CUT_HAPLOTYPEFREQUENCIES',
+                       'RENORMALIZE_HAPLOTYPEFREQUENCIES', 'SEED'])
+]
+# entries a parameter file must contain
+MANDATORY_KEYS = ['FILENAME_HAPLOTYPEFREQUENCIES', 'FILENAME_INPUT', 'FILENAME_HAPLOTYPES', 'FILENAME_GENOTYPES',
+                  'FILENAME_EPSILON_LOGL', 'MINIMAL_FREQUENCY_GENOTYPES', 'DO_AMBIGUITYFILTER',
+                  'EXPAND_LINES_AMBIGUITYFILTER', 'WRITE_GENOTYPES', 'INITIALIZATION_HAPLOTYPEFREQUENCIES', 'EPSILON',
+                  'CUT_HAPLOTYPEFREQUENCIES', 'RENORMALIZE_HAPLOTYPEFREQUENCIES', 'SEED', 'LOCI_AND_RESOLUTIONS']
+# file names of the input and of the result files of a run
+PATH_KEYS = ['FILENAME_INPUT', 'FILENAME_HAPLOTYPES', 'FILENAME_GENOTYPES',
+             'FILENAME_HAPLOTYPEFREQUENCIES', 'FILENAME_EPSILON_LOGL']
+OUTPUT_KEYS = PATH_KEYS[1:]
+# fixed entries of every parameter file written by the GUI
+FIXED_PARAMETERS = {'FILENAME_ANALYTICS': 'results/analytics.dat', 'DO_ANALYTICS': 'false'}
+# defaults of the report and EM-algorithm entries (as in the GUI's 'parametersDefault')
+DEFAULT_PARAMETERS = {'MINIMAL_FREQUENCY_GENOTYPES': '1e-5', 'DO_AMBIGUITYFILTER': 'false',
+                      'EXPAND_LINES_AMBIGUITYFILTER': 'false', 'INITIALIZATION_HAPLOTYPEFREQUENCIES': 'perturbation',
+                      'EPSILON': '1e-6', 'CUT_HAPLOTYPEFREQUENCIES': '1e-6', 'RENORMALIZE_HAPLOTYPEFREQUENCIES': 'false',
+                      'SEED': '0', 'WRITE_GENOTYPES': 'true'}
+# result file names '<RunID>_<suffix>' as written by the GUI
+RESULT_SUFFIXES = {'FILENAME_HAPLOTYPES': 'haplotypes.dat', 'FILENAME_GENOTYPES': 'genotypes.dat',
+                   'FILENAME_HAPLOTYPEFREQUENCIES': 'htf.dat', 'FILENAME_EPSILON_LOGL': 'epsilon.dat'}
+
+
+class ParameterError(Exception):
+    """invalid or incomplete parameter file
+    """
+    pass
+
+
+def read_parameters(path):
+    """reads a parameter file into a dict (comments and lines without '=' are skipped)
+    """
+    params = {}
+    with open(path, 'r') as fi:
+        for line in fi:
+            line = line.rstrip('\r\n')
+            if line.startswith('#'):
+                continue
+            listLine = line.split('=', 1)
+            if (len(listLine) > 1):
+                params[listLine[0]] = listLine[1]
+    return params
+
+def write_parameters(path, params):
+    """writes a parameter file in the layout of the GUI; unknown entries are appended
+    """
+    written = set()
+    with open(path, 'w') as paraFile:
+        for header, keys in PARAMETER_SECTIONS:
+            paraFile.write(header + '\n')
+            for key in keys:
+                if key in params:
+                    paraFile.write(key + '=' + str(params[key]) + '\n')
+                    written.add(key)
+        for key in params:
+            if key not in written:
+                paraFile.write(key + '=' + str(params[key]) + '\n')
+
+def check_parameters(params):
+    """raises ParameterError if mandatory entries are missing
+    """
+    missing = [key for key in MANDATORY_KEYS if key not in params]
+    if missing:
+        raise ParameterError('Missing entries: ' + ', '.join(missing))
+
+def absolute_paths(params, baseDir):
+    """copy of params with relative input and result file names resolved against baseDir
+    """
+    paramsAbs = dict(params)
+    for key in PATH_KEYS:
+        value = paramsAbs.get(key)
+        if value and not os.path.isabs(value):
+            paramsAbs[key] = os.path.normpath(os.path.abspath(os.path.join(baseDir, value)))
+    return paramsAbs
+
+def job_parameters(params, pathInput=None, resultDir='results', runID=''):
+    """complete parameter set of a submitted job: input file, default entries for missing ones and
+    result file names '<resultDir>/<RunID>_<suffix>' where not given; raises ParameterError if incomplete
+    """
+    paramsJob = dict(DEFAULT_PARAMETERS)
+    paramsJob.update(FIXED_PARAMETERS)
+    paramsJob.update(dict((key, str(value)) for key, value in params.items()))
+    if pathInput is not None:
+        paramsJob['FILENAME_INPUT'] = pathInput
+    prefix = runID + "_" if runID != "" else ""
+    for key, suffix in RESULT_SUFFIXES.items():
+        if key not in paramsJob:
+            paramsJob[key] = os.path.join(resultDir, prefix + suffix)
+    check_parameters(paramsJob)
+    return paramsJob
+
+def run_id(params):
+    """RunID as encoded in the haplotype frequency file name ('<RunID>_htf.dat')
+    """
+    fileName = os.path.basename(params.get('FILENAME_HAPLOTYPEFREQUENCIES', ''))
+    if "_" in fileName:
+        return fileName.split('_')[0]
+    return ""
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+Core_Plans.py
+Run plans: several Hapl-o-Mat runs derived from one parameter set, run concurrently and
+evaluated together (no GUI dependencies)
+
+@author: Ute Solloch
+'''
+
+# import modules:
+import os
+import re
+import json
+import itertools
+import shutil
+import numpy as np
+
+# import own modules
+import Core_Params, Core_Run, Core_Results, Core_Epsilon
+
+
+# initialization schemes of the EM algorithm
+INITIALIZATIONS = ["equal", "numberOccurrence", "perturbation", "random"]
+# parameters offered for sweeps
+SWEEP_KEYS = ['EPSILON', 'CUT_HAPLOTYPEFREQUENCIES', 'MINIMAL_FREQUENCY_GENOTYPES',
+              'DO_AMBIGUITYFILTER', 'EXPAND_LINES_AMBIGUITYFILTER']
+# resolutions offered for multi-resolution plans (as in the resolution dialog)
+RESOLUTIONS = ['g', 'G', 'P', '1field', '2field', '3field', '4field']
+# run labels of the resolutions; 'g' and 'G' must not differ only in case (file names)
+RESOLUTION_LABELS = {'g': 'small-g'}
+# common locus subsets offered by the locus subset dialog
+LOCUS_SUBSETS = [['A', 'B', 'DRB1'], ['A', 'B', 'C', 'DRB1', 'DQB1'], ['A', 'B', 'C', 'DRB1', 'DQB1', 'DPB1'],
+                 ['A', 'B', 'C', 'DRB1'], ['DRB1', 'DQB1'], ['A', 'B']]
+# haplotypes compared across the runs of an ensemble (most frequent of the best run)
+VARIATION_TOP = 100
+
+
+def label_name(label):
+    """label usable inside a RunID / file name (no '_', which separates the RunID)
+    """
+    return re.sub(r'[^A-Za-z0-9.+-]+', '-', str(label)).strip('-')
+
+def variant_params(params, suffix):
+    """copy of params whose result files carry the RunID '<RunID>-<suffix>'
+    """
+    runID = Core_Params.run_id(params)
+    suffix = label_name(suffix)
+    newID = runID + '-' + suffix if runID != "" else suffix
+    paramsNew = dict(params)
+    for key in Core_Params.OUTPUT_KEYS:
+        value = params.get(key)
+        if not value:
+            continue
+        head, name = os.path.split(value)
+        if runID != "" and name.startswith(runID + '_'):
+            name = name[len(runID)+1:]
+        paramsNew[key] = os.path.join(head, newID + '_' + name)
+    return paramsNew
+
+def parse_seeds(text):
+    """seeds from text like '1-8' or '1, 5, 9-12'; raises ValueError
+    """
+    seeds = []
+    for part in text.replace(';', ',').split(','):
+        part = part.strip()
+        if part == '':
+            continue
+        if '-' in part:
+            first, last = part.split('-', 1)
+            seeds.extend(range(int(first), int(last)+1))
+        else:
+            seeds.append(int(part))
+    if not seeds:
+        raise ValueError('No seeds given.')
+    return list(dict.fromkeys(seeds))
+
+def parse_resolutions(locAndRes):
+    """list of (locus, resolution) from LOCI_AND_RESOLUTIONS ('A:g,B:2f'), resolutions as in the dialog ('2field')
+    """
+    pairs = []
+    for item in locAndRes.split(','):
+        if ':' in item:
+            locus, res = item.strip().split(':', 1)
+            pairs.append((locus, res.replace("f", "field") if res.endswith('f') else res))
+    return pairs
+
+def format_resolutions(pairs):
+    """LOCI_AND_RESOLUTIONS entry from (locus, resolution) pairs
+    """
+    return ','.join(locus + ':' + res.replace("field", "f") for locus, res in pairs)
+
+def parse_subsets(text, loci):
+    """locus subsets from text like 'A~B~DRB1; DRB1~DQB1'; raises ValueError for unknown loci
+    """
+    subsets = []
+    for part in text.split(';'):
+        subset = [locus.strip() for locus in part.replace(',', '~').split('~') if locus.strip() != '']
+        if not subset:
+            continue
+        unknown = [locus for locus in subset if locus not in loci]
+        if unknown:
+            raise ValueError('Locus/loci not in the current parameters: ' + ', '.join(unknown))
+        subsets.append(subset)
+    return subsets
+
+def locus_combinations(loci, size):
+    """all subsets of size loci (in the order of loci)
+    """
+    return [list(c) for c in itertools.combinations(loci, size)]
+
+def parse_values(text):
+    """parameter values from text: a comma separated list ('1e-6, 1e-5', 'false, true') or a range
+    'start:stop:count' (linear) / 'start:stop:count:log' (logarithmic); raises ValueError
+    """
+    values = []
+    for part in text.split(','):
+        part = part.strip()
+        if part == '':
+            continue
+        if ':' in part:
+            fields = part.split(':')
+            if len(fields) not in (3, 4) or (len(fields) == 4 and fields[3] != 'log'):
+                raise ValueError('Invalid range ' + part + ", use start:stop:count or start:stop:count:log.")
+            start, stop, count = float(fields[0]), float(fields[1]), int(fields[2])
+            if len(fields) == 4:
+                if start <= 0 or stop <= 0:
+                    raise ValueError('Logarithmic range ' + part + ' needs positive limits.')
+                points = np.logspace(np.log10(start), np.log10(stop), count)
+            else:
+                points = np.linspace(start, stop, count)
+            values.extend('{:.6g}'.format(point) for point in points)
+        else:
+            values.append(part)
+    return list(dict.fromkeys(values))
+
+def copy_atomic(source, target):
+    pathTmp = target + '.tmp'
+    shutil.copyfile(source, pathTmp)
+    os.replace(pathTmp, target)
+
+
+class Variant(object):
+    """one run of a plan: label, the parameter entries changed against the base and the run
+    """
+    def __init__(self, label, changes, run):
+        """constructor
+        """
+        self.label = label
+        self.changes = changes
+        self.run = run
+
+    def final_logL(self):
+        """last log-likelihood of the epsilon/logL file of the run, None if not available
+        """
+        try:
+            tail = Core_Epsilon.read_epsilon(self.run.result_path('FILENAME_EPSILON_LOGL'))
+        except OSError:
+            return None
+        if len(tail) == 0:
+            return None
+        return Core_Run.finite(tail.logL[-1])
+
+    def row(self):
+        """summary of the finished run
+        """
+        run = self.run
+        row = {'label': self.label, 'runID': run.runID, 'state': run.state, 'changes': self.changes,
+               'duration': (run.endTime - run.startTime) if run.endTime is not None else None,
+               'iterations': len(run.epsTail), 'logL': None, 'haplotypes': None, 'sumCut': None,
+               'htf': run.result_path('FILENAME_HAPLOTYPEFREQUENCIES'), 'log': run.pathLog}
+        if run.state == 'finished':
+            row['logL'] = self.final_logL()
+            try:
+                stats = run.statistics()
+                row['haplotypes'] = stats['haplotypes']
+                row['sumCut'] = Core_Run.finite(stats['sumCut']) if stats['sumCut'] else None
+            except (OSError, ValueError, IndexError):
+                pass
+        return row
+
+
+class Plan(object):
+    """runs derived from one parameter set; finish() evaluates them once all have ended
+    and writes the manifest '<RunID>_<kind>.json' next to the base result files
+    """
+    kind = 'plan'
+
+    def __init__(self, dirHap, params, inputForm):
+        """constructor
+        """
+        self.dirHap = dirHap
+        self.params = dict(params)
+        self.inputForm = inputForm
+        self.runID = Core_Params.run_id(params)
+        self.variants = []
+        self.summary = None
+
+    def add(self, label, changes):
+        """adds a run with the given parameter entries changed
+        """
+        params = dict(self.params)
+        params.update(changes)
+        run = Core_Run.HaplomatRun(self.dirHap, variant_params(params, label), self.inputForm)
+        self.variants.append(Variant(label, changes, run))
+        return run
+
+    def runs(self):
+        return [variant.run for variant in self.variants]
+
+    def is_done(self):
+        return all(run.state in ('finished', 'cancelled', 'killed', 'error') for run in self.runs())
+
+    def result_path(self, key):
+        """file name of a base parameter entry (relative to the Hapl-o-Mat folder)
+        """
+        value = self.params[key]
+        if os.path.isabs(value):
+            return value
+        return os.path.normpath(os.path.join(os.path.abspath(self.dirHap), value))
+
+    def manifest_path(self):
+        dirRes = os.path.dirname(self.result_path('FILENAME_HAPLOTYPEFREQUENCIES'))
+        return os.path.join(dirRes, (self.runID + '_' if self.runID != "" else "") + self.kind + '.json')
+
+    def evaluate(self, rows):
+        """plan specific evaluation of the finished runs, returns a dict
+        """
+        return {}
+
+    def finish(self):
+        """evaluates the runs and writes the manifest
+        """
+        rows = [variant.row() for variant in self.variants]
+        self.summary = {'kind': self.kind, 'runID': self.runID, 'runs': rows}
+        self.summary.update(self.evaluate(rows))
+        try:
+            with open(self.manifest_path(), 'w') as fManifest:
+                json.dump(self.summary, fManifest, indent=2)
+        except OSError as e:
+            self.summary['manifestError'] = str(e)
+        return self.summary
+
+
+class EnsemblePlan(Plan):
+    """the same estimation with K seeds (and optionally several initialization schemes);
+    the run with the highest final log-likelihood is promoted to the result files of the base parameters
+    """
+    kind = 'ensemble'
+
+    def __init__(self, dirHap, params, inputForm, seeds, initializations=None):
+        """constructor
+        """
+        super().__init__(dirHap, params, inputForm)
+        if not initializations:
+            initializations = [params.get('INITIALIZATION_HAPLOTYPEFREQUENCIES', 'perturbation')]
+        for ini in initializations:
+            for seed in seeds:
+                label = ('s' + str(seed)) if len(initializations) == 1 else (ini + '-s' + str(seed))
+                self.add(label, {'SEED': str(seed), 'INITIALIZATION_HAPLOTYPEFREQUENCIES': ini})
+
+    def evaluate(self, rows):
+        finished = [i for i, row in enumerate(rows) if row['logL'] is not None]
+        if not finished:
+            return {'best': None}
+        best = max(finished, key=lambda i: rows[i]['logL'])
+        self.promote(self.variants[best].run)
+        return {'best': rows[best]['label'], 'bestLogL': rows[best]['logL'],
+                'promoted': self.result_path('FILENAME_HAPLOTYPEFREQUENCIES'),
+                'variation': self.variation([self.variants[i] for i in finished], self.variants[best])}
+
+    def promote(self, run):
+        """copies the result files and the log of run to the file names of the base parameters
+        """
+        for key in Core_Params.OUTPUT_KEYS:
+            source = run.result_path(key)
+            if os.path.isfile(source):
+                copy_atomic(source, self.result_path(key))
+        pathLog = os.path.join(os.path.dirname(self.result_path('FILENAME_HAPLOTYPEFREQUENCIES')),
+                               (self.runID + '_' if self.runID != "" else "") + 'log.dat')
+        if os.path.isfile(run.pathLog):
+            copy_atomic(run.pathLog, pathLog)
+
+    def variation(self, variants, bestVariant):
+        """spread of the haplotype frequencies across the runs: per run the total variation distance
+        to the best run, for the VARIATION_TOP most frequent haplotypes of the best run
+        mean, standard deviation and range across the runs
+        """
+        results = [Core_Results.load_htf(v.run.result_path('FILENAME_HAPLOTYPEFREQUENCIES')) for v in variants]
+        index = {}
+        for result in results:
+            for name in result.names[:len(result)]:
+                index.setdefault(name, len(index))
+        matrix = np.zeros((len(results), len(index)))
+        for i, result in enumerate(results):
+            cols = np.fromiter((index[name] for name in result.names[:len(result)]), dtype=np.int64, count=len(result))
+            matrix[i, cols] = result.freqs
+        iBest = variants.index(bestVariant)
+        distance = 0.5*np.abs(matrix - matrix[iBest]).sum(axis=1)
+        bestResult = results[iBest]
+        nTop = min(VARIATION_TOP, len(bestResult))
+        top = []
+        for name in bestResult.names[:nTop]:
+            col = matrix[:, index[name]]
+            top.append({'haplotype': str(name), 'mean': float(col.mean()), 'sd': float(col.std()),
+                        'min': float(col.min()), 'max': float(col.max())})
+        return {'distanceToBest': dict((v.label, float(d)) for v, d in zip(variants, distance)),
+                'maxDistance': float(distance.max()) if len(distance) else 0.0,
+                'maxSD': max((t['sd'] for t in top), default=0.0),
+                'top': top}
+
+
+class SweepPlan(Plan):
+    """one run for every combination (Cartesian product) of the given parameter values
+    """
+    kind = 'sweep'
+
+    def __init__(self, dirHap, params, inputForm, grid):
+        """constructor
+        grid: list of (parameter, list of values)
+        """
+        super().__init__(dirHap, params, inputForm)
+        self.keys = [key for key, values in grid]
+        combinations = list(itertools.product(*[values for key, values in grid]))
+        width = len(str(len(combinations)))
+        for i, combination in enumerate(combinations):
+            self.add('v' + str(i+1).zfill(width), dict(zip(self.keys, combination)))
+
+    def evaluate(self, rows):
+        return {'parameters': self.keys}
+
+
+class ResolutionPlan(Plan):
+    """the same input estimated at several resolutions: every run sets all loci of the base
+    parameters to one resolution
+    """
+    kind = 'resolutions'
+
+    def __init__(self, dirHap, params, inputForm, resolutions):
+        """constructor
+        """
+        super().__init__(dirHap, params, inputForm)
+        loci = [locus for locus, res in parse_resolutions(params['LOCI_AND_RESOLUTIONS'])]
+        for res in resolutions:
+            self.add(RESOLUTION_LABELS.get(res, res), {'LOCI_AND_RESOLUTIONS': format_resolutions([(locus, res) for locus in loci])})
+
+
+class LocusSubsetPlan(Plan):
+    """the same input estimated for several locus subsets; loci keep the resolution of the base
+    parameters, all runs share the RunID of the base parameters as prefix ('<RunID>-A-B-DRB1')
+    """
+    kind = 'loci'
+
+    def __init__(self, dirHap, params, inputForm, subsets):
+        """constructor
+        """
+        super().__init__(dirHap, params, inputForm)
+        pairs = parse_resolutions(params['LOCI_AND_RESOLUTIONS'])
+        done = set()
+        for subset in subsets:
+            chosen = [(locus, res) for locus, res in pairs if locus in subset]
+            key = tuple(locus for locus, res in chosen)
+            if len(key) == 0 or key in done:
+                continue
+            done.add(key)
+            self.add('-'.join(key), {'LOCI_AND_RESOLUTIONS': format_resolutions(chosen)})
+
+    def evaluate(self, rows):
+        return {'haplotypeFrequencies': dict((row['label'].replace('-', '~'), row['htf']) for row in rows
+                                             if row['state'] == 'finished')}
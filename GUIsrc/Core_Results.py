@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+Core_Results.py
+Loading and statistics of Hapl-o-Mat result files (no GUI dependencies)
+
+@author: Ute Solloch
+'''
+
+# import modules:
+import os
+import mmap
+import threading
+from collections import OrderedDict
+import numpy as np
+import Core_Columnar
+
+
+# coverage levels shown in the statistics of the results frame
+COVERAGE_LEVELS = (0.9, 0.95, 0.99, 0.995)
+# htf files larger than this (bytes) are memory-mapped instead of read into Python strings
+MAPPED_SIZE = 256*1024*1024
+# bytes scanned per step when building a line index, rows parsed per step for columns
+CHUNK_SIZE = 64*1024*1024
+CHUNK_ROWS = 1000000
+# rows parsed between two progress reports
+PROGRESS_ROWS = 100000
+# version of the '.idx' sidecar layout
+INDEX_VERSION = 2
+# parsed htf files kept in the cache (least recently used ones are dropped)
+CACHE_FILES = 4
+
+
+class HTFResult(object):
+    """haplotype frequencies of one *_htf.dat file held in memory:
+    haplotype names, frequencies (float64) and cumulated frequencies
+    """
+    def __init__(self, path, names, freqs, cum=None):
+        """constructor
+        """
+        self.path = path
+        self.names = names
+        self.freqs = freqs
+        self.cum = np.cumsum(freqs) if cum is None else cum
+
+    def __len__(self):
+        return len(self.freqs)
+
+    def top(self, maxLine):
+        """returns names and frequencies of the first maxLine haplotypes
+        """
+        maxLine = max(0, min(int(maxLine), len(self)))
+        return self.names[:maxLine], self.freqs[:maxLine]
+
+    def count_at_least(self, freqMin):
+        """number of haplotypes with frequency >= freqMin
+        """
+        return int(np.count_nonzero(self.freqs >= freqMin))
+
+    def count_cum_at_most(self, cumFreq):
+        """number of leading haplotypes with cumulated frequency <= cumFreq;
+        binary search on the cumulated frequencies, cumFreq may be a scalar or an array
+        """
+        counts = np.searchsorted(self.cum, cumFreq, side='right')
+        if np.ndim(counts) == 0:
+            return int(counts)
+        return counts
+
+    def coverage(self, levels=COVERAGE_LEVELS):
+        """number of haplotypes needed to reach each fraction of the total haplotype frequency mass
+        """
+        if len(self) == 0:
+            return np.zeros(len(levels), dtype=np.int64)
+        targets = np.asarray(levels, dtype=np.float64) * self.cum[-1]
+        counts = np.searchsorted(self.cum, targets, side='left') + 1
+        return np.minimum(counts, len(self))
+
+
+class MappedLines(object):
+    """memory-mapped text file with a newline offset index for random access to rows; blank lines
+    are no rows (a row spans the blank lines following it). The index is saved next to the file
+    as '<file>.idx' and reused while the file is unchanged
+    """
+    def __init__(self, path):
+        """constructor
+        """
+        self.path = path
+        self.stamp = file_stamp(path)
+        with open(path, 'rb') as fObj:        # the mapping keeps its own handle of the file
+            if self.stamp[1] > 0:
+                self.mm = mmap.mmap(fObj.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.mm = b''
+        self.offsets = self.load_index()
+        if self.offsets is None:
+            self.offsets = self.build_index()
+            self.save_index()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def close(self):
+        if isinstance(self.mm, mmap.mmap):
+            self.mm.close()
+
+    def index_path(self):
+        return self.path + '.idx'
+
+    def build_index(self):
+        """offsets of the starts of all non-blank lines plus the file size, scanned chunkwise
+        """
+        size = self.stamp[1]
+        parts = []
+        lineStart = 0           # line continued from the previous chunk
+        lineText = False
+        for start in range(0, size, CHUNK_SIZE):
+            chunk = np.frombuffer(self.mm[start:start+CHUNK_SIZE], dtype=np.uint8)
+            breaks = np.flatnonzero(chunk == 10)
+            bounds = np.concatenate(([0], breaks + 1))
+            if bounds[-1] == len(chunk):
+                bounds = bounds[:-1]
+            # segment k of the chunk (k < number of line breaks) ends a line; > 32: not blank, tab or line break
+            hasText = np.logical_or.reduceat(chunk > 32, bounds)
+            if len(breaks) == 0:
+                lineText = lineText or bool(hasText[0])
+                continue
+            starts = np.concatenate(([lineStart], breaks[:-1] + (start+1))).astype(np.uint64)
+            kept = hasText[:len(breaks)].copy()
+            kept[0] |= lineText
+            parts.append(starts[kept])
+            lineStart = int(breaks[-1]) + start+1
+            lineText = len(hasText) > len(breaks) and bool(hasText[-1])
+        if lineText:        # last line without line break
+            parts.append(np.array([lineStart], dtype=np.uint64))
+        parts.append(np.array([size], dtype=np.uint64))
+        return np.concatenate(parts)
+
+    def load_index(self):
+        """reads the sidecar index if it belongs to the current file, None otherwise
+        """
+        try:
+            arr = np.load(self.index_path(), mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        if len(arr) < 4 or tuple(int(i) for i in arr[:3]) != (INDEX_VERSION,) + self.stamp:
+            return None
+        return arr[3:]
+
+    def save_index(self):
+        """writes the sidecar index: version, mtime, size, offsets (uint64)
+        """
+        header = np.array((INDEX_VERSION,) + self.stamp, dtype=np.uint64)
+        pathTmp = self.index_path() + '.tmp'
+        try:
+            with open(pathTmp, 'wb') as fIdx:
+                np.save(fIdx, np.concatenate((header, self.offsets)))
+            os.replace(pathTmp, self.index_path())
+        except OSError:     # e.g. read-only result folder: index is rebuilt next time
+            pass
+
+    def line(self, i):
+        """text of row i
+        """
+        return self.mm[int(self.offsets[i]):int(self.offsets[i+1])].decode('UTF-8').rstrip()
+
+    def lines(self, start, stop):
+        """text of rows start..stop-1
+        """
+        start = max(0, start)
+        stop = min(stop, len(self))
+        if stop <= start:
+            return []
+        lines = self.mm[int(self.offsets[start]):int(self.offsets[stop])].decode('UTF-8').splitlines()
+        if len(lines) != stop - start:
+            lines = [line for line in lines if line.strip()]
+        return lines
+
+    def float_column(self, col, start=0, stop=None, progress=None):
+        """tab separated column col of rows start..stop-1 parsed to a float64 array;
+        progress: optional callable (rows parsed, total rows) called per chunk
+        """
+        if stop is None or stop > len(self):
+            stop = len(self)
+        out = np.empty(max(0, stop-start), dtype=np.float64)
+        for a in range(start, stop, CHUNK_ROWS):
+            b = min(a+CHUNK_ROWS, stop)
+            lines = self.mm[int(self.offsets[a]):int(self.offsets[b])].splitlines()
+            if len(lines) != b - a:
+                lines = [line for line in lines if line.strip()]
+            fields = [line.split(b'\t')[col] for line in lines]
+            out[a-start:b-start] = np.fromiter(map(float, fields), dtype=np.float64, count=len(fields))
+            if progress is not None:
+                progress(b-start, stop-start)
+        return out
+
+
+class MappedColumn(object):
+    """text column of a MappedLines file, decoded only for the requested rows
+    """
+    def __init__(self, mapped, col):
+        """constructor
+        """
+        self.mapped = mapped
+        self.col = col
+
+    def __len__(self):
+        return len(self.mapped)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step < 0:
+                return self[::][key]
+            values = [line.split('\t')[self.col] for line in self.mapped.lines(start, stop)]
+            return np.array(values[::step], dtype=object)
+        if key < 0:
+            key += len(self)
+        return self.mapped.line(key).split('\t')[self.col]
+
+
+# cache of the CACHE_FILES last used htf files: absolute path -> ((mtime, size), HTFResult).
+# Dropped entries are not closed: a table may still show them, the mapping of a large file
+# is released with the last reference
+_cacheHTF = OrderedDict()
+_cacheLock = threading.Lock()
+
+def file_stamp(path):
+    """(mtime, size) of a file, used to validate cached results
+    """
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+def load_htf(path, sidecar=True, progress=None):
+    """parses a haplotype frequency file in one pass; large files are memory-mapped
+    and only their frequency column is parsed; results are cached by path and modification time.
+    With sidecar, a valid columnar sidecar is memory-mapped instead of parsing the text,
+    and a missing one is written in the background after parsing;
+    progress: optional callable (done, total) called while parsing
+    """
+    key = os.path.abspath(path)
+    stamp = file_stamp(path)
+    with _cacheLock:
+        cached = _cacheHTF.get(key)
+        if cached is not None and cached[0] == stamp:
+            _cacheHTF.move_to_end(key)
+            return cached[1]
+    if sidecar:
+        columns = Core_Columnar.load_htf_sidecar(path)
+        if columns is not None:
+            result = HTFResult(path, *columns)
+            cache_result(key, stamp, result)
+            return result
+    result = parse_htf(path, stamp, progress)
+    cache_result(key, stamp, result)
+    if sidecar and file_stamp(path) == stamp:
+        Core_Columnar.write_in_background(Core_Columnar.write_htf_sidecar,
+                                          path, result.names, result.freqs, result.cum, stamp)
+    return result
+
+def parse_htf(path, stamp, progress=None):
+    """HTFResult of the text of a haplotype frequency file
+    """
+    if stamp[1] > MAPPED_SIZE:
+        mapped = MappedLines(path)
+        return HTFResult(path, MappedColumn(mapped, 0), mapped.float_column(1, progress=progress))
+    names = []
+    freqs = []
+    with open(path, 'r') as fHTF:
+        nRead = 0
+        for line in fHTF:
+            nRead += len(line)
+            if progress is not None and len(names) % PROGRESS_ROWS == 0:
+                progress(nRead, stamp[1])
+            raw = line.strip()
+            if raw == '':
+                continue
+            sp = raw.split('\t')
+            names.append(sp[0])
+            freqs.append(sp[1])
+    return HTFResult(path, np.array(names, dtype=object), np.array(freqs, dtype=np.float64))
+
+def cache_result(key, stamp, result):
+    """adds a parsed htf file to the cache, dropping the least recently used ones
+    """
+    with _cacheLock:
+        _cacheHTF[key] = (stamp, result)
+        _cacheHTF.move_to_end(key)
+        while len(_cacheHTF) > CACHE_FILES:
+            _cacheHTF.popitem(last=False)
+
+def clear_cache(path=None):
+    """drops one or all cached htf results; they stay readable for whoever still holds them
+    """
+    with _cacheLock:
+        if path is None:
+            _cacheHTF.clear()
+        else:
+            _cacheHTF.pop(os.path.abspath(path), None)
+
+def read_log_stats(pathLog):
+    """reads number of leftover genotypes and sum of cut haplotype frequencies from a run log
+    """
+    gtnr = None
+    sumHT = None
+    with open(pathLog, 'r') as log:
+        for line in log:
+            if 'Leftover genotypes' in line:
+                gtnr = line.strip().split(': ')[1]
+            elif 'Sum cutted haplotype frequencies' in line:
+                sumHT = line.strip().split(': ')[1]
+    return gtnr, sumHT
+
+def run_statistics(pathHTF, pathLog):
+    """statistics of a finished run as shown in the results frame
+    """
+    result = load_htf(pathHTF)
+    gtnr, sumHT = read_log_stats(pathLog)
+    stats = {
+        'haplotypes': len(result),
+        'coverage': dict(zip(COVERAGE_LEVELS, result.coverage().tolist())),
+        'genotypes': int(gtnr) if gtnr is not None else 0,
+        'sumCut': sumHT,
+        'epsilon2n': None,
+        'haplotypesAboveEpsilon2n': None
+    }
+    if stats['genotypes'] > 0:
+        epsStat = 1/(2*stats['genotypes'])
+        stats['epsilon2n'] = epsStat
+        stats['haplotypesAboveEpsilon2n'] = result.count_at_least(epsStat)
+    return stats
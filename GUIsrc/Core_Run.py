@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+Core_Run.py
+Start and supervision of a Hapl-o-Mat run: process, output log, epsilon tracking and statistics
+(no GUI dependencies)
+
+@author: Ute Solloch
+'''
+
+# import modules:
+import os
+import math
+import platform
+import signal
+import subprocess
+import threading
+import codecs
+import queue
+import time
+import sqlite3
+
+# import own modules
+import Core_Params, Core_Input, Core_Epsilon, Core_Results, Core_Stage, Core_History, Core_Telemetry, Core_Limits
+
+
+# bytes read per chunk from the process output
+READ_SIZE = 65536
+# runs can be paused (SIGSTOP) and resumed (SIGCONT), not on Windows
+PAUSE_SUPPORTED = hasattr(signal, 'SIGSTOP')
+
+
+def haplomat_command(dirHap, inputForm):
+    """command line starting Hapl-o-Mat for input format 'MAC' or 'GLSC'
+    """
+    if platform.system() == "Windows":
+        program = "Hapl-o-Mat.exe"
+    else:
+        program = "haplomat"
+    return [os.path.join(os.path.abspath(dirHap), program), inputForm]
+
+
+def finite(value):
+    """float value, None for nan (not representable in JSON)
+    """
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+class OutputLog(object):
+    """collects process output: feed() only queues the raw bytes; a worker thread decodes them
+    incrementally (UTF-8 sequences split across chunks stay intact), streams the text to the
+    log file and passes it on to an optional listener (called in the worker thread)
+    """
+    def __init__(self, pathLog=None, listener=None):
+        """constructor
+        """
+        self.listener = listener
+        self.decoder = codecs.getincrementaldecoder('UTF-8')('replace')
+        self.chunks = queue.Queue()
+        self.logFile = None
+        if pathLog is not None:
+            self.logFile = open(pathLog, 'w', encoding='UTF-8')
+        self.worker = threading.Thread(target=self.collect, daemon=True)
+        self.worker.start()
+
+    def feed(self, data):
+        """hands over a chunk of raw process output (bytes); may be called from any thread
+        """
+        self.chunks.put(bytes(data))
+
+    def write(self, text):
+        """adds a message of the caller itself as separate line(s)
+        """
+        self.chunks.put(text if text.endswith('\n') else text + '\n')
+
+    def collect(self):
+        """worker thread: decodes chunks, writes them to the log file and passes them on
+        """
+        while True:
+            chunk = self.chunks.get()
+            if chunk is None:
+                text = self.decoder.decode(b'', final=True)
+            elif isinstance(chunk, bytes):
+                text = self.decoder.decode(chunk)
+            else:
+                text = chunk
+            if text:
+                if self.logFile is not None:
+                    self.logFile.write(text)
+                    self.logFile.flush()
+                if self.listener is not None:
+                    self.listener(text)
+            if chunk is None:
+                break
+
+    def close(self):
+        """waits for all queued output and closes the log file
+        """
+        if self.worker.is_alive():
+            self.chunks.put(None)
+            self.worker.join()
+        if self.logFile is not None:
+            self.logFile.close()
+            self.logFile = None
+
+
+class HaplomatRun(object):
+    """one Hapl-o-Mat estimation: stages its own working folder with parameter file, starts
+    Hapl-o-Mat there, streams the output to the log file and follows the epsilon file.
+    All file work of the run (cache key and restore, staging, cache store, run history)
+    is done in its worker thread, start() and poll() return at once
+    """
+    def __init__(self, dirHap, params, inputForm=None, pathLog=None, listener=None):
+        """constructor
+        dirHap: Hapl-o-Mat folder, params: dict of parameters,
+        listener: optional callable receiving decoded output text (worker thread)
+        """
+        self.dirHap = os.path.abspath(dirHap)
+        self.params = dict(params)
+        if inputForm is None:
+            inputForm = Core_Input.profile_input(self.result_path('FILENAME_INPUT')).inputForm
+        self.inputForm = inputForm
+        self.runID = Core_Params.run_id(self.params)
+        if pathLog is None:
+            runIdIn = self.runID + "_" if self.runID != "" else ""
+            pathLog = os.path.join(os.path.dirname(self.result_path('FILENAME_HAPLOTYPEFREQUENCIES')), runIdIn + 'log.dat')
+        self.pathLog = pathLog
+        self.listener = listener
+        self.process = None
+        self.output = None
+        self.worker = None          # thread running the whole lifecycle of the started run
+        self.lock = threading.Lock()    # process start against kill()
+        self.killed = False
+        self.error = None       # reason if the run could not be started
+        self.dirStage = None
+        self.cache = None           # Core_Cache.ResultCache; results of identical runs are restored
+        self.forceRun = False       # run Hapl-o-Mat even if the cache holds the result
+        self.cacheKey = None
+        self.cached = False
+        self.recordHistory = False  # add the ended run to the run history (Core_History)
+        self.historyId = None
+        self.keepStage = False      # staged folder is removed after a regularly finished run
+        self.inputFifo = False      # compressed input is piped to Hapl-o-Mat instead of decompressed to disk
+        self.feeder = None
+        self.sampler = None         # Core_Telemetry.ResourceSampler of the running process
+        self.limits = None          # Core_Limits.RunLimits, enforced by the watchdog
+        self.killReason = None      # limit crossed by a run ended by the watchdog
+        self.suspended = []         # pauses: [start, end (None while paused), iterations before the pause]
+        self.exitCode = None
+        self.exitStatus = None      # 0: regularly finished, 1: killed or crashed (as QProcess)
+        self.startTime = None
+        self.endTime = None
+        self.epsTail = Core_Epsilon.EpsilonTail(self.result_path('FILENAME_EPSILON_LOGL'))
+
+    def result_path(self, key):
+        """file name of a parameter entry; relative names are relative to the Hapl-o-Mat folder
+        """
+        value = self.params[key]
+        if os.path.isabs(value):
+            return value
+        return os.path.normpath(os.path.join(self.dirHap, value))
+
+    def resource_path(self):
+        """file of the resource time series, next to the log file
+        """
+        return os.path.join(os.path.dirname(self.pathLog), (self.runID + "_" if self.runID != "" else "") + 'resources.dat')
+
+    def resource_series(self):
+        """resource samples of the running process so far (Core_Telemetry.ResourceSeries)
+        """
+        if self.sampler is not None:
+            return self.sampler.series
+        return Core_Telemetry.ResourceSeries()
+
+    def parameter_file(self):
+        """parameter file of the staged run, None before the start
+        """
+        if self.dirStage is None:
+            return None
+        return os.path.join(self.dirStage, "parameters" + self.inputForm)
+
+    def start(self):
+        """starts the worker thread of the run; the run counts as running from now on
+        """
+        self.worker = threading.Thread(target=self.work, daemon=True)
+        self.worker.start()
+
+    def work(self):
+        """worker thread: restores the result from the cache or stages the working folder, runs
+        Hapl-o-Mat and finishes the run up; a run that cannot be started ends with error
+        """
+        try:
+            started = self.launch()
+        except Exception as e:      # e.g. damaged compressed input (Core_Input.READ_ERRORS): the run fails
+            self.error = str(e) or type(e).__name__
+            started = False
+        if not started:
+            if self.exitCode is None:       # not restored from the cache
+                self.end_unstarted()
+            return
+        self.read_output()
+        self.finish(self.process.wait())
+
+    def launch(self):
+        """restores the result from the cache or stages the working folder and starts Hapl-o-Mat;
+        False if the run ended without Hapl-o-Mat process
+        """
+        # the cached earlier result in the same file is outdated (its mapping is released with the last view of it)
+        Core_Results.clear_cache(self.result_path('FILENAME_HAPLOTYPEFREQUENCIES'))
+        if self.cache is not None:
+            try:
+                self.cacheKey = self.cache.key(self)
+            except OSError:     # e.g. missing input: Hapl-o-Mat reports the error
+                self.cacheKey = None
+            if self.cacheKey is not None and not self.forceRun and self.restore_cached():
+                return False
+        if self.killed:
+            return False
+        self.dirStage = Core_Stage.create_stage(self.dirHap, self.params, self.inputForm, self.runID, self.inputFifo)
+        pathEpsilon = self.result_path('FILENAME_EPSILON_LOGL')
+        if(os.path.isfile(pathEpsilon)):
+            os.remove(pathEpsilon)
+        self.epsTail.reset()
+        self.output = OutputLog(self.pathLog, self.listener)
+        self.output.write('Hapl-o-Mat started.\n' + time.ctime())
+        with self.lock:
+            if self.killed:
+                Core_Stage.remove_stage(self.dirStage)
+                return False
+            self.startTime = time.time()
+            try:
+                self.process = subprocess.Popen(haplomat_command(self.dirHap, self.inputForm), cwd=self.dirStage,
+                                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            except OSError:
+                Core_Stage.remove_stage(self.dirStage)
+                raise
+        try:
+            pathFifo = Core_Stage.staged_fifo(self.dirStage, self.result_path('FILENAME_INPUT'))
+            if pathFifo is not None:
+                self.feeder = Core_Input.InputFeeder(self.result_path('FILENAME_INPUT'), pathFifo)
+            if self.limits is not None:
+                failed = self.limits.apply(self.process.pid)
+                if failed:
+                    self.output.write('\nLimits not applied: ' + ', '.join(failed) + '\n')
+            if Core_Telemetry.available():
+                watchdog = self.watch if self.limits is not None and self.limits.is_watched() else None
+                self.sampler = Core_Telemetry.ResourceSampler(self.process.pid, self.resource_path(), watchdog=watchdog)
+        except BaseException:       # the run fails, its process must not outlive it
+            self.abandon_process()
+            raise
+        return True
+
+    def abandon_process(self):
+        """kills and reaps the process of a run that failed while it was set up
+        """
+        self.process.kill()
+        self.process.wait()
+        self.process.stdout.close()
+        if self.feeder is not None:
+            self.feeder.stop()
+        Core_Stage.remove_stage(self.dirStage)
+
+    def end_unstarted(self):
+        """ends a run cancelled or failed before Hapl-o-Mat was started or while its process was set up
+        """
+        self.endTime = time.time()
+        self.exitCode = -1
+        self.exitStatus = 1
+        if self.output is None and self.error is not None:
+            try:
+                self.output = OutputLog(self.pathLog, self.listener)
+            except OSError:
+                pass
+        if self.output is not None:
+            if self.error is not None:
+                self.output.write('\nError: ' + self.error + '\n' + time.ctime())
+            else:
+                self.output.write('\nCancelled!\n' + time.ctime())
+            self.output.close()
+        self.record()
+
+    def restore_cached(self):
+        """finishes the run with the cached result files, False if the cache holds no result
+        """
+        try:
+            logText = self.cache.restore(self.cacheKey, self)
+        except OSError:
+            return False
+        if logText is None:
+            return False
+        self.output = OutputLog(self.pathLog, self.listener)
+        self.output.write('Result restored from cache (' + self.cacheKey[:12] + ').\n' + time.ctime() + '\n')
+        self.output.write(logText)
+        self.output.close()
+        self.startTime = self.endTime = time.time()
+        self.cached = True
+        self.exitCode = 0
+        self.exitStatus = 0
+        self.epsTail.reset()
+        self.epsTail.poll(final=True)
+        self.record()
+        return True
+
+    def read_output(self):
+        """passes the process output chunkwise to the output log until the process has closed it
+        """
+        stream = self.process.stdout
+        while True:
+            chunk = stream.read1(READ_SIZE)
+            if not chunk:
+                break
+            self.output.feed(chunk)
+
+    @property
+    def pid(self):
+        return self.process.pid if self.process is not None else None
+
+    def is_running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def is_ended(self):
+        """the worker thread has finished the run up (also restored, cancelled or failed runs)
+        """
+        return self.worker is not None and not self.worker.is_alive()
+
+    def poll(self):
+        """exit code once the run has ended and is finished up (-1 if it ended without Hapl-o-Mat
+        process), None otherwise
+        """
+        if self.is_ended():
+            return self.exitCode
+        if self.is_running() and self.sampler is None and self.limits is not None:     # no telemetry: wall-clock limit only
+            reason = self.limits.exceeded(None, self.active_time())
+            if reason is not None:
+                self.terminate(reason)
+        return None
+
+    def wait(self, timeout=None):
+        if self.worker is not None:
+            self.worker.join(timeout)
+        return self.poll()
+
+    def kill(self):
+        """kills the process; a run not started yet is cancelled
+        """
+        with self.lock:
+            if self.exitCode is not None:
+                return
+            self.killed = True
+            if self.process is not None:
+                self.process.kill()
+
+    @property
+    def paused(self):
+        return len(self.suspended) > 0 and self.suspended[-1][1] is None
+
+    def pause(self):
+        """stops the running process (SIGSTOP) until resume(); False if it is not running or cannot be paused
+        """
+        if not PAUSE_SUPPORTED or self.paused or not self.is_running():
+            return False
+        self.process.send_signal(signal.SIGSTOP)
+        self.epsTail.poll()
+        self.suspended.append([time.time(), None, len(self.epsTail)])
+        self.output.write('\nPaused.\n' + time.ctime())
+        return True
+
+    def resume(self):
+        """continues a paused process (SIGCONT); False if it is not paused
+        """
+        if not self.paused:
+            return False
+        self.suspended[-1][1] = time.time()
+        if self.process.poll() is None:
+            self.process.send_signal(signal.SIGCONT)
+            self.output.write('\nResumed.\n' + time.ctime())
+        return True
+
+    def paused_time(self):
+        """seconds the run has been paused so far
+        """
+        now = time.time()
+        return sum((end if end is not None else now) - start for start, end, _ in self.suspended)
+
+    def active_time(self):
+        """seconds the run has been running, pauses not counted
+        """
+        if self.startTime is None:
+            return 0.0
+        return (self.endTime or time.time()) - self.startTime - self.paused_time()
+
+    def watch(self, sample):
+        """watchdog of the resource sampler (sampler thread): ends the run when it crosses a limit
+        """
+        reason = self.limits.exceeded(sample[1], self.active_time())
+        if reason is not None:
+            self.terminate(reason)
+
+    def terminate(self, reason):
+        """ends a run crossing a limit gracefully (terminate), killed if it has not ended
+        after Core_Limits.KILL_GRACE seconds
+        """
+        if self.killReason is not None or self.exitCode is not None:
+            return
+        self.killReason = reason
+        self.killed = True
+        self.process.terminate()
+        if self.paused:     # a stopped process receives the signal only when continued
+            self.suspended[-1][1] = time.time()
+            self.process.send_signal(signal.SIGCONT)
+        timer = threading.Timer(Core_Limits.KILL_GRACE, self.kill_after_grace)
+        timer.daemon = True
+        timer.start()
+
+    def kill_after_grace(self):
+        if self.process.poll() is None:
+            self.process.kill()
+
+    def finish(self, code):
+        """writes the final status to the log, reads the remaining epsilon values,
+        stores the result in the cache and records the run (worker thread)
+        """
+        if self.sampler is not None:
+            self.sampler.stop()
+        if self.feeder is not None:
+            self.feeder.stop()
+        Core_Stage.remove_input(self.dirStage, self.result_path('FILENAME_INPUT'))
+        self.endTime = time.time()
+        if self.paused:
+            self.suspended[-1][1] = self.endTime
+        self.exitCode = code
+        self.exitStatus = 1 if (self.killed or code < 0) else 0
+        if self.exitStatus == 0 and code == 0:
+            self.output.write('\nFinished!\n' + time.ctime())
+        elif self.killReason is not None:
+            self.output.write('\nKilled: ' + self.killReason + '!\n' + time.ctime())
+        elif self.exitStatus == 1:
+            self.output.write('\nCancelled!\n' + time.ctime())
+        else:
+            self.output.write('\nError!\n' + time.ctime())
+        self.output.close()
+        self.epsTail.poll(final=True)
+        if self.end_state() == 'finished':
+            self.epsTail.save_sidecar()
+            if not self.keepStage:
+                Core_Stage.remove_stage(self.dirStage)
+            if self.cache is not None and self.cacheKey is not None:
+                self.cache.store(self.cacheKey, self)
+        self.record()
+
+    def record(self):
+        """adds the ended run to the run history of the Hapl-o-Mat folder
+        """
+        if not self.recordHistory:
+            return
+        try:
+            self.historyId = Core_History.record_run(self)
+        except (sqlite3.Error, OSError):     # history is optional, the run itself is complete
+            self.historyId = None
+
+    @property
+    def state(self):
+        """'created', 'running' (also while staged or finished up), 'paused', 'finished', 'cancelled', 'killed' or 'error'
+        """
+        if self.worker is not None and self.worker.is_alive():
+            return 'paused' if self.paused else 'running'
+        return self.end_state()
+
+    def end_state(self):
+        """state by the process and its exit status, regardless of the worker thread
+        """
+        if self.error is not None:
+            return 'error'
+        if self.cached:
+            return 'finished'
+        if self.process is None:
+            return 'cancelled' if self.killed else 'created'
+        if self.exitCode is None:
+            return 'paused' if self.paused else 'running'
+        if self.exitStatus == 0 and self.exitCode == 0:
+            return 'finished'
+        if self.killReason is not None:
+            return 'killed'
+        if self.exitStatus == 1:
+            return 'cancelled'
+        return 'error'
+
+    def statistics(self):
+        """statistics of the finished run (None if it did not finish regularly)
+        """
+        if self.end_state() != 'finished':
+            return None
+        return Core_Results.run_statistics(self.result_path('FILENAME_HAPLOTYPEFREQUENCIES'), self.pathLog)
+
+    def summary(self):
+        """description of the run for JSON reports
+        """
+        nEps = len(self.epsTail)
+        summary = {
+            'runID': self.runID,
+            'inputFormat': self.inputForm,
+            'state': self.end_state(),
+            'exitCode': self.exitCode,
+            'start': self.startTime,
+            'end': self.endTime,
+            'duration': (self.endTime - self.startTime) if self.endTime is not None else None,
+            'pausedTime': self.paused_time(),
+            'pauses': [[start - self.startTime, (end - self.startTime) if end is not None else None, nIter]
+                       for start, end, nIter in self.suspended],
+            'iterations': nEps,
+            'epsilon': finite(self.epsTail.epsilon[-1]) if nEps else None,
+            'logL': finite(self.epsTail.logL[-1]) if nEps else None,
+            'files': dict((key, self.result_path(key)) for key in Core_Params.PATH_KEYS),
+            'log': self.pathLog,
+            'stage': self.dirStage,
+            'cached': self.cached,
+            'cacheKey': self.cacheKey,
+            'resources': self.sampler.series.summary() if self.sampler is not None else None,
+            'statistics': None
+        }
+        if self.error is not None:
+            summary['error'] = self.error
+        if self.killReason is not None:
+            summary['killReason'] = self.killReason
+        try:
+            summary['statistics'] = self.statistics()
+        except (OSError, ValueError, IndexError) as e:
+            summary['statisticsError'] = str(e)
+        return summary
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+Core_Scheduler.py
+Job queue running several Hapl-o-Mat processes concurrently, limited by the number of
+physical cores and a memory budget; jobs of higher priority suspend running jobs of lower priority
+(no GUI dependencies)
+
+@author: Ute Solloch
+'''
+
+# import modules:
+import os
+import time
+
+# import own modules
+import Core_Run, Core_Input
+
+
+# estimated memory of a run: base plus factor * input file size (bytes)
+MEMORY_BASE = 256*1024*1024
+MEMORY_FACTOR = 40
+# share of the available memory used as default budget
+MEMORY_SHARE = 0.8
+# job states
+# job states; 'paused': paused by the user, 'suspended': waiting to be resumed by the scheduler
+STATES = ('queued', 'running', 'paused', 'suspended', 'finished', 'cancelled', 'killed', 'error')
+ACTIVE_STATES = ('queued', 'running', 'paused', 'suspended')
+
+
+def physical_cores():
+    """number of physical cores (hyperthreads not counted), logical cores if unknown
+    """
+    cores = set()
+    try:
+        with open('/proc/cpuinfo', 'r') as cpuinfo:
+            physId = coreId = None
+            for line in cpuinfo:
+                key, _, value = line.partition(':')
+                key = key.strip()
+                if key == 'physical id':
+                    physId = value.strip()
+                elif key == 'core id':
+                    coreId = value.strip()
+                elif key == '' and coreId is not None:
+                    cores.add((physId, coreId))
+                    physId = coreId = None
+            if coreId is not None:
+                cores.add((physId, coreId))
+    except OSError:
+        pass
+    if cores:
+        return len(cores)
+    return os.cpu_count() or 1
+
+def available_memory():
+    """available memory in bytes (MemAvailable), None if unknown
+    """
+    try:
+        with open('/proc/meminfo', 'r') as meminfo:
+            for line in meminfo:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def estimate_memory(run):
+    """rough memory estimate of a run from the (uncompressed) size of its input file
+    """
+    try:
+        size = Core_Input.uncompressed_size(run.result_path('FILENAME_INPUT'))
+    except OSError:
+        size = 0
+    return MEMORY_BASE + MEMORY_FACTOR*size
+
+
+class Job(object):
+    """one queued Hapl-o-Mat run
+    """
+    def __init__(self, jobId, run, memory, priority=0):
+        """constructor
+        """
+        self.jobId = jobId
+        self.run = run
+        self.memory = memory
+        self.priority = priority
+        self.held = False       # paused by the user, not resumed by the scheduler
+        self.submitted = time.time()
+
+    @property
+    def error(self):
+        return self.run.error
+
+    @property
+    def state(self):
+        state = self.run.state
+        if state == 'created':
+            return 'queued'
+        if state == 'paused':
+            return 'paused' if self.held else 'suspended'
+        return state
+
+    def is_active(self):
+        return self.state in ACTIVE_STATES
+
+    def summary(self):
+        summary = self.run.summary()
+        summary['jobID'] = self.jobId
+        summary['state'] = self.state
+        summary['memory'] = self.memory
+        summary['priority'] = self.priority
+        return summary
+
+
+class Scheduler(object):
+    """priority job queue, first in, first out within a priority; tick() starts queued jobs while
+    cores and memory budget allow, follows the running ones and returns the jobs whose state changed.
+    With preempt, a job of higher priority suspends (SIGSTOP) the running job of lowest priority
+    when all cores are busy; suspended jobs are resumed before queued jobs of the same priority
+    """
+    def __init__(self, maxJobs=None, memoryBudget=None):
+        """constructor
+        maxJobs: concurrent runs (default: physical cores), memoryBudget: bytes (default: share of available memory)
+        """
+        self.maxJobs = maxJobs if maxJobs else physical_cores()
+        if memoryBudget is None:
+            memory = available_memory()
+            memoryBudget = int(MEMORY_SHARE*memory) if memory is not None else None
+        self.memoryBudget = memoryBudget
+        self.preempt = Core_Run.PAUSE_SUPPORTED
+        self.jobs = []
+        self.nextId = 1
+        self.states = {}
+
+    def submit(self, run, memory=None, priority=0, jobId=None):
+        """adds a run (Core_Run.HaplomatRun, not started) to the queue; higher priorities run first.
+        jobId: ID reserved before (default: next ID)
+        """
+        if memory is None:
+            memory = estimate_memory(run)
+        if jobId is None:
+            jobId = self.nextId
+        job = Job(jobId, run, memory, priority)
+        self.nextId = max(self.nextId, jobId + 1)
+        self.jobs.append(job)
+        self.states[job.jobId] = job.state
+        return job
+
+    def job(self, jobId):
+        for job in self.jobs:
+            if job.jobId == jobId:
+                return job
+        return None
+
+    def running(self):
+        return [job for job in self.jobs if job.state == 'running']
+
+    def queued(self):
+        return [job for job in self.jobs if job.state == 'queued']
+
+    def waiting(self):
+        """suspended and queued jobs in the order they are resumed or started
+        """
+        jobs = [job for job in self.jobs if job.state in ('suspended', 'queued')]
+        return sorted(jobs, key=lambda job: (-job.priority, job.state != 'suspended', job.jobId))
+
+    def is_idle(self):
+        return not any(job.is_active() for job in self.jobs)
+
+    def memory_in_use(self):
+        """estimated memory of the running jobs; stopped processes may be swapped out and are not counted
+        """
+        return sum(job.memory for job in self.running())
+
+    def set_priority(self, jobId, priority):
+        """changes the priority of a job; takes effect at the next tick
+        """
+        job = self.job(jobId)
+        if job is None or not job.is_active():
+            return False
+        job.priority = priority
+        return True
+
+    def pause(self, jobId):
+        """pauses a running or suspended job until resume() is called
+        """
+        job = self.job(jobId)
+        if job is None or job.state not in ('running', 'suspended'):
+            return False
+        if job.state == 'running' and not job.run.pause():
+            return False
+        job.held = True
+        return True
+
+    def resume(self, jobId):
+        """releases a paused job; it is resumed as soon as a core is free
+        """
+        job = self.job(jobId)
+        if job is None or job.state != 'paused':
+            return False
+        job.held = False
+        return True
+
+    def preemptible(self, running, priority):
+        """running job of lowest priority below priority (the latest started of these), None if there is none;
+        jobs still being staged cannot be paused
+        """
+        jobs = [job for job in running if job.priority < priority and job.run.pid is not None]
+        if not self.preempt or not jobs:
+            return None
+        return min(jobs, key=lambda job: (job.priority, -job.run.startTime))
+
+    def cancel(self, jobId):
+        """removes a queued job or kills a running one
+        """
+        job = self.job(jobId)
+        if job is None:
+            return False
+        if job.is_active():
+            job.run.kill()
+        return True
+
+    def cancel_all(self):
+        for job in self.jobs:
+            self.cancel(job.jobId)
+
+    def start_jobs(self):
+        running = self.running()
+        for job in self.waiting():
+            victim = None
+            if len(running) >= self.maxJobs:
+                victim = self.preemptible(running, job.priority)
+                if victim is None:
+                    break
+            others = [other for other in running if other is not victim]
+            inUse = sum(other.memory for other in others)
+            # a job larger than the budget still runs, but only alone
+            if self.memoryBudget is not None and others and inUse + job.memory > self.memoryBudget:
+                break
+            if victim is not None:
+                if not victim.run.pause():
+                    break
+                running = others
+            if job.state == 'suspended':
+                job.run.resume()
+            else:
+                job.run.start()     # staging and cache lookup follow in the worker thread of the run
+            if job.state == 'running':
+                running.append(job)
+
+    def tick(self):
+        """one scheduling step: finishes ended runs, polls epsilon files, starts queued jobs;
+        returns the jobs whose state changed since the last tick
+        """
+        for job in self.jobs:
+            if job.state in ('running', 'paused', 'suspended') and job.run.poll() is None:
+                job.run.epsTail.poll()
+        self.start_jobs()
+        changed = []
+        for job in self.jobs:
+            state = job.state
+            if self.states.get(job.jobId) != state:
+                self.states[job.jobId] = state
+                changed.append(job)
+        return changed
+
+    def wait_all(self, interval=0.5, callback=None):
+        """runs ticks until no job is queued or running; callback(job) is called for every state change
+        """
+        while True:
+            for job in self.tick():
+                if callback is not None:
+                    callback(job)
+            if self.is_idle():
+                break
+            time.sleep(interval)
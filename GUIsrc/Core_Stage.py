@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+Core_Stage.py
+Staged working folders: every run gets its own folder '<Hapl-o-Mat>/runs/<name>' with its own
+parameter file, so concurrent runs never share 'parametersMAC'/'parametersGLSC' (no GUI dependencies)
+
+@author: Ute Solloch
+'''
+
+# import modules:
+import os
+import stat
+import shutil
+import tempfile
+import time
+
+# import own modules
+import Core_Params, Core_Input
+
+
+# folder of the staged runs inside the Hapl-o-Mat folder
+RUNS_DIR = 'runs'
+# folders of the Hapl-o-Mat installation read relative to the working directory
+SHARED_DIRS = ['data']
+# parameter entries holding file names
+FILE_KEYS = Core_Params.PATH_KEYS + ['FILENAME_ANALYTICS']
+# prefix of the decompressed (or piped) input file inside a staged folder
+INPUT_PREFIX = 'input-'
+
+
+def stage_parameters(params, dirHap, dirStage):
+    """copy of params with relative file names (relative to the Hapl-o-Mat folder)
+    rewritten relative to the staged folder
+    """
+    paramsStage = dict(params)
+    for key in FILE_KEYS:
+        value = paramsStage.get(key)
+        if value and not os.path.isabs(value):
+            paramsStage[key] = os.path.relpath(os.path.join(dirHap, value), dirStage)
+    return paramsStage
+
+def input_source(params, dirHap):
+    """absolute path of the input file of params
+    """
+    return os.path.normpath(os.path.join(dirHap, params['FILENAME_INPUT']))
+
+def staged_input(dirStage, source):
+    """path of the decompressed input of source inside a staged folder
+    """
+    return os.path.join(dirStage, INPUT_PREFIX + Core_Input.uncompressed_name(source))
+
+def stage_input(source, dirStage, fifo=False):
+    """makes a compressed input file readable for Hapl-o-Mat: decompressed into the staged folder
+    or, with fifo, as named pipe fed by Core_Input.InputFeeder; returns the name inside the folder
+    """
+    target = staged_input(dirStage, source)
+    if fifo and hasattr(os, 'mkfifo'):
+        os.mkfifo(target)
+    else:
+        Core_Input.decompress_to(source, target)
+    return os.path.basename(target)
+
+def staged_fifo(dirStage, source):
+    """path of the named pipe of the staged input, None if the input is not piped
+    """
+    target = staged_input(dirStage, source)
+    try:
+        return target if stat.S_ISFIFO(os.lstat(target).st_mode) else None
+    except OSError:
+        return None
+
+def remove_input(dirStage, source):
+    """removes the decompressed input from a staged folder (also if the folder is kept)
+    """
+    try:
+        os.remove(staged_input(dirStage, source))
+    except OSError:
+        pass
+
+def link_shared(dirHap, dirStage):
+    """makes the shared folders of the installation available in the staged folder
+    (symbolic link, copy where links are not permitted)
+    """
+    for name in SHARED_DIRS:
+        source = os.path.join(dirHap, name)
+        if not os.path.isdir(source):
+            continue
+        target = os.path.join(dirStage, name)
+        try:
+            os.symlink(os.path.relpath(source, dirStage), target, target_is_directory=True)
+        except (OSError, NotImplementedError):      # e.g. Windows without symlink privilege
+            shutil.copytree(source, target)
+
+def create_stage(dirHap, params, inputForm, name, inputFifo=False):
+    """creates '<dirHap>/runs/<name>-<time>[-n]' atomically: it is filled under a temporary name
+    and renamed when complete; a compressed input is staged decompressed (inputFifo: as named pipe);
+    returns the path of the staged folder
+    """
+    dirHap = os.path.abspath(dirHap)
+    dirRuns = os.path.join(dirHap, RUNS_DIR)
+    os.makedirs(dirRuns, exist_ok=True)
+    dirTmp = tempfile.mkdtemp(prefix='.tmp-', dir=dirRuns)
+    try:
+        base = (name + '-' if name else '') + time.strftime('%Y%m%d-%H%M%S')
+        # relative names are identical for the temporary and the final folder (same parent)
+        paramsStage = stage_parameters(params, dirHap, dirTmp)
+        source = input_source(params, dirHap)
+        if os.path.isfile(source) and Core_Input.compression(source) is not None:
+            paramsStage['FILENAME_INPUT'] = stage_input(source, dirTmp, inputFifo)
+        Core_Params.write_parameters(os.path.join(dirTmp, "parameters" + inputForm), paramsStage)
+        link_shared(dirHap, dirTmp)
+        n = 0
+        while True:
+            dirStage = os.path.join(dirRuns, base + ('-' + str(n) if n else ''))
+            try:
+                os.rename(dirTmp, dirStage)     # fails if a (non-empty) folder of that name exists
+                return dirStage
+            except OSError:
+                if not os.path.exists(dirStage):
+                    raise
+            n += 1
+    except BaseException:
+        shutil.rmtree(dirTmp, ignore_errors=True)
+        raise
+
+def remove_stage(dirStage):
+    """removes a staged folder (links are removed, not followed)
+    """
+    shutil.rmtree(dirStage, ignore_errors=True)
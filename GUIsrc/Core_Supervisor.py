@@ -0,0 +1,1067 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+Core_Supervisor.py
+Run supervisor: a detached local process owning the Hapl-o-Mat runs of one Hapl-o-Mat folder,
+so that runs survive restarts of the GUI; local job API (JSON-RPC 2.0) over a Unix domain socket
+and optionally localhost HTTP, job states saved to disk (no GUI dependencies)
+
+@author: Ute Solloch
+'''
+
+# import modules:
+import os
+import sys
+import json
+import time
+import codecs
+import socket
+import hashlib
+import tempfile
+import threading
+import traceback
+import subprocess
+import socketserver
+import secrets
+import http.server
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+
+# import own modules
+import Core_Params, Core_Run, Core_Scheduler, Core_Cache, Core_Limits, Core_Telemetry, Core_Results, Core_Input
+
+
+# folder of the supervisor in the Hapl-o-Mat folder: socket, lock, job states and its own log
+SUPERVISOR_DIR = 'supervisor'
+SOCKET_FILE = 'supervisor.sock'
+LOCK_FILE = 'supervisor.lock'
+STATE_FILE = 'jobs.json'
+LOG_FILE = 'supervisor.log'
+# port and access token of the HTTP job API (readable by the current user only)
+HTTP_FILE = 'http.json'
+# largest HTTP request body (bytes)
+MAX_REQUEST_SIZE = 1024*1024
+# longest socket path accepted by the system (sun_path)
+MAX_SOCKET_PATH = 100
+# seconds between two scheduling steps, without active jobs and requests before the supervisor exits,
+# to wait for a starting supervisor and for a reply
+TICK_INTERVAL = 0.5
+IDLE_TIMEOUT = 600
+START_TIMEOUT = 10
+REQUEST_TIMEOUT = 30
+# seconds between two updates of a followed job, failed requests before its supervisor is taken as gone
+FOLLOW_INTERVAL = 0.2
+MAX_FAILURES = 5
+# ended jobs kept in the job states
+KEEP_ENDED = 100
+ENDED_STATES = ('finished', 'cancelled', 'killed', 'error')
+# errors of a request reported to the client
+REQUEST_ERRORS = (ValueError, KeyError, IndexError, Core_Params.ParameterError) + Core_Input.READ_ERRORS
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+JOB_ERROR = -32000
+
+
+class SupervisorError(Exception):
+    """request refused by the supervisor or supervisor not reachable
+    """
+    pass
+
+
+def available():
+    """runs can be handed over to a supervisor (Unix domain sockets and file locks)
+    """
+    return hasattr(socket, 'AF_UNIX') and fcntl is not None
+
+def supervisor_dir(dirHap):
+    return os.path.join(os.path.abspath(dirHap), SUPERVISOR_DIR)
+
+def socket_path(dirHap):
+    """socket of the supervisor of a Hapl-o-Mat folder; in the temporary folder if the path is too long
+    """
+    path = os.path.join(supervisor_dir(dirHap), SOCKET_FILE)
+    if len(path) <= MAX_SOCKET_PATH:
+        return path
+    digest = hashlib.sha1(os.path.abspath(dirHap).encode('UTF-8')).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), 'haplomat-' + str(os.getuid()) + '-' + digest + '.sock')
+
+def rpc_error(code, message, requestId=None):
+    return {'jsonrpc': '2.0', 'error': {'code': code, 'message': message}, 'id': requestId}
+
+# checks of request parameters: TypeError (answered with INVALID_PARAMS) for a wrong type
+def int_param(name, value, optional=False):
+    """integer of a request (also given as integral number or text), None if optional and missing
+    """
+    if value is None and optional:
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise TypeError(name + ' must be an integer')
+    if isinstance(value, bool) or (isinstance(value, float) and value != number):
+        raise TypeError(name + ' must be an integer')
+    return number
+
+def number_param(name, value, optional=False):
+    if value is None and optional:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TypeError(name + ' must be a number')
+    return value
+
+def bool_param(name, value):
+    if not isinstance(value, bool):
+        raise TypeError(name + ' must be true or false')
+    return value
+
+def str_param(name, value, optional=True):
+    if value is None and optional:
+        return None
+    if not isinstance(value, str):
+        raise TypeError(name + ' must be a string')
+    return value
+
+def dict_param(name, value, optional=False):
+    if value is None and optional:
+        return None
+    if not isinstance(value, dict):
+        raise TypeError(name + ' must be an object')
+    return value
+
+def parameters_param(value):
+    """Hapl-o-Mat parameters of a request: object of texts or numbers
+    """
+    for key, entry in dict_param('parameters', value).items():
+        if isinstance(entry, bool) or not isinstance(entry, (str, int, float)):
+            raise TypeError('parameter ' + key + ' must be a string or a number')
+    return value
+
+def limits_param(value):
+    """run limits of a request as dict of Core_Limits.RunLimits, None for no limits
+    """
+    if dict_param('limits', value, optional=True) is None:
+        return None
+    cpus = value.get('cpus')
+    if cpus is not None:
+        if not isinstance(cpus, list):
+            raise TypeError('limits.cpus must be a list of CPU numbers')
+        cpus = [int_param('limits.cpus', cpu) for cpu in cpus]
+    return {'memory': int_param('limits.memory', value.get('memory'), True),
+            'addressSpace': int_param('limits.addressSpace', value.get('addressSpace'), True),
+            'wallTime': number_param('limits.wallTime', value.get('wallTime'), True),
+            'cpus': cpus,
+            'nice': int_param('limits.nice', value.get('nice'), True)}
+
+def job_entry(job, tag=None):
+    """JSON description of a job: state, everything needed to restart it and to follow its files
+    """
+    run = job.run
+    nEps = len(run.epsTail)
+    return {
+        'jobID': job.jobId,
+        'tag': tag,
+        'state': job.state,
+        'priority': job.priority,
+        'runID': run.runID,
+        'inputFormat': run.inputForm,
+        'parameters': run.params,
+        'log': run.pathLog,
+        'forceRun': run.forceRun,
+        'cache': run.cache is not None,
+        'inputFifo': run.inputFifo,
+        'limits': run.limits.to_dict() if run.limits is not None else None,
+        'exitCode': run.exitCode,
+        'exitStatus': run.exitStatus,
+        'cached': run.cached,
+        'killReason': run.killReason,
+        'error': run.error,
+        'start': run.startTime,
+        'end': run.endTime,
+        'pauses': run.suspended,
+        'iterations': nEps,
+        'epsilon': Core_Run.finite(run.epsTail.epsilon[-1]) if nEps else None
+    }
+
+
+class Supervisor(object):
+    """owns the job queue of one Hapl-o-Mat folder: answers requests, drives the scheduler
+    and saves the job states after every change; queued jobs are taken over after a restart,
+    jobs that were running when the supervisor ended are reported as lost
+    """
+    methods = ('ping', 'submit', 'jobs', 'job', 'progress', 'result', 'cancel', 'pause', 'resume', 'set_priority',
+               'configure', 'shutdown')
+    # methods reading files or preparing runs, answered without blocking the scheduler; they lock themselves
+    unlocked = ('submit', 'result', 'cancel', 'pause', 'resume', 'set_priority', 'configure')
+
+    def __init__(self, dirHap, maxJobs=None, memoryBudget=None, idleTimeout=IDLE_TIMEOUT):
+        """constructor
+        """
+        self.dirHap = os.path.abspath(dirHap)
+        self.dirState = supervisor_dir(dirHap)
+        os.makedirs(self.dirState, exist_ok=True)
+        self.pathState = os.path.join(self.dirState, STATE_FILE)
+        self.scheduler = Core_Scheduler.Scheduler(maxJobs, memoryBudget)
+        self.cache = Core_Cache.default_cache(self.dirHap)
+        self.idleTimeout = idleTimeout
+        self.lock = threading.RLock()
+        self.saveLock = threading.Lock()     # one writer of the job states at a time
+        self.tags = {}          # jobId -> tag of the client that submitted the job
+        self.ended = []         # entries of jobs ended before this supervisor was started
+        self.lastActive = time.time()
+        self.stopping = False
+
+    def restore(self):
+        """takes over the saved job states of a previous supervisor
+        """
+        try:
+            with open(self.pathState, 'r') as fState:
+                entries = json.load(fState)
+        except (OSError, ValueError):
+            return
+        for entry in sorted(entries, key=lambda entry: entry['jobID']):
+            if entry['state'] == 'queued':
+                self.scheduler.nextId = entry['jobID']
+                try:
+                    self.add_job(entry['parameters'], entry['inputFormat'], entry['log'], entry['priority'],
+                                 entry['forceRun'], entry['inputFifo'], entry['limits'], entry['tag'], entry['cache'])
+                except REQUEST_ERRORS:
+                    pass
+                continue
+            if entry['state'] not in ENDED_STATES:
+                entry['state'] = 'error'
+                entry['error'] = 'run lost: the supervisor ended while it was running'
+            self.ended.append(entry)
+            self.scheduler.nextId = max(self.scheduler.nextId, entry['jobID'] + 1)
+        self.ended = self.ended[-KEEP_ENDED:]
+
+    def save(self):
+        """writes the states of all jobs (temporary file, then renamed); the scheduler is only locked
+        while the states are collected
+        """
+        pathTmp = self.pathState + '.tmp'
+        with self.saveLock:
+            with self.lock:
+                entries = self.entries()
+            try:
+                with open(pathTmp, 'w') as fState:
+                    json.dump(entries, fState)
+                os.replace(pathTmp, self.pathState)
+            except OSError as e:
+                print('Job states not saved: ' + str(e), file=sys.stderr)
+
+    def entries(self):
+        return self.ended + [job_entry(job, self.tags.get(job.jobId)) for job in self.scheduler.jobs]
+
+    def add_job(self, params, inputForm, pathLog, priority=0, forceRun=False, inputFifo=False, limits=None, tag=None,
+                cache=True, jobId=None):
+        """prepares the run (input format, memory estimate) without the lock and queues it
+        """
+        Core_Params.check_parameters(params)
+        run = Core_Run.HaplomatRun(self.dirHap, params, inputForm, pathLog)
+        run.cache = self.cache if cache else None
+        run.forceRun = forceRun
+        run.inputFifo = inputFifo
+        run.limits = Core_Limits.RunLimits.from_dict(limits) if limits is not None else None
+        run.recordHistory = True
+        memory = Core_Scheduler.estimate_memory(run)
+        with self.lock:
+            job = self.scheduler.submit(run, memory, priority, jobId)
+            self.tags[job.jobId] = tag
+        return job
+
+    def tick(self):
+        """one scheduling step; saves the job states if a state changed
+        """
+        with self.lock:
+            changed = self.scheduler.tick()
+            if not self.scheduler.is_idle():
+                self.lastActive = time.time()
+        if changed:
+            self.save()
+
+    def dispatch(self, request):
+        """answers a JSON-RPC 2.0 request or batch of requests; None for notifications
+        """
+        if isinstance(request, list):
+            if not request:
+                return rpc_error(INVALID_REQUEST, 'empty batch')
+            responses = [response for response in map(self.handle, request) if response is not None]
+            return responses or None
+        return self.handle(request)
+
+    def handle(self, request):
+        """answers one JSON-RPC 2.0 request with its result or error, None for a notification (no id)
+        """
+        if not isinstance(request, dict) or request.get('jsonrpc') != '2.0' or not isinstance(request.get('method'), str):
+            return rpc_error(INVALID_REQUEST, 'invalid request')
+        requestId = request.get('id')
+        method = request['method']
+        params = request.get('params', {})
+        if method not in self.methods:
+            response = rpc_error(METHOD_NOT_FOUND, 'unknown method: ' + method, requestId)
+        elif not isinstance(params, (dict, list)):
+            response = rpc_error(INVALID_PARAMS, 'params must be an object or an array', requestId)
+        else:
+            try:
+                result = self.call(method, params)
+            except TypeError as e:
+                response = rpc_error(INVALID_PARAMS, str(e), requestId)
+            except REQUEST_ERRORS + (SupervisorError,) as e:
+                response = rpc_error(JOB_ERROR, str(e), requestId)
+            except Exception as e:      # logged, the supervisor keeps serving
+                traceback.print_exc()
+                response = rpc_error(INTERNAL_ERROR, 'internal error: ' + str(e), requestId)
+            else:
+                response = {'jsonrpc': '2.0', 'result': result, 'id': requestId}
+        return response if 'id' in request else None
+
+    def call(self, method, params):
+        function = getattr(self, method)
+        args, kwargs = (params, {}) if isinstance(params, list) else ([], params)
+        self.lastActive = time.time()
+        if method in self.unlocked:
+            return function(*args, **kwargs)
+        with self.lock:
+            return function(*args, **kwargs)
+
+    # requests
+    def ping(self):
+        return {'pid': os.getpid(), 'haplomat': self.dirHap, 'jobs': len(self.scheduler.jobs),
+                'maxJobs': self.scheduler.maxJobs, 'memoryBudget': self.scheduler.memoryBudget}
+
+    def configure(self, maxJobs=None, memoryBudget=None):
+        """changes the concurrent runs and the memory budget (bytes, 0: no budget) of the scheduler
+        shared by all clients; None leaves a setting unchanged
+        """
+        maxJobs = int_param('maxJobs', maxJobs, True)
+        memoryBudget = int_param('memoryBudget', memoryBudget, True)
+        if maxJobs is not None and maxJobs < 1:
+            raise ValueError('maxJobs must be at least 1')
+        with self.lock:
+            if maxJobs is not None:
+                self.scheduler.maxJobs = maxJobs
+            if memoryBudget is not None:
+                self.scheduler.memoryBudget = memoryBudget if memoryBudget > 0 else None
+        self.tick()
+        return True
+
+    def submit(self, parameters, input=None, inputFormat=None, resultDir='results', runID=None, log=None, priority=0,
+               forceRun=False, inputFifo=False, limits=None, tag=None, cache=True):
+        """queues a run and starts it at once if a core is free; returns the job ID.
+        parameters: Hapl-o-Mat parameters, completed by Core_Params.job_parameters with the input file,
+        defaults and result files in resultDir named after runID (default: 'job<ID>');
+        inputFormat 'MAC' or 'GLSC' (default: detected), log: log file (default: next to the results).
+        All parameters are checked before the job is queued
+        """
+        parameters = parameters_param(parameters)
+        input, resultDir, runID, log, tag = [str_param(name, value) for name, value in
+                                             (('input', input), ('resultDir', resultDir), ('runID', runID),
+                                              ('log', log), ('tag', tag))]
+        if str_param('inputFormat', inputFormat) not in (None, 'MAC', 'GLSC'):
+            raise TypeError("inputFormat must be 'MAC' or 'GLSC'")
+        if resultDir is None:
+            raise TypeError('resultDir must be a string')
+        priority = int_param('priority', priority)
+        forceRun, inputFifo, cache = [bool_param(name, value) for name, value in
+                                      (('forceRun', forceRun), ('inputFifo', inputFifo), ('cache', cache))]
+        limits = limits_param(limits)
+        with self.lock:
+            jobId = self.scheduler.nextId       # reserved, the run is prepared without the lock
+            self.scheduler.nextId += 1
+        if runID is None:
+            runID = 'job' + str(jobId)
+        params = Core_Params.job_parameters(parameters, input, resultDir, runID)
+        paths = Core_Params.absolute_paths(params, self.dirHap)
+        for key in Core_Params.OUTPUT_KEYS:
+            os.makedirs(os.path.dirname(paths[key]), exist_ok=True)
+        job = self.add_job(params, inputFormat, log, priority, forceRun, inputFifo, limits, tag, cache, jobId)
+        self.tick()
+        self.save()
+        return job.jobId
+
+    def jobs(self, tag=None, jobIds=None):
+        tag = str_param('tag', tag)
+        if jobIds is not None:
+            if not isinstance(jobIds, list):
+                raise TypeError('jobIds must be a list of job IDs')
+            jobIds = [int_param('jobIds', jobId) for jobId in jobIds]
+        return [entry for entry in self.entries() if (tag is None or entry['tag'] == tag)
+                and (jobIds is None or entry['jobID'] in jobIds)]
+
+    def job(self, jobId):
+        jobId = int_param('jobId', jobId)
+        for entry in self.entries():
+            if entry['jobID'] == jobId:
+                return entry
+        raise SupervisorError('no job ' + str(jobId))
+
+    def progress(self, jobId):
+        """iterations, current epsilon and log-likelihood, memory and CPU time of a job
+        """
+        jobId = int_param('jobId', jobId)
+        job = self.scheduler.job(jobId)
+        if job is None:
+            entry = self.job(jobId)
+            return {'jobID': jobId, 'state': entry['state'], 'iterations': entry['iterations'],
+                    'epsilon': entry['epsilon'], 'logL': None, 'rss': None, 'peakRss': None, 'cpuTime': None,
+                    'runningTime': None, 'pausedTime': None}
+        run = job.run
+        nEps = len(run.epsTail)
+        values = run.resource_series().snapshot()
+        last = values[-1] if len(values) else None
+        return {
+            'jobID': jobId,
+            'state': job.state,
+            'iterations': nEps,
+            'epsilon': Core_Run.finite(run.epsTail.epsilon[-1]) if nEps else None,
+            'logL': Core_Run.finite(run.epsTail.logL[-1]) if nEps else None,
+            'rss': int(last[1]) if last is not None else None,
+            'peakRss': int(values[:, 2].max()) if last is not None else None,
+            'cpuTime': float(last[3]) if last is not None else None,
+            'runningTime': run.active_time(),
+            'pausedTime': run.paused_time()
+        }
+
+    def result(self, jobId):
+        """statistics of a finished job as shown in the results frame of the GUI, and its files
+        """
+        jobId = int_param('jobId', jobId)
+        with self.lock:
+            entry = self.job(jobId)
+        if entry['state'] != 'finished':
+            raise SupervisorError('job ' + str(jobId) + ' is ' + entry['state'])
+        files = Core_Params.absolute_paths(entry['parameters'], self.dirHap)
+        files = dict((key, files[key]) for key in Core_Params.PATH_KEYS)
+        return {
+            'jobID': jobId,
+            'runID': entry['runID'],
+            'cached': entry['cached'],
+            'statistics': Core_Results.run_statistics(files['FILENAME_HAPLOTYPEFREQUENCIES'], entry['log']),
+            'files': files,
+            'log': entry['log'],
+            'resources': os.path.join(os.path.dirname(entry['log']),
+                                      (entry['runID'] + "_" if entry['runID'] != "" else "") + 'resources.dat')
+        }
+
+    def cancel(self, jobId):
+        return self.change(self.scheduler.cancel, int_param('jobId', jobId))
+
+    def pause(self, jobId):
+        return self.change(self.scheduler.pause, int_param('jobId', jobId))
+
+    def resume(self, jobId):
+        return self.change(self.scheduler.resume, int_param('jobId', jobId))
+
+    def set_priority(self, jobId, priority):
+        return self.change(self.scheduler.set_priority, int_param('jobId', jobId), int_param('priority', priority))
+
+    def change(self, function, *args):
+        with self.lock:
+            done = function(*args)
+        self.tick()
+        return done
+
+    def shutdown(self, cancel=False):
+        """ends the supervisor when its jobs have ended; cancel: cancels all jobs first
+        """
+        if bool_param('cancel', cancel):
+            self.scheduler.cancel_all()
+        elif not self.scheduler.is_idle():
+            raise SupervisorError('jobs are active, cancel them or shut down with cancel')
+        self.stopping = True
+        return True
+
+    def serve(self, httpPort=None):
+        """serves requests until shut down or idle for idleTimeout seconds;
+        False if another supervisor owns the Hapl-o-Mat folder.
+        httpPort: also serves the job API over HTTP on localhost (0: any free port)
+        """
+        fLock = open(os.path.join(self.dirState, LOCK_FILE), 'w')
+        try:
+            fcntl.flock(fLock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fLock.close()
+            return False
+        path = socket_path(self.dirHap)
+        if os.path.exists(path):     # left behind by a supervisor that did not end regularly
+            os.remove(path)
+        server = SupervisorServer(path, self)
+        worker = threading.Thread(target=server.serve_forever, daemon=True)
+        httpServer = None
+        try:
+            self.restore()
+            worker.start()
+            if httpPort is not None:
+                httpServer = self.start_http(httpPort)
+            while True:
+                try:
+                    self.tick()
+                except Exception:       # logged; a failing step must not end the supervised runs
+                    traceback.print_exc()
+                with self.lock:
+                    idle = self.scheduler.is_idle()
+                    if idle and (self.stopping or time.time() - self.lastActive > self.idleTimeout):
+                        break
+                time.sleep(TICK_INTERVAL)
+        finally:
+            if httpServer is not None:
+                httpServer.shutdown()
+                httpServer.server_close()
+                try:
+                    os.remove(os.path.join(self.dirState, HTTP_FILE))
+                except OSError:
+                    pass
+            if worker.is_alive():
+                server.shutdown()
+            server.server_close()
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self.save()
+            fLock.close()
+        return True
+
+
+    def start_http(self, port):
+        """serves the job API on localhost:port in a worker thread; port and access token
+        are written to HTTP_FILE in the supervisor folder
+        """
+        httpServer = HTTPServer(('127.0.0.1', port), self, secrets.token_urlsafe(32))
+        threading.Thread(target=httpServer.serve_forever, daemon=True).start()
+        pathHttp = os.path.join(self.dirState, HTTP_FILE)
+        fd = os.open(pathHttp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as fHttp:
+            json.dump({'port': httpServer.server_address[1], 'token': httpServer.token}, fHttp)
+        return httpServer
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """one connection: a JSON-RPC request per line, answered by a JSON line
+    """
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line.decode('UTF-8'))
+            except ValueError as e:
+                response = rpc_error(PARSE_ERROR, 'parse error: ' + str(e))
+            else:
+                response = self.server.supervisor.dispatch(request)
+            if response is not None:
+                self.wfile.write(json.dumps(response).encode('UTF-8') + b'\n')
+
+
+class HTTPRequestHandler(http.server.BaseHTTPRequestHandler):
+    """JSON-RPC request in the body of a POST, authorized by the token of the supervisor
+    """
+    def do_POST(self):
+        if not secrets.compare_digest(self.headers.get('Authorization', ''), 'Bearer ' + self.server.token):
+            self.send_error(401)
+            return
+        try:
+            length = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            self.send_error(411)
+            return
+        if length > MAX_REQUEST_SIZE:
+            self.send_error(413)
+            return
+        try:
+            request = json.loads(self.rfile.read(length).decode('UTF-8'))
+        except ValueError as e:
+            response = rpc_error(PARSE_ERROR, 'parse error: ' + str(e))
+        else:
+            response = self.server.supervisor.dispatch(request)
+        if response is None:
+            self.send_response(204)
+            self.end_headers()
+            return
+        data = json.dumps(response).encode('UTF-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HTTPServer(http.server.ThreadingHTTPServer):
+    """localhost HTTP server of the job API
+    """
+    daemon_threads = True
+
+    def __init__(self, address, supervisor, token):
+        """constructor
+        """
+        self.supervisor = supervisor
+        self.token = token
+        super().__init__(address, HTTPRequestHandler)
+
+
+class SupervisorServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """threaded Unix domain socket server, accessible to the current user only
+    """
+    address_family = getattr(socket, 'AF_UNIX', None)
+    daemon_threads = True
+
+    def __init__(self, path, supervisor):
+        """constructor
+        """
+        self.supervisor = supervisor
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, RequestHandler)
+        finally:
+            os.umask(umask)
+
+
+class SupervisorClient(object):
+    """requests to the supervisor of a Hapl-o-Mat folder, one connection per request
+    """
+    def __init__(self, dirHap, timeout=REQUEST_TIMEOUT):
+        """constructor
+        """
+        self.dirHap = os.path.abspath(dirHap)
+        self.path = socket_path(dirHap)
+        self.timeout = timeout
+        self.nextId = 1
+
+    def call(self, method, **params):
+        """result of a request; raises SupervisorError if it is refused, OSError if the supervisor is not reachable
+        """
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            request = {'jsonrpc': '2.0', 'method': method, 'params': params, 'id': self.nextId}
+            self.nextId += 1
+            sock.sendall(json.dumps(request).encode('UTF-8') + b'\n')
+            data = b''
+            while not data.endswith(b'\n'):
+                chunk = sock.recv(65536)
+                if not chunk:
+                    raise OSError('connection closed by the supervisor')
+                data += chunk
+        response = json.loads(data.decode('UTF-8'))
+        if 'error' in response:
+            raise SupervisorError(response['error']['message'])
+        return response['result']
+
+    def submit(self, **params):
+        """job ID of a submitted run; a submit that timed out while the supervisor was busy is still
+        being prepared, the job is then looked for by its tag and log file (log required) for another timeout
+        """
+        known = set(entry['jobID'] for entry in self.call('jobs', tag=params.get('tag')))
+        try:
+            return self.call('submit', **params)
+        except socket.timeout:
+            deadline = time.time() + self.timeout
+            while True:
+                entries = [entry for entry in self.call('jobs', tag=params.get('tag'))
+                           if entry['jobID'] not in known and entry['log'] == params['log']]
+                if entries:
+                    return entries[-1]['jobID']
+                if time.time() > deadline:
+                    raise
+                time.sleep(FOLLOW_INTERVAL)
+
+    def is_running(self):
+        try:
+            self.call('ping')
+        except (OSError, ValueError, SupervisorError):
+            return False
+        return True
+
+
+def start_supervisor(dirHap, timeout=START_TIMEOUT):
+    """client of the supervisor of a Hapl-o-Mat folder; the supervisor is started as detached process if needed
+    """
+    client = SupervisorClient(dirHap)
+    if client.is_running():
+        return client
+    os.makedirs(supervisor_dir(dirHap), exist_ok=True)
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'HaplomatSupervisor.py')
+    with open(os.path.join(supervisor_dir(dirHap), LOG_FILE), 'a') as fLog:
+        subprocess.Popen([sys.executable, script, '--haplomat', client.dirHap], cwd=supervisor_dir(dirHap),
+                         stdin=subprocess.DEVNULL, stdout=fLog, stderr=subprocess.STDOUT, start_new_session=True)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if client.is_running():
+            return client
+        time.sleep(0.1)
+    raise SupervisorError('run supervisor not started, see ' + os.path.join(supervisor_dir(dirHap), LOG_FILE))
+
+
+class FileTail(object):
+    """text appended to a file since the last read; the file may not exist yet
+    """
+    def __init__(self, path):
+        """constructor
+        """
+        self.path = path
+        self.offset = 0
+        self.partial = ''
+        self.decoder = codecs.getincrementaldecoder('UTF-8')('replace')
+
+    def read(self):
+        try:
+            with open(self.path, 'rb') as fTail:
+                if os.fstat(fTail.fileno()).st_size < self.offset:      # file was recreated
+                    self.offset = 0
+                    self.partial = ''
+                fTail.seek(self.offset)
+                data = fTail.read()
+        except OSError:
+            return ''
+        self.offset += len(data)
+        return self.decoder.decode(data)
+
+    def read_lines(self):
+        """complete lines appended since the last read
+        """
+        lines = (self.partial + self.read()).split('\n')
+        self.partial = lines.pop()
+        return lines
+
+
+class SupervisedRun(Core_Run.HaplomatRun):
+    """run owned by the supervisor, followed through its job entry and its log, epsilon and resource files;
+    offers the interface of Core_Run.HaplomatRun for displaying a run (started by the supervisor)
+    """
+    def __init__(self, client, entry, listener=None):
+        """constructor
+        """
+        super().__init__(client.dirHap, entry['parameters'], entry['inputFormat'], entry['log'], listener)
+        self.client = client
+        self.jobId = entry['jobID']
+        self.entry = entry
+        self.logTail = FileTail(self.pathLog)
+        self.resourceTail = FileTail(self.resource_path())
+        self.series = Core_Telemetry.ResourceSeries()
+        self.latest = entry     # latest job entry, taken over by poll()
+        self.failures = 0       # requests in a row that could not reach the supervisor
+        self.followed = False   # job entry and files are read in the background (own thread or RemoteScheduler)
+        self.follower = None
+        self.update(entry)
+
+    def update(self, entry):
+        """takes over the job entry of the supervisor
+        """
+        if self.startTime is None and entry['start'] is not None:
+            self.epsTail.reset()        # values of an earlier run with the same files
+        self.entry = entry
+        self.startTime = entry['start']
+        self.endTime = entry['end']
+        self.cached = entry['cached']
+        self.killReason = entry['killReason']
+        self.suspended = entry['pauses']
+        if entry['error'] is not None:
+            self.error = entry['error']
+
+    def refresh(self):
+        self.latest = self.client.call('job', jobId=self.jobId)
+        self.update(self.latest)
+
+    def check(self):
+        """fetches the job entry; a busy supervisor (timeout) is asked again at the next check,
+        a supervisor that cannot be reached MAX_FAILURES times in a row ends the run with an error
+        """
+        try:
+            entry = self.client.call('job', jobId=self.jobId)
+        except socket.timeout:
+            return
+        except (OSError, ValueError, SupervisorError) as e:
+            self.fail(e)
+            return
+        self.receive(entry)
+
+    def receive(self, entry):
+        self.latest = entry
+        self.failures = 0
+
+    def fail(self, error):
+        self.failures += 1
+        if self.failures >= MAX_FAILURES:
+            self.latest = dict(self.latest, state='error', error='run supervisor not reachable: ' + str(error))
+
+    def start_following(self, interval=FOLLOW_INTERVAL):
+        """checks the job and reads its files in a background thread until it has ended,
+        so that poll() does not wait for the supervisor
+        """
+        self.followed = True
+        self.follower = threading.Thread(target=self.follow_job, args=(interval,), daemon=True)
+        self.follower.start()
+
+    def follow_job(self, interval):
+        while True:
+            self.check()
+            self.follow()
+            if self.latest['state'] in ENDED_STATES:
+                break
+            time.sleep(interval)
+
+    def follow(self):
+        """passes new log text to the listener and takes over new resource samples
+        """
+        if self.latest['start'] is None:        # files of the run not created yet
+            return
+        text = self.logTail.read()
+        if text and self.listener is not None:
+            self.listener(text)
+        for line in self.resourceTail.read_lines():
+            row = Core_Telemetry.parse_line(line)
+            if row is not None:
+                self.series.append(row)
+
+    def resource_series(self):
+        return self.series
+
+    def start(self):
+        raise SupervisorError('supervised runs are started by the supervisor')
+
+    def poll(self):
+        """exit code if the job has ended, None otherwise; a run whose supervisor is gone is ended with an error.
+        While the run is followed in the background, only the latest job entry is looked at
+        """
+        if self.exitCode is not None:
+            return self.exitCode
+        if not self.followed:
+            self.check()
+            self.follow()
+        self.update(self.latest)
+        if self.entry['state'] not in ENDED_STATES:
+            return None
+        if self.follower is not None:
+            self.follower.join()        # last log text
+        self.epsTail.poll(final=True)
+        self.exitStatus = self.entry['exitStatus'] if self.entry['exitStatus'] is not None else 1
+        self.exitCode = self.entry['exitCode'] if self.entry['exitCode'] is not None else -1
+        return self.exitCode
+
+    def request(self, method):
+        """sends a job request (cancel, pause, resume) and takes over the new job state
+        """
+        try:
+            done = self.client.call(method, jobId=self.jobId)
+            self.refresh()
+        except (OSError, ValueError, SupervisorError):
+            return False
+        return done
+
+    def kill(self):
+        self.request('cancel')
+
+    def pause(self):
+        return self.request('pause')
+
+    def resume(self):
+        return self.request('resume')
+
+    def end_state(self):
+        return self.state
+
+    @property
+    def state(self):
+        state = self.entry['state']
+        if state == 'queued':
+            return 'created'
+        if state == 'suspended':
+            return 'paused'
+        return state
+
+
+class RemoteJob(object):
+    """job of the supervisor as seen by a client, with the interface of Core_Scheduler.Job
+    """
+    def __init__(self, run):
+        """constructor
+        run: SupervisedRun following the job
+        """
+        self.jobId = run.jobId
+        self.run = run
+
+    @property
+    def priority(self):
+        return self.run.entry['priority']
+
+    @property
+    def error(self):
+        return self.run.error
+
+    @property
+    def state(self):
+        return self.run.entry['state']
+
+    def is_active(self):
+        return self.state in Core_Scheduler.ACTIVE_STATES
+
+
+class RemoteScheduler(object):
+    """the scheduler of the supervisor as used by one client, with the interface of Core_Scheduler.Scheduler:
+    runs are submitted with the tag of the client and share the cores with all other jobs of the supervisor.
+    The entries of the active jobs are fetched in a background thread, tick() only takes them over
+    """
+    def __init__(self, client, tag, interval=FOLLOW_INTERVAL):
+        """constructor
+        """
+        self.client = client
+        self.tag = tag
+        self.interval = interval
+        settings = client.call('ping')
+        self.settings = {'maxJobs': settings['maxJobs'], 'memoryBudget': settings['memoryBudget']}
+        self.jobs = []
+        self.states = {}
+        self.poller = threading.Thread(target=self.fetch_jobs, daemon=True)
+        self.poller.start()
+
+    @property
+    def maxJobs(self):
+        return self.settings['maxJobs']
+
+    @maxJobs.setter
+    def maxJobs(self, value):
+        self.configure(maxJobs=value)
+
+    @property
+    def memoryBudget(self):
+        return self.settings['memoryBudget']
+
+    @memoryBudget.setter
+    def memoryBudget(self, value):
+        self.configure(memoryBudget=value if value is not None else 0)
+
+    def configure(self, **settings):
+        """changes settings of the supervisor's scheduler (see Supervisor.configure)
+        """
+        try:
+            self.client.call('configure', **settings)
+            settings = self.client.call('ping')
+        except (OSError, ValueError, SupervisorError):
+            return False
+        self.settings = {'maxJobs': settings['maxJobs'], 'memoryBudget': settings['memoryBudget']}
+        return True
+
+    def fetch_jobs(self):
+        """takes over the entries of the active jobs and reads their files until the program ends
+        """
+        while True:
+            time.sleep(self.interval)
+            runs = [job.run for job in list(self.jobs) if job.run.latest['state'] not in ENDED_STATES]
+            if not runs:
+                continue
+            try:
+                entries = self.client.call('jobs', tag=self.tag, jobIds=[run.jobId for run in runs])
+            except socket.timeout:      # busy supervisor
+                continue
+            except (OSError, ValueError, SupervisorError) as e:
+                for run in runs:
+                    run.fail(e)
+                continue
+            entries = dict((entry['jobID'], entry) for entry in entries)
+            for run in runs:
+                if run.jobId in entries:
+                    run.receive(entries[run.jobId])
+                else:
+                    run.fail(SupervisorError('no job ' + str(run.jobId)))
+                run.follow()
+
+    def submit(self, run, memory=None, priority=0):
+        """hands a run (Core_Run.HaplomatRun, not started) over to the supervisor; the memory is estimated there
+        """
+        limits = run.limits.to_dict() if run.limits is not None else None
+        jobId = self.client.submit(parameters=run.params, inputFormat=run.inputForm, log=os.path.abspath(run.pathLog),
+                                   priority=priority, forceRun=run.forceRun, inputFifo=run.inputFifo, limits=limits,
+                                   tag=self.tag, cache=run.cache is not None)
+        supervised = SupervisedRun(self.client, self.client.call('job', jobId=jobId), run.listener)
+        supervised.followed = True
+        job = RemoteJob(supervised)
+        self.jobs.append(job)
+        self.states[jobId] = job.state
+        return job
+
+    def job(self, jobId):
+        for job in self.jobs:
+            if job.jobId == jobId:
+                return job
+        return None
+
+    def is_idle(self):
+        return not any(job.is_active() for job in self.jobs)
+
+    def request(self, method, jobId, **params):
+        try:
+            return self.client.call(method, jobId=jobId, **params)
+        except (OSError, ValueError, SupervisorError):
+            return False
+
+    def set_priority(self, jobId, priority):
+        return self.request('set_priority', jobId, priority=priority)
+
+    def pause(self, jobId):
+        return self.request('pause', jobId)
+
+    def resume(self, jobId):
+        return self.request('resume', jobId)
+
+    def cancel(self, jobId):
+        return self.request('cancel', jobId)
+
+    def cancel_all(self):
+        for job in self.jobs:
+            if job.is_active():
+                self.cancel(job.jobId)
+
+    def tick(self):
+        """takes over the latest job entries and polls the epsilon files of the active jobs;
+        returns the jobs whose state changed since the last tick
+        """
+        for job in self.jobs:
+            if job.run.poll() is None:
+                job.run.epsTail.poll()
+        changed = []
+        for job in self.jobs:
+            state = job.state
+            if self.states.get(job.jobId) != state:
+                self.states[job.jobId] = state
+                changed.append(job)
+        return changed
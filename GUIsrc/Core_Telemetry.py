@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+Core_Telemetry.py
+Resource telemetry of running Hapl-o-Mat processes: RSS, peak RSS, CPU time and I/O bytes
+sampled from /proc/<pid> and saved as time series next to the run log (no GUI dependencies)
+
+@author: Ute Solloch
+'''
+
+# import modules:
+import os
+import time
+import threading
+import numpy as np
+
+
+# seconds between two samples
+SAMPLE_INTERVAL = 1.0
+# columns of a resource time series: seconds since start, bytes, bytes, CPU seconds, bytes, bytes,
+# 1 while the process is stopped (paused run)
+RESOURCE_COLUMNS = ['time', 'rss', 'peakRss', 'cpu', 'readBytes', 'writeBytes', 'stopped']
+# clock ticks per second of the CPU times in /proc/<pid>/stat
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+def available():
+    """process statistics can be read (Linux /proc file system)
+    """
+    return os.path.isfile('/proc/self/stat')
+
+def read_proc(pid):
+    """(rss, peakRss, cpu, readBytes, writeBytes, stopped) of a process, None if it has ended;
+    I/O counters are 0 where /proc/<pid>/io is not readable
+    """
+    dirProc = os.path.join('/proc', str(pid))
+    try:
+        with open(os.path.join(dirProc, 'stat'), 'r') as fStat:
+            fields = fStat.read().rsplit(')', 1)[1].split()
+        memory = {}
+        with open(os.path.join(dirProc, 'status'), 'r') as fStatus:
+            for line in fStatus:
+                if line.startswith(('VmRSS:', 'VmHWM:')):
+                    key, value = line.split(':', 1)
+                    memory[key] = int(value.split()[0]) * 1024
+    except (OSError, IndexError, ValueError):
+        return None
+    if fields[0] == 'Z':        # exited, not reaped yet
+        return None
+    cpu = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    io = {}
+    try:
+        with open(os.path.join(dirProc, 'io'), 'r') as fIO:
+            for line in fIO:
+                key, value = line.split(':', 1)
+                io[key] = int(value)
+    except (OSError, ValueError):
+        pass
+    rss = memory.get('VmRSS', 0)
+    stopped = 1 if fields[0] in ('T', 't') else 0
+    return (rss, memory.get('VmHWM', rss), cpu, io.get('read_bytes', 0), io.get('write_bytes', 0), stopped)
+
+
+class ResourceSeries(object):
+    """resource samples in a growing array, one row per sample (columns RESOURCE_COLUMNS)
+    """
+    def __init__(self, capacity=256):
+        """constructor
+        """
+        self.values = np.empty((capacity, len(RESOURCE_COLUMNS)), dtype=np.float64)
+        self.n = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.n
+
+    def append(self, row):
+        with self.lock:
+            if self.n == len(self.values):
+                values = np.empty((2*len(self.values), len(RESOURCE_COLUMNS)), dtype=np.float64)
+                values[:self.n] = self.values[:self.n]
+                self.values = values
+            self.values[self.n] = row
+            self.n += 1
+
+    def snapshot(self):
+        """copy of the samples so far (rows x RESOURCE_COLUMNS)
+        """
+        with self.lock:
+            return self.values[:self.n].copy()
+
+    def column(self, name):
+        return self.snapshot()[:, RESOURCE_COLUMNS.index(name)]
+
+    def stopped_intervals(self):
+        """(start, end) times of the consecutive samples taken while the process was stopped
+        """
+        values = self.snapshot()
+        intervals = []
+        start = None
+        for t, stopped in zip(values[:, 0], values[:, RESOURCE_COLUMNS.index('stopped')]):
+            if stopped and start is None:
+                start = t
+            elif not stopped and start is not None:
+                intervals.append((start, t))
+                start = None
+        if start is not None:
+            intervals.append((start, values[-1, 0]))
+        return intervals
+
+    def summary(self):
+        """peak memory, CPU time and I/O totals of the last sample, for run reports
+        """
+        values = self.snapshot()
+        if len(values) == 0:
+            return None
+        last = values[-1]
+        return {'samples': len(values), 'peakRss': int(values[:, 2].max()), 'cpuTime': float(last[3]),
+                'readBytes': int(last[4]), 'writeBytes': int(last[5])}
+
+
+class ResourceSampler(object):
+    """samples a process in a worker thread every interval seconds until it ends or stop() is called;
+    every sample is appended to the series and to the file path (tab separated, one line per sample)
+    and passed to the optional watchdog callable (worker thread)
+    """
+    def __init__(self, pid, path=None, interval=SAMPLE_INTERVAL, watchdog=None):
+        """constructor
+        """
+        self.pid = pid
+        self.watchdog = watchdog
+        self.path = path
+        self.interval = interval
+        self.series = ResourceSeries()
+        self.startTime = time.time()
+        self.stopped = threading.Event()
+        self.worker = threading.Thread(target=self.sample_loop, daemon=True)
+        self.worker.start()
+
+    def sample(self, fOut=None):
+        """takes one sample, False if the process has ended
+        """
+        values = read_proc(self.pid)
+        if values is None:
+            return False
+        row = (time.time() - self.startTime,) + values
+        self.series.append(row)
+        if fOut is not None:
+            fOut.write('\t'.join(format_value(v) for v in row) + '\n')
+            fOut.flush()
+        if self.watchdog is not None:
+            self.watchdog(row)
+        return True
+
+    def sample_loop(self):
+        fOut = None
+        if self.path is not None:
+            try:
+                fOut = open(self.path, 'w')
+                fOut.write('#' + '\t'.join(RESOURCE_COLUMNS) + '\n')
+            except OSError:     # the series is still kept in memory
+                fOut = None
+        try:
+            while self.sample(fOut) and not self.stopped.wait(self.interval):
+                pass
+        finally:
+            if fOut is not None:
+                fOut.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.worker.join()
+
+
+def format_value(value):
+    if isinstance(value, float):
+        return '{:.3f}'.format(value)
+    return str(value)
+
+def parse_line(line):
+    """sample of one line of a resource file, None for comments and invalid lines;
+    columns missing in files of older versions are 0
+    """
+    if line.startswith('#') or line.strip() == '':
+        return None
+    sp = line.split('\t')
+    if not 1 < len(sp) <= len(RESOURCE_COLUMNS):
+        return None
+    try:
+        return [float(v) for v in sp] + [0.0]*(len(RESOURCE_COLUMNS) - len(sp))
+    except ValueError:
+        return None
+
+def read_resources(path):
+    """ResourceSeries of a saved resource file (empty if the file is missing)
+    """
+    series = ResourceSeries()
+    try:
+        with open(path, 'r') as fRes:
+            for line in fRes:
+                row = parse_line(line)
+                if row is not None:
+                    series.append(row)
+    except OSError:
+        pass
+    return series
@@ -60,7 +60,7 @@ from PyQt5.QtCore import pyqtSignal, pyqtSlot
 import shutil
 
 # import own modules
-import GUI_miscFeatures
+import GUI_miscFeatures, GUI_Console
 
 
 class CreateDataFrame(QGroupBox):
@@ -101,8 +101,7 @@ class CreateDataFrame(QGroupBox):
         self.setMinimumSize(400,100)
         self.LayoutBuildData = QGridLayout()
         self.labBDInfo = QLabel('Data update may take a few minutes.')
-        self.labOutputBD = QtWidgets.QTextBrowser()
-        self.labOutputBD.setStyleSheet("color: white; background-color: black;")
+        self.labOutputBD = GUI_Console.ConsoleView()
         self.labOutputBD.verticalScrollBar().setStyleSheet('background: grey')
         self.buzyLines = WaitLines()
         self.btnKillProcess =QPushButton("Abort")
@@ -127,6 +126,7 @@ class CreateDataFrame(QGroupBox):
         """
         
         self.labOutputBD.append('Starting download ...')
+        self.consoleBD = GUI_Console.ConsoleBuffer(self.labOutputBD)
         self.currDir_US = os.getcwd()
         try: dirParent
         except NameError:        
@@ -139,7 +139,7 @@ class CreateDataFrame(QGroupBox):
                 if my_path.is_file():
                     self.process = QtCore.QProcess()
                     os.chdir(self.pathBD)   #Win special [15.10.2020]
-                    self.process.readyReadStandardOutput.connect(lambda: self.labOutputBD.append(str(self.process.readAllStandardOutput().data().decode('UTF-8')))) 
+                    self.process.readyReadStandardOutput.connect(lambda: self.consoleBD.feed(self.process.readAllStandardOutput().data())) 
                     self.process.readyReadStandardError.connect(self.handle_stderr) 
                     QtCore.QTimer.singleShot(100, partial(self.process.start, "BuildData.exe"))
                     self.process.waitForStarted()          
@@ -153,7 +153,7 @@ class CreateDataFrame(QGroupBox):
                     if my_path.is_file():
                         self.process = QtCore.QProcess()
                         self.process.setWorkingDirectory(self.pathBD)
-                        self.process.readyReadStandardOutput.connect(lambda: self.labOutputBD.append(str(self.process.readAllStandardOutput().data().decode('UTF-8')))) 
+                        self.process.readyReadStandardOutput.connect(lambda: self.consoleBD.feed(self.process.readAllStandardOutput().data())) 
                         self.process.readyReadStandardError.connect(self.handle_stderr)
                         QtCore.QTimer.singleShot(100, partial(self.process.start, 'python BuildData.py'))
                         self.process.waitForStarted()                        
@@ -172,7 +172,7 @@ class CreateDataFrame(QGroupBox):
                 if my_path.is_file():
                     self.process = QtCore.QProcess()
                     self.process.setWorkingDirectory(self.pathBD)
-                    self.process.readyReadStandardOutput.connect(lambda: self.labOutputBD.append(str(self.process.readAllStandardOutput().data().decode('UTF-8')))) 
+                    self.process.readyReadStandardOutput.connect(lambda: self.consoleBD.feed(self.process.readAllStandardOutput().data())) 
                     self.process.readyReadStandardError.connect(self.handle_stderr)
                     QtCore.QTimer.singleShot(100, partial(self.process.start, 'python BuildData.py'))
                     self.process.waitForStarted()                    
@@ -192,6 +192,7 @@ class CreateDataFrame(QGroupBox):
         if platform.system() == "Windows":
             os.chdir(self.currDir_US)   #Win special [15.10.2020]
         # self.buzy_Close()
+        self.consoleBD.close()
         self.labOutputBD.clear()
         self.labOutputBD.append('exitStatus:' + str(exitStatus))
         if exitStatus == 0:         # Status 0: regular finished
@@ -225,6 +226,7 @@ class CreateDataFrame(QGroupBox):
         """        
         if platform.system() == "Windows":
             os.chdir(self.currDir_US)   #Win special [15.10.2020]
+        self.consoleBD.close()
         stringState = 'noBuild'
         self.stateNoBD.emit(stringState)
         self.buzy_Close()
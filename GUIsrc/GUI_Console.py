@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+GUI_Console.py
+Batched, bounded console for process output with streaming log file
+
+@author: Ute Solloch
+'''
+
+# import modules:
+from PyQt5.QtWidgets import QPlainTextEdit
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtGui import QTextCursor
+import threading
+
+# import own modules
+import Core_Run
+
+
+class ConsoleView(QPlainTextEdit):
+    """read-only console widget; keeps at most maxLines lines (ring limit)
+    """
+    def __init__(self, maxLines=5000, parent=None):
+        """constructor
+        """
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(maxLines)
+        self.setStyleSheet("color: white; background-color: black;")
+
+    def append(self, text):
+        self.appendPlainText(text)
+
+
+class ConsoleBuffer(QObject):
+    """pipeline from process output to a ConsoleView: text arriving via listen() (from any thread)
+    is appended by the GUI thread in batches every interval ms;
+    feed()/write() pass raw output through a Core_Run.OutputLog (decoding and optional log file
+    in a worker thread)
+    """
+    def __init__(self, console, pathLog=None, interval=200, parent=None):
+        """constructor
+        """
+        super().__init__(parent)
+        self.console = console
+        self.pathLog = pathLog
+        self.output = None
+        self.lock = threading.Lock()
+        self.pending = []
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start()
+
+    def listen(self, text):
+        """queues decoded text for display; may be called from any thread
+        """
+        with self.lock:
+            self.pending.append(text)
+
+    def feed(self, data):
+        """hands over a chunk of raw process output (bytes)
+        """
+        if self.output is None:
+            self.output = Core_Run.OutputLog(self.pathLog, self.listen)
+        self.output.feed(data)
+
+    def write(self, text):
+        """adds a message of the GUI itself as separate line(s)
+        """
+        if self.output is None:
+            self.output = Core_Run.OutputLog(self.pathLog, self.listen)
+        self.output.write(text)
+
+    def flush(self):
+        """appends the text collected since the last call to the console (GUI thread)
+        """
+        with self.lock:
+            if not self.pending:
+                return
+            text = ''.join(self.pending)
+            self.pending = []
+        scrollBar = self.console.verticalScrollBar()
+        atBottom = scrollBar.value() >= scrollBar.maximum() - 4
+        cursor = QTextCursor(self.console.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        if atBottom:
+            scrollBar.setValue(scrollBar.maximum())
+
+    def close(self):
+        """waits for all queued output, closes the log file and shows the remaining text
+        """
+        if self.output is not None:
+            self.output.close()
+        self.timer.stop()
+        self.flush()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+GUI_History.py
+Browser of the run history: filter past runs and reopen them without reparsing their statistics
+
+@author: Ute Solloch
+'''
+
+# import modules:
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QPushButton, QLineEdit,
+                             QComboBox, QCheckBox, QDateEdit, QTableWidget, QAbstractItemView, QHeaderView,
+                             QMessageBox)
+from PyQt5.QtCore import QDate, QDateTime, pyqtSignal
+import os, time, sqlite3
+
+# import own modules
+import GUI_Plans
+import Core_History
+
+
+class HistoryWindow(QWidget):
+    """filterable table of the runs recorded in the history of a Hapl-o-Mat folder
+    """
+    runSelected = pyqtSignal(object)     # complete history entry of the run to reopen
+    headers = ['No.', 'RunID', 'State', 'Started', 'Runtime (s)', 'Resolution', 'Input', 'Input hash',
+               'Iterations', 'Final logL', 'Haplotypes', 'Genotypes', 'Sum cut frequencies', 'Cache', 'Kill reason']
+
+    def __init__(self, dirHap):
+        """constructor
+        """
+        super().__init__()
+        self.dirHap = dirHap
+        self.setWindowTitle('Hapl-o-Mat run history')
+        self.resize(1200, 600)
+        layout = QVBoxLayout()
+        grid = QGridLayout()
+        self.textEdit_RunID = QLineEdit()
+        self.textEdit_RunID.setPlaceholderText('e.g. Run* (wildcards *, ?)')
+        self.textEdit_Res = QLineEdit()
+        self.textEdit_Res.setPlaceholderText('e.g. *DRB1:g*')
+        self.textEdit_Hash = QLineEdit()
+        self.textEdit_Hash.setPlaceholderText('beginning of the input hash')
+        self.comboState = QComboBox()
+        self.comboState.addItems(['', 'finished', 'cancelled', 'killed', 'error'])
+        self.checkDate = QCheckBox('Started between')
+        self.dateFrom = QDateEdit(QDate.currentDate().addMonths(-1))
+        self.dateTo = QDateEdit(QDate.currentDate())
+        for dateEdit in (self.dateFrom, self.dateTo):
+            dateEdit.setCalendarPopup(True)
+        grid.addWidget(QLabel('RunID:'), 0, 0)
+        grid.addWidget(self.textEdit_RunID, 0, 1)
+        grid.addWidget(QLabel('Resolution:'), 0, 2)
+        grid.addWidget(self.textEdit_Res, 0, 3)
+        grid.addWidget(QLabel('Input hash:'), 0, 4)
+        grid.addWidget(self.textEdit_Hash, 0, 5)
+        grid.addWidget(QLabel('State:'), 1, 0)
+        grid.addWidget(self.comboState, 1, 1)
+        grid.addWidget(self.checkDate, 1, 2)
+        hboxDate = QHBoxLayout()
+        hboxDate.addWidget(self.dateFrom)
+        hboxDate.addWidget(QLabel('and'))
+        hboxDate.addWidget(self.dateTo)
+        grid.addLayout(hboxDate, 1, 3)
+        btnFilter = QPushButton('Filter')
+        grid.addWidget(btnFilter, 1, 5)
+        layout.addLayout(grid)
+
+        self.tableRuns = QTableWidget(0, len(self.headers), self)
+        self.tableRuns.setHorizontalHeaderLabels(self.headers)
+        self.tableRuns.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tableRuns.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.tableRuns.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tableRuns.verticalHeader().hide()
+        self.tableRuns.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        layout.addWidget(self.tableRuns)
+
+        hboxBtn = QHBoxLayout()
+        self.labCount = QLabel()
+        btnOpen = QPushButton('Open run')
+        hboxBtn.addWidget(self.labCount)
+        hboxBtn.addStretch(1)
+        hboxBtn.addWidget(btnOpen)
+        layout.addLayout(hboxBtn)
+        self.setLayout(layout)
+
+        # Actions
+        btnFilter.clicked.connect(self.refresh)
+        for textEdit in (self.textEdit_RunID, self.textEdit_Res, self.textEdit_Hash):
+            textEdit.returnPressed.connect(self.refresh)
+        btnOpen.clicked.connect(self.open_Run)
+        self.tableRuns.cellDoubleClicked.connect(lambda row, col: self.open_Run())
+        self.refresh()
+        self.show()
+
+    def refresh(self):
+        """fills the table with the runs matching the filters
+        """
+        since = until = None
+        if self.checkDate.isChecked():
+            since = QDateTime(self.dateFrom.date()).toSecsSinceEpoch()
+            until = QDateTime(self.dateTo.date().addDays(1)).toSecsSinceEpoch()
+        try:
+            history = Core_History.RunHistory(Core_History.history_path(self.dirHap))
+            try:
+                rows = history.query(self.textEdit_RunID.text().strip(), self.textEdit_Hash.text().strip(),
+                                     self.textEdit_Res.text().strip(), since, until, self.comboState.currentText())
+                total = len(history)
+            finally:
+                history.close()
+        except sqlite3.Error as e:
+            QMessageBox.about(self, "Error: Run history not readable.", str(e))
+            return
+        self.tableRuns.setSortingEnabled(False)
+        self.tableRuns.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            started = time.strftime('%Y-%m-%d %H:%M', time.localtime(row['startTime'])) if row['startTime'] else ''
+            values = [(row['id'], '{}'), (row['runID'], '{}'), (row['state'], '{}'), (started, '{}'),
+                      (row['duration'], '{:.1f}'), (row['resolution'], '{}'),
+                      (os.path.basename(row['inputFile'] or ''), '{}'), ((row['inputHash'] or '')[:12], '{}'),
+                      (row['iterations'], '{}'), (row['logL'], '{:.6g}'), (row['haplotypes'], '{}'),
+                      (row['genotypes'], '{}'), (row['sumCut'], '{}'), ('yes' if row['cached'] else '', '{}'),
+                      (row['killReason'] or '', '{}')]
+            for c, (value, form) in enumerate(values):
+                self.tableRuns.setItem(r, c, GUI_Plans.table_item(value, form))
+        self.tableRuns.setSortingEnabled(True)
+        self.labCount.setText('{} of {} runs'.format(len(rows), total))
+
+    def open_Run(self):
+        rows = self.tableRuns.selectionModel().selectedRows()
+        if not rows:
+            return
+        rowId = int(self.tableRuns.item(rows[0].row(), 0).text())
+        history = Core_History.RunHistory(Core_History.history_path(self.dirHap))
+        try:
+            entry = history.get(rowId)
+        finally:
+            history.close()
+        if entry is not None:
+            self.runSelected.emit(entry)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+GUI_Limits.py
+Dialog for the resource limits applied to every Hapl-o-Mat run (Core_Limits)
+
+@author: Ute Solloch
+'''
+
+# import modules:
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QPushButton, QLineEdit,
+                             QSpinBox, QDoubleSpinBox, QMessageBox)
+from PyQt5.QtCore import pyqtSignal
+import platform
+
+# import own modules
+import GUI_miscFeatures
+import Core_Limits
+
+
+class LimitsDialog(QWidget):
+    """memory cap, address space cap, wall-clock limit, CPUs and nice level of the runs;
+    emits the new Core_Limits.RunLimits when saved
+    """
+    limitsChanged = pyqtSignal(object)
+
+    def __init__(self, limits):
+        """constructor
+        """
+        super().__init__()
+        self.setWindowTitle('Run limits')
+        try:
+            styleFile = GUI_miscFeatures.CONFIGURATION_FILES[platform.system()]["styleSheet"]
+            self.setStyleSheet(open(styleFile, "r").read())
+        except (KeyError, OSError):
+            print("StyleSheet: Your current OS is not supported.")
+        layout = QVBoxLayout()
+        labInfo = QLabel("Runs crossing the memory or time limit are terminated; the reason is written to the log file. "
+                         "0 or empty: no limit.")
+        labInfo.setWordWrap(True)
+        layout.addWidget(labInfo)
+        grid = QGridLayout()
+        self.spinMemory = self.mb_Spin(limits.memory)
+        self.spinMemory.setToolTip("Memory (resident set size) a single run may use.")
+        self.spinAddress = self.mb_Spin(limits.addressSpace)
+        self.spinAddress.setToolTip("Address space of a run; allocations beyond fail inside Hapl-o-Mat.")
+        self.spinTime = QDoubleSpinBox()
+        self.spinTime.setRange(0, 100000)
+        self.spinTime.setDecimals(1)
+        self.spinTime.setSuffix(' min')
+        self.spinTime.setValue((limits.wallTime or 0)/60)
+        self.textEdit_Cpus = QLineEdit(Core_Limits.format_cpus(limits.cpus))
+        self.textEdit_Cpus.setPlaceholderText('all, e.g. 0-3,6')
+        self.spinNice = QSpinBox()
+        self.spinNice.setRange(0, 19)
+        self.spinNice.setValue(limits.nice or 0)
+        rows = [('Memory (RSS):', self.spinMemory), ('Address space:', self.spinAddress),
+                ('Run time:', self.spinTime), ('CPUs:', self.textEdit_Cpus), ('Nice level:', self.spinNice)]
+        for i, (label, widget) in enumerate(rows):
+            grid.addWidget(QLabel(label), i, 0)
+            grid.addWidget(widget, i, 1)
+        layout.addLayout(grid)
+        hbox = QHBoxLayout()
+        btnCancel = QPushButton('Cancel')
+        btnCancel.setStyleSheet(GUI_miscFeatures.button_style_cancel)
+        btnSave = QPushButton('Save')
+        hbox.addStretch(1)
+        hbox.addWidget(btnCancel)
+        hbox.addWidget(btnSave)
+        layout.addLayout(hbox)
+        self.setLayout(layout)
+        btnCancel.clicked.connect(self.close)
+        btnSave.clicked.connect(self.save_Limits)
+        self.show()
+
+    def mb_Spin(self, value):
+        spin = QSpinBox()
+        spin.setRange(0, 1000000000)
+        spin.setSuffix(' MB')
+        spin.setValue(int(value/2**20) if value else 0)
+        return spin
+
+    def save_Limits(self):
+        try:
+            cpus = Core_Limits.parse_cpus(self.textEdit_Cpus.text())
+        except ValueError as e:
+            QMessageBox.about(self, "Error: Invalid entry.", str(e))
+            return
+        limits = Core_Limits.RunLimits(memory=self.spinMemory.value()*2**20 or None,
+                                       addressSpace=self.spinAddress.value()*2**20 or None,
+                                       wallTime=self.spinTime.value()*60 or None,
+                                       cpus=cpus, nice=self.spinNice.value() or None)
+        self.limitsChanged.emit(limits)
+        self.close()
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+GUI_Plans.py
+Dialogs for run plans (several runs from one parameter set) and display of their evaluation
+
+@author: Ute Solloch
+'''
+
+# import modules:
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QPushButton, QLineEdit,
+                             QCheckBox, QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView,
+                             QMessageBox, QDesktopWidget, QSplitter, QListWidget, QListWidgetItem, QSpinBox)
+from PyQt5.QtCore import Qt, pyqtSignal
+from functools import partial
+import platform
+
+# import own modules
+import GUI_miscFeatures, GUI_ResultTable, GUI_Tasks
+import Core_Plans, Core_Results
+
+
+class NumericItem(QTableWidgetItem):
+    """table item sorted by its numeric value (empty cells last)
+    """
+    def __init__(self, value, text=None):
+        """constructor
+        """
+        if text is None:
+            text = '' if value is None else str(value)
+        super().__init__(text)
+        self.value = value
+        self.setTextAlignment(int(Qt.AlignRight | Qt.AlignVCenter))
+
+    def __lt__(self, other):
+        if not isinstance(other, NumericItem):
+            return super().__lt__(other)
+        if self.value is None:
+            return False
+        if other.value is None:
+            return True
+        return self.value < other.value
+
+
+def number_or_text(value):
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+def table_item(value, form='{}'):
+    """sortable table item for numbers, plain item for text
+    """
+    if value is None or isinstance(value, (int, float)):
+        return NumericItem(value, '' if value is None else form.format(value))
+    return QTableWidgetItem(str(value))
+
+
+class PlanWindow(QWidget):
+    """base of the plan dialogs: style sheet, centering, base parameters
+    """
+    planReady = pyqtSignal(object)
+
+    def __init__(self, dirHap, params, inputForm, title):
+        """constructor
+        """
+        super().__init__()
+        self.dirHap = dirHap
+        self.params = params
+        self.inputForm = inputForm
+        self.setWindowTitle(title)
+        try:
+            styleFile = GUI_miscFeatures.CONFIGURATION_FILES[platform.system()]["styleSheet"]
+            self.setStyleSheet(open(styleFile, "r").read())
+        except (KeyError, OSError):
+            print("StyleSheet: Your current OS is not supported.")
+
+    def center(self):
+        """moves window to screen center
+        """
+        qr = self.frameGeometry()
+        cp = QDesktopWidget().availableGeometry().center()
+        qr.moveCenter(cp)
+        self.move(qr.topLeft())
+
+    def button_Line(self, textStart):
+        """Cancel and start buttons
+        """
+        hbox = QHBoxLayout()
+        btnCancel = QPushButton('Cancel')
+        btnCancel.setStyleSheet(GUI_miscFeatures.button_style_cancel)
+        btnStart = QPushButton(textStart)
+        hbox.addStretch(1)
+        hbox.addWidget(btnCancel)
+        hbox.addWidget(btnStart)
+        btnCancel.clicked.connect(self.close)
+        btnStart.clicked.connect(self.start_Plan)
+        return hbox
+
+    def start_Plan(self):
+        """creates the plan and emits it; errors in the entries are shown
+        """
+        try:
+            plan = self.make_Plan()
+        except ValueError as e:
+            QMessageBox.about(self, "Error: Invalid entry.", str(e))
+            return
+        self.planReady.emit(plan)
+        self.close()
+
+
+class EnsembleDialog(PlanWindow):
+    """choice of seeds and initialization schemes of an ensemble run
+    """
+    def __init__(self, dirHap, params, inputForm):
+        """constructor
+        """
+        super().__init__(dirHap, params, inputForm, 'Ensemble run')
+        layout = QVBoxLayout()
+        labInfo = QLabel("Runs the current parameters with several seeds (and initializations) at the same time.\n"
+                         "The run with the highest final log-likelihood is saved under the current result file names.")
+        labInfo.setWordWrap(True)
+        layout.addWidget(labInfo)
+        grid = QGridLayout()
+        grid.addWidget(QLabel('Seeds (e.g. 1-8 or 1,5,9):'), 0, 0)
+        self.textEdit_Seeds = QLineEdit('1-8')
+        grid.addWidget(self.textEdit_Seeds, 0, 1, 1, 2)
+        grid.addWidget(QLabel('Initialization:'), 1, 0)
+        self.checkIni = {}
+        current = params.get('INITIALIZATION_HAPLOTYPEFREQUENCIES')
+        for i, ini in enumerate(Core_Plans.INITIALIZATIONS):
+            check = QCheckBox(ini)
+            check.setChecked(ini == current)
+            self.checkIni[ini] = check
+            grid.addWidget(check, 1 + i//2, 1 + i%2)
+        layout.addLayout(grid)
+        layout.addLayout(self.button_Line('Start ensemble'))
+        self.setLayout(layout)
+        self.center()
+        self.show()
+
+    def make_Plan(self):
+        seeds = Core_Plans.parse_seeds(self.textEdit_Seeds.text())
+        inis = [ini for ini in Core_Plans.INITIALIZATIONS if self.checkIni[ini].isChecked()]
+        return Core_Plans.EnsemblePlan(self.dirHap, self.params, self.inputForm, seeds, inis)
+
+
+class SweepDialog(PlanWindow):
+    """value lists or ranges per parameter; one run per combination
+    """
+    def __init__(self, dirHap, params, inputForm):
+        """constructor
+        """
+        super().__init__(dirHap, params, inputForm, 'Parameter sweep')
+        layout = QVBoxLayout()
+        labInfo = QLabel("Values separated by commas (e.g. 1e-6, 1e-5 or false, true) or ranges start:stop:count, "
+                         "start:stop:count:log. Empty: current value. One run per combination.")
+        labInfo.setWordWrap(True)
+        layout.addWidget(labInfo)
+        grid = QGridLayout()
+        self.textEdits = {}
+        for i, key in enumerate(Core_Plans.SWEEP_KEYS):
+            grid.addWidget(QLabel(key), i, 0)
+            textEdit = QLineEdit()
+            textEdit.setPlaceholderText(params.get(key, ''))
+            textEdit.textChanged.connect(self.count_Runs)
+            self.textEdits[key] = textEdit
+            grid.addWidget(textEdit, i, 1)
+        layout.addLayout(grid)
+        self.labCount = QLabel()
+        self.labCount.setStyleSheet(GUI_miscFeatures.label_style_info)
+        layout.addWidget(self.labCount)
+        layout.addLayout(self.button_Line('Start sweep'))
+        self.setLayout(layout)
+        self.setMinimumWidth(600)
+        self.count_Runs()
+        self.center()
+        self.show()
+
+    def sweep_Grid(self):
+        grid = []
+        for key in Core_Plans.SWEEP_KEYS:
+            text = self.textEdits[key].text()
+            if text.strip() != '':
+                grid.append((key, Core_Plans.parse_values(text)))
+        return grid
+
+    def count_Runs(self):
+        try:
+            nRuns = 1
+            for key, values in self.sweep_Grid():
+                nRuns *= len(values)
+        except ValueError:
+            self.labCount.setText('Invalid entry.')
+            return
+        self.labCount.setText(str(nRuns) + ' run(s)')
+
+    def make_Plan(self):
+        grid = self.sweep_Grid()
+        if not grid:
+            raise ValueError('Please enter values for at least one parameter.')
+        return Core_Plans.SweepPlan(self.dirHap, self.params, self.inputForm, grid)
+
+
+class ResolutionDialog(PlanWindow):
+    """choice of the resolutions the current input is estimated at
+    """
+    def __init__(self, dirHap, params, inputForm):
+        """constructor
+        """
+        super().__init__(dirHap, params, inputForm, 'Multi-resolution run')
+        layout = QVBoxLayout()
+        loci = [locus for locus, res in Core_Plans.parse_resolutions(params.get('LOCI_AND_RESOLUTIONS', ''))]
+        labInfo = QLabel("Estimates the current input at every chosen resolution at the same time.\n"
+                         "Loci: " + ', '.join(loci))
+        labInfo.setWordWrap(True)
+        layout.addWidget(labInfo)
+        grid = QGridLayout()
+        self.checkRes = {}
+        current = set(res for locus, res in Core_Plans.parse_resolutions(params.get('LOCI_AND_RESOLUTIONS', '')))
+        for i, res in enumerate(Core_Plans.RESOLUTIONS):
+            check = QCheckBox(res)
+            check.setChecked(res in current)
+            self.checkRes[res] = check
+            grid.addWidget(check, i//4, i%4)
+        layout.addLayout(grid)
+        layout.addLayout(self.button_Line('Start runs'))
+        self.setLayout(layout)
+        self.center()
+        self.show()
+
+    def make_Plan(self):
+        resolutions = [res for res in Core_Plans.RESOLUTIONS if self.checkRes[res].isChecked()]
+        if not resolutions:
+            raise ValueError('Please choose at least one resolution.')
+        return Core_Plans.ResolutionPlan(self.dirHap, self.params, self.inputForm, resolutions)
+
+
+class LocusSubsetDialog(PlanWindow):
+    """choice of locus subsets (haplotypes of 2, 3, 5, 6 ... loci) estimated from the current input
+    """
+    def __init__(self, dirHap, params, inputForm):
+        """constructor
+        """
+        super().__init__(dirHap, params, inputForm, 'Locus subsets')
+        self.loci = [locus for locus, res in Core_Plans.parse_resolutions(params.get('LOCI_AND_RESOLUTIONS', ''))]
+        layout = QVBoxLayout()
+        labInfo = QLabel("Estimates haplotype frequencies for every checked locus subset at the same time.\n"
+                         "Loci (resolution as in the current parameters): " + ', '.join(self.loci))
+        labInfo.setWordWrap(True)
+        layout.addWidget(labInfo)
+        self.listSubsets = QListWidget()
+        for subset in Core_Plans.LOCUS_SUBSETS:
+            if all(locus in self.loci for locus in subset) and len(subset) < len(self.loci):
+                self.add_Subset(subset, False)
+        layout.addWidget(self.listSubsets)
+        hboxComb = QHBoxLayout()
+        self.spinSize = QSpinBox()
+        self.spinSize.setRange(1, max(1, len(self.loci)))
+        self.spinSize.setValue(min(2, len(self.loci)))
+        btnComb = QPushButton('Add')
+        hboxComb.addWidget(QLabel('All combinations of'))
+        hboxComb.addWidget(self.spinSize)
+        hboxComb.addWidget(QLabel('loci'))
+        hboxComb.addStretch(1)
+        hboxComb.addWidget(btnComb)
+        layout.addLayout(hboxComb)
+        hboxCustom = QHBoxLayout()
+        self.textEdit_Subsets = QLineEdit()
+        self.textEdit_Subsets.setPlaceholderText('e.g. A~B~DRB1; DRB1~DQB1')
+        btnCustom = QPushButton('Add')
+        hboxCustom.addWidget(self.textEdit_Subsets)
+        hboxCustom.addWidget(btnCustom)
+        layout.addLayout(hboxCustom)
+        layout.addLayout(self.button_Line('Start runs'))
+        self.setLayout(layout)
+        btnComb.clicked.connect(self.add_Combinations)
+        btnCustom.clicked.connect(self.add_Custom)
+        self.setMinimumWidth(500)
+        self.center()
+        self.show()
+
+    def add_Subset(self, subset, checked=True):
+        """adds a checkable subset to the list (existing subsets are only checked)
+        """
+        text = '~'.join(locus for locus in self.loci if locus in subset)
+        found = self.listSubsets.findItems(text, Qt.MatchExactly)
+        item = found[0] if found else QListWidgetItem(text, self.listSubsets)
+        item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+        item.setCheckState(Qt.Checked if checked or item.checkState() == Qt.Checked else Qt.Unchecked)
+
+    def add_Combinations(self):
+        for subset in Core_Plans.locus_combinations(self.loci, self.spinSize.value()):
+            self.add_Subset(subset)
+
+    def add_Custom(self):
+        try:
+            subsets = Core_Plans.parse_subsets(self.textEdit_Subsets.text(), self.loci)
+        except ValueError as e:
+            QMessageBox.about(self, "Error: Invalid entry.", str(e))
+            return
+        for subset in subsets:
+            self.add_Subset(subset)
+        self.textEdit_Subsets.clear()
+
+    def make_Plan(self):
+        subsets = []
+        for i in range(self.listSubsets.count()):
+            item = self.listSubsets.item(i)
+            if item.checkState() == Qt.Checked:
+                subsets.append(item.text().split('~'))
+        if not subsets:
+            raise ValueError('Please check at least one locus subset.')
+        return Core_Plans.LocusSubsetPlan(self.dirHap, self.params, self.inputForm, subsets)
+
+
+class CompareView(QSplitter):
+    """haplotype frequency tables of several runs side by side, scrolled together
+    """
+    def __init__(self, rows, parent=None, tasks=None):
+        """constructor
+        rows: run rows of a plan summary (label, htf, haplotypes, logL)
+        tasks: TaskManager reading the result files in the background
+        """
+        super().__init__(Qt.Horizontal, parent)
+        self.tasks = tasks if tasks is not None else GUI_Tasks.TaskManager(self)
+        self.tables = []
+        for row in rows:
+            panel = QWidget()
+            layout = QVBoxLayout()
+            layout.setContentsMargins(0, 0, 0, 0)
+            text = '{}: {} haplotypes'.format(row['label'], row['haplotypes'])
+            if row['logL'] is not None:
+                text += ', logL {:.6g}'.format(row['logL'])
+            layout.addWidget(QLabel(text))
+            labError = QLabel()
+            labError.hide()
+            layout.addWidget(labError)
+            table = GUI_ResultTable.HTFTableView(tasks=self.tasks)
+            self.tasks.start('compare' + str(id(table)), 'Reading results of ' + row['label'], Core_Results.load_htf, row['htf'],
+                             done=table.set_result, failed=partial(self.show_Error, labError), withProgress=False)
+            layout.addWidget(table)
+            panel.setLayout(layout)
+            self.addWidget(panel)
+            self.tables.append(table)
+        for table in self.tables:
+            table.verticalScrollBar().valueChanged.connect(self.sync_Scroll)
+
+    def show_Error(self, label, error):
+        label.setText(str(error))
+        label.show()
+
+    def sync_Scroll(self, value):
+        for table in self.tables:
+            scrollBar = table.verticalScrollBar()
+            if scrollBar.value() != value:
+                scrollBar.setValue(value)
+
+
+class PlanView(QWidget):
+    """evaluation of a finished plan: one sortable row per run, plan specific details below
+    """
+    columns = [('Run', 'label', '{}'), ('RunID', 'runID', '{}'), ('State', 'state', '{}'),
+               ('Runtime (s)', 'duration', '{:.1f}'), ('Iterations', 'iterations', '{}'),
+               ('Final logL', 'logL', '{:.6g}'), ('Haplotypes', 'haplotypes', '{}'),
+               ('Sum cut frequencies', 'sumCut', '{:.3g}')]
+
+    def __init__(self, plan, tasks=None):
+        """constructor
+        """
+        super().__init__()
+        self.plan = plan
+        self.tasks = tasks
+        summary = plan.summary
+        self.setWindowTitle('Hapl-o-Mat ' + plan.kind + ' ' + plan.runID)
+        self.resize(900, 500)
+        layout = QVBoxLayout()
+        self.labInfo = QLabel()
+        self.labInfo.setWordWrap(True)
+        self.labInfo.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        layout.addWidget(self.labInfo)
+        columns = self.columns + self.extra_Columns(summary)
+        self.tableRuns = self.make_Table([c[0] for c in columns])
+        rows = summary['runs']
+        self.tableRuns.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, (head, key, form) in enumerate(columns):
+                self.tableRuns.setItem(r, c, table_item(row.get(key), form))
+        self.tableRuns.setSortingEnabled(True)
+        self.tableRuns.sortByColumn(0, Qt.AscendingOrder)
+        layout.addWidget(self.tableRuns)
+        self.add_Details(layout, summary)
+        self.setLayout(layout)
+        self.show()
+
+    def make_Table(self, headers):
+        table = QTableWidget(0, len(headers), self)
+        table.setHorizontalHeaderLabels(headers)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.verticalHeader().hide()
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    def extra_Columns(self, summary):
+        """plan specific columns (header, key of the run row, format)
+        """
+        if summary['kind'] == 'ensemble' and summary.get('variation'):
+            distance = summary['variation']['distanceToBest']
+            for row in summary['runs']:
+                row['distance'] = distance.get(row['label'])
+            return [('Distance to best', 'distance', '{:.4g}')]
+        if summary['kind'] == 'sweep':
+            for row in summary['runs']:
+                for key in summary['parameters']:
+                    row[key] = number_or_text(row['changes'][key])
+            return [(key, key, '{:g}') for key in summary['parameters']]
+        return []
+
+    def add_Details(self, layout, summary):
+        """plan specific information and tables
+        """
+        info = ['Manifest: ' + self.plan.manifest_path()]
+        if summary['kind'] == 'ensemble':
+            if summary.get('best') is None:
+                info.insert(0, 'No run finished regularly.')
+            else:
+                variation = summary['variation']
+                info.insert(0, "Best run: {} (logL {:.6g}), saved as {}".format(summary['best'], summary['bestLogL'], summary['promoted']))
+                info.insert(1, "Largest distance of a run to the best run (half sum of absolute frequency differences): {:.4g}; "
+                               "largest standard deviation among the {} most frequent haplotypes: {:.3g}".format(
+                               variation['maxDistance'], len(variation['top']), variation['maxSD']))
+                tableTop = self.make_Table(['Haplotype', 'Mean frequency', 'SD', 'Min', 'Max', 'CV'])
+                tableTop.setRowCount(len(variation['top']))
+                for r, top in enumerate(variation['top']):
+                    cv = top['sd']/top['mean'] if top['mean'] > 0 else None
+                    values = [top['haplotype'], top['mean'], top['sd'], top['min'], top['max'], cv]
+                    for c, value in enumerate(values):
+                        tableTop.setItem(r, c, table_item(value, '{:.4e}' if c < 5 else '{:.3f}'))
+                tableTop.setSortingEnabled(True)
+                tableTop.sortByColumn(1, Qt.DescendingOrder)
+                layout.addWidget(QLabel('Variation of the most frequent haplotypes of the best run across the runs:'))
+                layout.addWidget(tableTop)
+        if summary['kind'] == 'resolutions':
+            rows = [row for row in summary['runs'] if row['state'] == 'finished']
+            if rows:
+                self.resize(1400, 800)
+                layout.addWidget(QLabel('Haplotype frequencies side by side:'))
+                layout.addWidget(CompareView(rows, self, self.tasks), 1)
+        self.labInfo.setText('\n'.join(info))
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+GUI_Queue.py
+Job queue panel: concurrent Hapl-o-Mat runs with state, priority, iterations and epsilon per job
+
+@author: Ute Solloch
+'''
+
+# import modules:
+from PyQt5.QtWidgets import (QGroupBox, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSpinBox,
+                             QDoubleSpinBox, QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView)
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from functools import partial
+import itertools
+import os
+import threading
+import time
+
+# import own modules
+import GUI_miscFeatures, GUI_Tasks
+import Core_Scheduler, Core_Run, Core_Params, Core_Supervisor
+
+
+class QueuePanel(QGroupBox):
+    """table of queued, running and finished jobs; the jobs of a Hapl-o-Mat folder are scheduled by its
+    run supervisor (shared with batch runs and pipelines) where available, otherwise by a Core_Scheduler.Scheduler
+    in this process; a timer drives the schedulers. Requests to a supervisor are sent in background tasks
+    """
+    headers = ['Job', 'RunID', 'Input', 'State', 'Priority', 'Iterations', 'Epsilon', 'Duration', 'Log file']
+    jobSelected = pyqtSignal(object)     # 'Show results' of a finished job
+    jobChanged = pyqtSignal(object)      # state of a job changed
+
+    def __init__(self, parent=None, tasks=None, interval=500):
+        """constructor
+        tasks: GUI_Tasks.TaskManager talking to the supervisors (default: own manager)
+        """
+        super().__init__("Job queue", parent)
+        self.tasks = tasks if tasks is not None else GUI_Tasks.TaskManager(self)
+        self.taskIds = itertools.count()
+        self.schedulers = {}    # Hapl-o-Mat folder -> scheduler of its jobs
+        self.connecting = {}    # Hapl-o-Mat folder -> (ready, failed) callbacks waiting for its supervisor
+        self.closing = threading.Event()      # set by cancel_all: runs still being submitted are cancelled
+        self.jobs = []          # (scheduler, job) of each table row
+        self.rows = {}          # job -> table row
+        defaults = Core_Scheduler.Scheduler()
+
+        layoutQueue = QVBoxLayout()
+        layoutLine = QHBoxLayout()
+        labJobs = QLabel('Concurrent runs:')
+        self.spinJobs = QSpinBox(self)
+        self.spinJobs.setRange(1, max(1, 2*(os.cpu_count() or 1)))
+        self.spinJobs.setValue(defaults.maxJobs)
+        self.spinJobs.setToolTip("""Number of Hapl-o-Mat runs at the same time. Default: number of physical cores.""")
+        labMemory = QLabel('Memory budget (GB):')
+        self.spinMemory = QDoubleSpinBox(self)
+        self.spinMemory.setDecimals(1)
+        self.spinMemory.setRange(0, 4096)
+        self.spinMemory.setSpecialValueText('unlimited')
+        if defaults.memoryBudget is not None:
+            self.spinMemory.setValue(defaults.memoryBudget/1024**3)
+        self.spinMemory.setToolTip("""Estimated memory of all concurrent runs. A run exceeding the budget on its own is started alone.""")
+        labPriority = QLabel('Priority:')
+        self.spinPriority = QSpinBox(self)
+        self.spinPriority.setRange(-9, 9)
+        self.spinPriority.setToolTip("""Priority of new jobs and of the selected jobs ('Set priority').
+        Jobs of higher priority run first and suspend running jobs of lower priority if all cores are busy.""")
+        self.btnPriority = QPushButton("Set priority", self)
+        self.btnPauseJob = QPushButton("Pause", self)
+        self.btnPauseJob.setToolTip("""Pauses the selected running jobs without losing their progress.""")
+        self.btnResumeJob = QPushButton("Resume", self)
+        self.btnResumeJob.setToolTip("""Resumes the selected paused jobs as soon as a core is free.""")
+        self.btnPauseJob.setEnabled(Core_Run.PAUSE_SUPPORTED)
+        self.btnResumeJob.setEnabled(Core_Run.PAUSE_SUPPORTED)
+        self.btnCancelJob = QPushButton("Cancel job", self)
+        self.btnCancelJob.setStyleSheet(GUI_miscFeatures.button_style_cancel)
+        self.btnShowJob = QPushButton("Show results", self)
+        layoutLine.addWidget(labJobs)
+        layoutLine.addWidget(self.spinJobs)
+        layoutLine.addWidget(labMemory)
+        layoutLine.addWidget(self.spinMemory)
+        layoutLine.addWidget(labPriority)
+        layoutLine.addWidget(self.spinPriority)
+        layoutLine.addWidget(self.btnPriority)
+        layoutLine.addStretch(1)
+        layoutLine.addWidget(self.btnPauseJob)
+        layoutLine.addWidget(self.btnResumeJob)
+        layoutLine.addWidget(self.btnCancelJob)
+        layoutLine.addWidget(self.btnShowJob)
+        layoutQueue.addLayout(layoutLine)
+
+        self.tableJobs = QTableWidget(0, len(self.headers), self)
+        self.tableJobs.setHorizontalHeaderLabels(self.headers)
+        self.tableJobs.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tableJobs.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.tableJobs.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tableJobs.verticalHeader().hide()
+        self.tableJobs.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.tableJobs.horizontalHeader().setStretchLastSection(True)
+        layoutQueue.addWidget(self.tableJobs)
+        self.setLayout(layoutQueue)
+
+        # Actions
+        self.spinJobs.valueChanged.connect(self.set_MaxJobs)
+        self.spinMemory.valueChanged.connect(self.set_MemoryBudget)
+        self.btnPriority.clicked.connect(self.set_Priority)
+        self.btnPauseJob.clicked.connect(self.pause_Jobs)
+        self.btnResumeJob.clicked.connect(self.resume_Jobs)
+        self.btnCancelJob.clicked.connect(self.cancel_Jobs)
+        self.btnShowJob.clicked.connect(self.show_Job)
+        self.tableJobs.cellDoubleClicked.connect(lambda row, col: self.show_Job())
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.tick)
+        self.timer.start()
+
+    def memory_Budget(self):
+        value = self.spinMemory.value()
+        return int(value*1024**3) if value > 0 else None
+
+    def set_MaxJobs(self, value):
+        for scheduler in self.schedulers.values():
+            if is_remote(scheduler):
+                self.configure_Supervisor(scheduler, maxJobs=value)
+            else:
+                scheduler.maxJobs = value
+
+    def set_MemoryBudget(self, value):
+        budget = self.memory_Budget()
+        for scheduler in self.schedulers.values():
+            if is_remote(scheduler):
+                self.configure_Supervisor(scheduler, memoryBudget=budget if budget is not None else 0)
+            else:
+                scheduler.memoryBudget = budget
+
+    def configure_Supervisor(self, scheduler, **settings):
+        """changes settings of a supervisor in a background task
+        """
+        self.tasks.start('queue-configure' + str(next(self.taskIds)), 'Configuring the run supervisor',
+                         partial(scheduler.configure, **settings), withProgress=False)
+
+    def scheduler_For(self, dirHap, ready, failed):
+        """calls ready(scheduler) with the scheduler of a Hapl-o-Mat folder. The supervisor (started if needed)
+        is connected in a background task and keeps its own settings, which are shown in the boxes;
+        failed(error) is called if it cannot be reached
+        """
+        scheduler = self.schedulers.get(dirHap)
+        if scheduler is not None:
+            ready(scheduler)
+        elif not Core_Supervisor.available():
+            scheduler = Core_Scheduler.Scheduler(self.spinJobs.value(), self.memory_Budget())
+            self.schedulers[dirHap] = scheduler
+            ready(scheduler)
+        else:
+            waiting = self.connecting.setdefault(dirHap, [])
+            waiting.append((ready, failed))
+            if len(waiting) == 1:
+                self.tasks.start('queue-connect' + str(next(self.taskIds)), 'Connecting to the run supervisor',
+                                 connect_Supervisor, dirHap, done=partial(self.connected, dirHap),
+                                 failed=partial(self.not_Connected, dirHap), withProgress=False)
+
+    def connected(self, dirHap, scheduler):
+        """takes over the scheduler of a supervisor connected by scheduler_For
+        """
+        self.schedulers[dirHap] = scheduler
+        self.spinJobs.blockSignals(True)
+        self.spinMemory.blockSignals(True)
+        self.spinJobs.setValue(scheduler.maxJobs)
+        self.spinMemory.setValue(scheduler.memoryBudget/1024**3 if scheduler.memoryBudget is not None else 0)
+        self.spinJobs.blockSignals(False)
+        self.spinMemory.blockSignals(False)
+        for ready, failed in self.connecting.pop(dirHap):
+            ready(scheduler)
+
+    def not_Connected(self, dirHap, error):
+        for ready, failed in self.connecting.pop(dirHap):
+            failed(error)
+
+    def submit(self, runs, done, failed, priority=None):
+        """queues Core_Run.HaplomatRuns of one Hapl-o-Mat folder (default priority: value of the priority box).
+        done(jobs) is called with the jobs, whose runs follow the jobs at the supervisor; failed(error)
+        if the runs cannot be queued, in which case none of them is
+        """
+        if priority is None:
+            priority = self.spinPriority.value()
+        self.scheduler_For(runs[0].dirHap, partial(self.submit_To, runs, priority, done, failed), failed)
+
+    def submit_To(self, runs, priority, done, failed, scheduler):
+        if is_remote(scheduler):
+            self.tasks.start('queue-submit' + str(next(self.taskIds)), 'Queueing runs', submit_Runs, scheduler,
+                             runs, priority, self.closing, done=partial(self.add_Jobs, scheduler, done),
+                             failed=failed, withProgress=False)
+            return
+        try:
+            jobs = submit_Runs(scheduler, runs, priority, self.closing)
+        except (OSError, ValueError, Core_Params.ParameterError) as e:
+            failed(e)
+            return
+        self.add_Jobs(scheduler, done, jobs)
+
+    def add_Jobs(self, scheduler, done, jobs):
+        """shows submitted jobs in the table; done(jobs) is called before their first tick
+        """
+        for job in jobs:
+            row = self.tableJobs.rowCount()
+            self.tableJobs.insertRow(row)
+            self.jobs.append((scheduler, job))
+            self.rows[job] = row
+            self.update_Row(job)
+        done(jobs)
+        self.tick()
+
+    def tick(self):
+        changed = []
+        for scheduler in self.schedulers.values():
+            changed += scheduler.tick()
+        for scheduler, job in self.jobs:
+            if job.is_active() or self.tableJobs.item(self.rows[job], 3).text() != job.state:
+                self.update_Row(job)
+        for job in changed:
+            self.jobChanged.emit(job)
+
+    def update_Row(self, job):
+        run = job.run
+        nEps = len(run.epsTail)
+        if run.startTime is None:
+            duration = ''
+        else:
+            duration = time.strftime('%H:%M:%S', time.gmtime((run.endTime or time.time()) - run.startTime))
+        values = [str(job.jobId), run.runID, os.path.basename(run.result_path('FILENAME_INPUT')),
+                  job.state, str(job.priority), str(nEps), '{:.3e}'.format(run.epsTail.epsilon[-1]) if nEps else '',
+                  duration, run.pathLog]
+        row = self.rows[job]
+        for col, value in enumerate(values):
+            item = self.tableJobs.item(row, col)
+            if item is None:
+                item = QTableWidgetItem(value)
+                if col in (0, 4, 5, 6, 7):
+                    item.setTextAlignment(int(Qt.AlignRight | Qt.AlignVCenter))
+                self.tableJobs.setItem(row, col, item)
+            elif item.text() != value:
+                item.setText(value)
+
+    def selected_Jobs(self):
+        """(scheduler, job) of the selected rows
+        """
+        rows = sorted(set(index.row() for index in self.tableJobs.selectionModel().selectedRows()))
+        return [self.jobs[row] for row in rows]
+
+    def request(self, method, jobs, *args):
+        """calls method(jobId, *args) of the schedulers of (scheduler, job) pairs; requests to a supervisor
+        are sent in a background task, the following ticks show their effect
+        """
+        remote = [(scheduler, job) for scheduler, job in jobs if is_remote(scheduler)]
+        for scheduler, job in jobs:
+            if not is_remote(scheduler):
+                getattr(scheduler, method)(job.jobId, *args)
+        if remote:
+            self.tasks.start('queue-' + method + str(next(self.taskIds)), 'Sending requests to the run supervisor',
+                             send_Requests, method, remote, args, withProgress=False)
+        self.tick()
+
+    def set_Priority(self):
+        self.request('set_priority', self.selected_Jobs(), self.spinPriority.value())
+
+    def pause_Jobs(self):
+        self.request('pause', self.selected_Jobs())
+
+    def resume_Jobs(self):
+        self.request('resume', self.selected_Jobs())
+
+    def cancel_Jobs(self):
+        self.request('cancel', self.selected_Jobs())
+
+    def show_Job(self):
+        """emits jobSelected for the first selected finished job
+        """
+        for scheduler, job in self.selected_Jobs():
+            if job.state == 'finished':
+                self.jobSelected.emit(job)
+                return
+
+    def cancel_all(self):
+        """cancels all jobs of the queue, also those handed over to a supervisor or still being submitted;
+        does not wait for the runs to end
+        """
+        self.closing.set()
+        for scheduler in self.schedulers.values():
+            scheduler.cancel_all()
+        self.tick()
+
+
+def is_remote(scheduler):
+    """tests whether a scheduler is the one of a supervisor, which is talked to in background tasks
+    """
+    return isinstance(scheduler, Core_Supervisor.RemoteScheduler)
+
+
+# functions run as background tasks
+
+def connect_Supervisor(dirHap):
+    """scheduler of the run supervisor of a Hapl-o-Mat folder (started if needed) for the jobs of the queue
+    """
+    return Core_Supervisor.RemoteScheduler(Core_Supervisor.start_supervisor(dirHap), 'queue')
+
+def submit_Runs(scheduler, runs, priority, closing):
+    """submits runs to a scheduler; if one of them fails or the queue is closing meanwhile,
+    the runs submitted before are cancelled
+    """
+    jobs = []
+    try:
+        for run in runs:
+            jobs.append(scheduler.submit(run, priority=priority))
+    except Exception:
+        for job in jobs:
+            scheduler.cancel(job.jobId)
+        raise
+    if closing.is_set():
+        for job in jobs:
+            scheduler.cancel(job.jobId)
+    return jobs
+
+def send_Requests(method, jobs, args):
+    """sends method(jobId, *args) to the schedulers of (scheduler, job) pairs
+    """
+    for scheduler, job in jobs:
+        getattr(scheduler, method)(job.jobId, *args)
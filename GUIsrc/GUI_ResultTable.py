@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+GUI_ResultTable.py
+Table view of haplotype frequencies (model/view, only visible rows are rendered)
+
+@author: Ute Solloch
+'''
+
+# import modules:
+from PyQt5.QtWidgets import QTableView, QHeaderView, QAbstractItemView, QApplication
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+from PyQt5.QtGui import QKeySequence
+from functools import partial
+import numpy as np
+
+# import own modules
+import GUI_Tasks, Core_Columnar
+
+
+class HTFTableModel(QAbstractTableModel):
+    """table model over the arrays of a Core_Results.HTFResult;
+    rows are formatted on demand, sorting permutes an index array computed in a background task
+    """
+    headers = ['Rank', 'Haplotype', 'Frequency', 'Cumulated frequency']
+
+    def __init__(self, parent=None, tasks=None):
+        """constructor
+        tasks: GUI_Tasks.TaskManager computing sort orders (default: own manager)
+        """
+        super().__init__(parent)
+        self.result = None
+        self.nRows = 0
+        self.order = None       # row -> haplotype index, None: rank order
+        self.tasks = tasks if tasks is not None else GUI_Tasks.TaskManager(self)
+        self.taskKey = 'sort' + str(id(self))
+
+    def set_result(self, result, maxLine=None):
+        """shows the first maxLine haplotypes of result (all if maxLine is None)
+        """
+        self.tasks.cancel(self.taskKey)
+        self.beginResetModel()
+        self.result = result
+        if result is None:
+            self.nRows = 0
+        elif maxLine is None:
+            self.nRows = len(result)
+        else:
+            self.nRows = max(0, min(int(maxLine), len(result)))
+        self.order = None
+        self.endResetModel()
+
+    def clear(self):
+        self.set_result(None)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.nRows
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.headers)
+
+    def haplotype_index(self, row):
+        """index of the haplotype shown in the given row
+        """
+        if self.order is None:
+            return row
+        return int(self.order[row])
+
+    def row_values(self, row):
+        """(rank, haplotype, frequency, cumulated frequency) of the given row as text
+        """
+        i = self.haplotype_index(row)
+        return (str(i+1), str(self.result.names[i]), repr(float(self.result.freqs[i])),
+                '{:.6f}'.format(self.result.cum[i]))
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or self.result is None:
+            return QVariant()
+        if role == Qt.DisplayRole:
+            return self.row_values(index.row())[index.column()]
+        elif role == Qt.TextAlignmentRole:
+            if index.column() == 1:
+                return int(Qt.AlignLeft | Qt.AlignVCenter)
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return QVariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return QVariant()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """sorts the displayed rows; the rank column restores the original order
+        """
+        if self.result is None or self.nRows == 0:
+            return
+        if column == 1:
+            self.tasks.start(self.taskKey, 'Sorting haplotypes', Core_Columnar.name_order, self.result.names, self.nRows,
+                             done=partial(self.set_order, self.result, self.nRows, order), withProgress=False)
+        elif column == 2:
+            self.tasks.start(self.taskKey, 'Sorting haplotypes', partial(np.argsort, kind='stable'),
+                             self.result.freqs[:self.nRows], done=partial(self.set_order, self.result, self.nRows, order), withProgress=False)
+        else:       # rank and cumulated frequency follow the file order
+            self.tasks.cancel(self.taskKey)
+            self.set_order(self.result, self.nRows, order, None)
+
+    def set_order(self, result, nRows, order, perm):
+        """shows the rows in the order perm (None: rank order) unless the displayed result changed meanwhile
+        """
+        if result is not self.result or nRows != self.nRows:
+            return
+        self.layoutAboutToBeChanged.emit()
+        if order == Qt.DescendingOrder:
+            if perm is None:
+                perm = np.arange(self.nRows)
+            perm = perm[::-1]
+        self.order = perm
+        self.layoutChanged.emit()
+
+
+class HTFTableView(QTableView):
+    """table view for haplotype frequencies with fixed row heights and copy of selections
+    """
+    def __init__(self, parent=None, tasks=None):
+        """constructor
+        """
+        super().__init__(parent)
+        self.htfModel = HTFTableModel(self, tasks)
+        self.setModel(self.htfModel)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setWordWrap(False)
+        vHeader = self.verticalHeader()
+        vHeader.hide()
+        vHeader.setSectionResizeMode(QHeaderView.Fixed)
+        vHeader.setDefaultSectionSize(self.fontMetrics().height() + 4)
+        hHeader = self.horizontalHeader()
+        hHeader.setSectionResizeMode(QHeaderView.Interactive)
+        hHeader.setStretchLastSection(True)
+        self.setColumnWidth(0, 80)
+        self.setColumnWidth(1, 450)
+        self.setColumnWidth(2, 150)
+        self.setSortingEnabled(True)
+        self.sortByColumn(0, Qt.AscendingOrder)
+
+    def set_result(self, result, maxLine=None):
+        self.htfModel.set_result(result, maxLine)
+        self.horizontalHeader().setSortIndicator(0, Qt.AscendingOrder)
+
+    def clear(self):
+        self.htfModel.clear()
+
+    def scroll_to_rank(self, rank):
+        """selects and scrolls to the haplotype with the given rank
+        """
+        model = self.htfModel
+        i = int(rank) - 1
+        if model.result is None or i < 0 or i >= model.nRows:
+            return False
+        if model.order is None:
+            row = i
+        else:
+            row = int(np.flatnonzero(model.order == i)[0])
+        index = model.index(row, 0)
+        self.scrollTo(index, QAbstractItemView.PositionAtCenter)
+        self.selectRow(row)
+        return True
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.Copy):
+            self.copy_Selection()
+        else:
+            super().keyPressEvent(event)
+
+    def copy_Selection(self):
+        """copies the selected rows tab separated to the clipboard
+        """
+        rows = set()
+        for selRange in self.selectionModel().selection():
+            rows.update(range(selRange.top(), selRange.bottom()+1))
+        rows = sorted(rows)
+        if not rows:
+            return
+        lines = ['\t'.join(self.htfModel.row_values(row)) for row in rows]
+        QApplication.clipboard().setText('\n'.join(lines))
@@ -55,9 +55,11 @@ import os, platform
 import sys
 import shutil
 import re
+from functools import partial
 
 # import own modules
-import GUI_Resolution, GUI_miscFeatures
+import GUI_Resolution, GUI_miscFeatures, GUI_Tasks
+import Core_Input, Core_Params
 
 
 class Parameters(QWidget):
@@ -72,6 +74,8 @@ class Parameters(QWidget):
         
         self.listLociBD = listLociBD
         self.dirHap = dirHap
+        # input files are profiled in the background
+        self.tasks = GUI_Tasks.TaskManager(self)
         
         self.initUI()
         
@@ -156,10 +160,8 @@ class Parameters(QWidget):
             textSave = ""
         if 'FILENAME_INPUT' in self.dictPara.keys(): 
             self.path_InpFile = self.dictPara['FILENAME_INPUT']
-            self.processInputDefault()
-            # set recommendation Epsilon 1/2*self.countDon
-            self.epsilonRec = 1/(2*self.countDon)
-            self.textCut = "1/(2n) = {0:1.2g}".format(self.epsilonRec)            
+            self.textCut = "Reading input file ..."
+            self.processInputDefault(self.init_Resolutions)
         else:
             self.path_InpFile = ""
             self.textCut = ""
@@ -186,24 +188,14 @@ class Parameters(QWidget):
         seed = self.dictPara['SEED'] 
         genoPrint = self.dictPara['WRITE_GENOTYPES']
         
-        # Initialize self.dictRes
+        # Initialize self.dictRes (again when the input loci are known)
         if 'LOCI_AND_RESOLUTIONS' in self.dictPara.keys(): 
             locAndRes = self.dictPara['LOCI_AND_RESOLUTIONS']
             # locAndRes = locAndRes0.replace('2d','1f').replace('4d','2f').replace('6d','3f').replace('8d','4f')
-            resList = locAndRes.split(',')
-            self.dictRes = {}
-            for i in resList:
-                duo = i.split(':')
-                resF = duo[1].replace("f", "field")
-                self.dictRes[duo[0]] = resF
-            for i in self.listLoci:
-                if (i not in self.dictRes):
-                    self.dictRes[i] = 'ignore locus'
         else:
             #default
             locAndRes=''
-            for i in self.listLoci:
-                self.dictRes[i] = 'null'
+        self.init_Resolutions()
         
         # Window layout
         # self.layout = QGridLayout()
@@ -382,8 +374,10 @@ class Parameters(QWidget):
         btnParametersMAC = QPushButton("Proceed")
         btnCancel = QPushButton('Cancel')
         btnCancel.setStyleSheet(GUI_miscFeatures.button_style_cancel)
+        self.taskIndicator = GUI_Tasks.TaskIndicator(self.tasks)
         hbox2.addWidget(self.lab_Save_tab1)
         hbox2.addStretch(1)
+        hbox2.addWidget(self.taskIndicator)
         hbox2.addWidget(btnCancel)
         hbox2.addWidget(btnParametersMAC)
         layoutAll.addLayout(hbox2)
@@ -405,6 +399,9 @@ class Parameters(QWidget):
         self.textEdit_RunId_tab1.textChanged.connect(self.refreshFiles) #changed runID
         btnParametersMAC.clicked.connect(self.saveAsTest)  #save parameters  
         btnCancel.clicked.connect(self.close)
+        # parameters are saved when the input file has been read
+        btnParametersMAC.setDisabled(self.tasks.is_busy())
+        self.tasks.busyChanged.connect(btnParametersMAC.setDisabled)
 
         self.show()
 
@@ -425,31 +422,11 @@ class Parameters(QWidget):
         """
         self.constructionAlert = GUI_miscFeatures.UnderConstruction()
         
-    def get_Loci(self):
-        """reads gene loci from input file and tests availability in current IPD-IMGT/HLA data
+    def get_Loci(self, profile):
+        """takes gene loci from the input profile and tests availability in current IPD-IMGT/HLA data
         """
-        dictLoci = {}
-        self.countDon = 0
-        self.listLoci = []
-        fi = open(self.path_InpFile, 'r')
-        for i, line in enumerate(fi):
-            if i == 0:
-                line = line.rstrip('\r\n')
-                listLine1 = line.split('\t')
-                el = len(listLine1)
-                if self.inputForm == 'MAC':
-                    for k in range (1, el):
-                        dictLoci[listLine1[k]] = 1
-                elif self.inputForm == 'GLSC':
-                    for k in range (1, el):
-                        loc = listLine1[k].split('*',1)[0]
-                        dictLoci[loc] = 1
-            elif i>0:
-                self.countDon+=1
-        fi.close()
-        for key,val in dictLoci.items():
-            self.listLoci.append(key)
-        self.listLoci.sort()
+        self.countDon = profile.n
+        self.listLoci = list(profile.loci)
         
         # Update self.dictRes
         for key in self.dictRes.keys():
@@ -518,57 +495,75 @@ class Parameters(QWidget):
             self.textEdit_Input_tab1.setText(str(self.path_InpFile))
         self.processInput()
     
-    def processInputDefault(self):
-        """identifies input file format and input loci
+    def identify_Input(self, profile):
+        """takes input file format (MAC or GLSC) and input loci from the input profile
+        """
+        self.inputForm = profile.inputForm
+        self.path = os.path.join(self.pathHapDir, "parameters" + profile.inputForm)
+        self.listLoci.clear()
+        self.get_Loci(profile)
+
+    def processInputDefault(self, then=None):
+        """identifies input file format and input loci in the background;
+        then: optional callable run afterwards, also if the input file is not valid
+        """
+        self.tasks.start('input', 'Reading input file', Core_Input.profile_input, self.path_InpFile,
+                         done=partial(self.set_InputDefault, then), failed=partial(self.warn_InvalidInput, then))
+
+    def set_InputDefault(self, then, profile):
+        """processes the input profile requested by processInputDefault
         """
         # MAC or GLSC?
         try:
-            with open(self.path_InpFile) as f:
-                if '*' in f.read(): # identification of input format
-    
-                    self.inputForm = 'GLSC'
-                    self.path = os.path.join(self.pathHapDir, "parametersGLSC")
-                else:
-                    self.inputForm = 'MAC'
-                    self.path = os.path.join(self.pathHapDir, "parametersMAC")
-            self.listLoci.clear()
-            self.get_Loci()
+            self.identify_Input(profile)
             # set recommendation Epsilon 1/2*self.countDon
             self.epsilonRec = 1/(2*self.countDon)
             self.textCut = "1/(2n) = {0:1.2g}".format(self.epsilonRec)
-        except:
-            msgInvalidPara = QMessageBox(self)
-            msgInvalidPara.setIcon(QMessageBox.Warning)
-            msgInvalidPara.setWindowTitle("Warning")
-            msgInvalidPara.setText("Input path or file not found.")
-            msgInvalidPara.setInformativeText("Please select a valid parameter file or set parameters via input mask.")
-            msgInvalidPara.setStandardButtons(QMessageBox.Ok)
-            msgInvalidPara.exec_()
-            msgInvalidPara.move(self.pos())
-        
+        except ZeroDivisionError:
+            self.warn_InvalidInput(then, None)
+            return
+        self.textEdit_CutRec_tab1.setText(self.textCut)
+        if then is not None:
+            then()
+
+    def warn_InvalidInput(self, then, error):
+        """warns of an input file that could not be read
+        """
+        msgInvalidPara = QMessageBox(self)
+        msgInvalidPara.setIcon(QMessageBox.Warning)
+        msgInvalidPara.setWindowTitle("Warning")
+        msgInvalidPara.setText("Input path or file not found.")
+        msgInvalidPara.setInformativeText("Please select a valid parameter file or set parameters via input mask.")
+        msgInvalidPara.setStandardButtons(QMessageBox.Ok)
+        msgInvalidPara.exec_()
+        msgInvalidPara.move(self.pos())
+        if then is not None:
+            then()
+
     def processInput(self):
-        """identifies input file format, input loci, and calculates maximum epsilon value
+        """identifies input file format, input loci, and calculates maximum epsilon value in the background
         triggers refreshFiles()
         """
-        try:
-            # MAC or GLSC?
-            with open(self.path_InpFile) as f:
-                if '*' in f.read(): # identification of input format
-                    self.inputForm = 'GLSC'
-                    self.path = os.path.join(self.pathHapDir, "parametersGLSC")
-                else:
-                    self.inputForm = 'MAC'
-                    self.path = os.path.join(self.pathHapDir, "parametersMAC")            
-            self.listLoci.clear()
-            self.get_Loci()
-            # set recommendation Epsilon 1/2*self.countDon
-            self.epsilonRec = 1/(2*self.countDon)
-            self.textCut = "1/(2n) = {0:1.2g}".format(self.epsilonRec)
-            self.textEdit_CutRec_tab1.setText(self.textCut)
-            self.refreshFiles() 
-        except FileNotFoundError:            
+        self.tasks.start('input', 'Reading input file', Core_Input.profile_input, self.path_InpFile,
+                         done=self.set_Input, failed=self.fail_Input)
+
+    def set_Input(self, profile):
+        """processes the input profile requested by processInput
+        """
+        # MAC or GLSC?
+        self.identify_Input(profile)
+        # set recommendation Epsilon 1/2*self.countDon
+        self.epsilonRec = 1/(2*self.countDon)
+        self.textCut = "1/(2n) = {0:1.2g}".format(self.epsilonRec)
+        self.textEdit_CutRec_tab1.setText(self.textCut)
+        self.refreshFiles() 
+
+    def fail_Input(self, error):
+        if isinstance(error, FileNotFoundError):
             # QMessageBox.about(self, 'Input File:','Please choose path to valid input file.')
-            pass    
+            pass
+        else:
+            self.warn_InvalidInput(None, error)
              
     
     def refreshFiles(self):
@@ -700,8 +695,7 @@ class Parameters(QWidget):
                 self.path_InpFile = self.dictPara['FILENAME_INPUT']
                 if not os.path.isabs(self.path_InpFile):
                     self.path_InpFile = os.path.abspath(os.path.join(paraPath, self.path_InpFile))   
-                self.processInputDefault()
-                self.textEdit_CutRec_tab1.setText(self.textCut)
+                self.processInputDefault(self.init_Resolutions)
                 
                 filename_haplotypes = self.dictPara['FILENAME_HAPLOTYPES']
                 if not os.path.isabs(filename_haplotypes):
@@ -747,17 +741,26 @@ class Parameters(QWidget):
                 self.combo_Norm_tab1.setCurrentIndex(index)
                 self.textEdit_Seed_tab1.setText(seed)      
                 
-                # Initialize self.dictRes
-                self.dictRes = {}
-                resList = locAndRes.split(',')
-                for i in resList:
-                    duo = i.split(':')
-                    resF = duo[1].replace("f", "field")
-                    self.dictRes[duo[0]] = resF
-                for i in self.listLoci:
-                    if (i not in self.dictRes):
-                        self.dictRes[i] = 'ignore locus'
+                # Initialize self.dictRes (again when the input loci are known)
+                self.init_Resolutions()
     
+    def init_Resolutions(self):
+        """sets the locus resolutions of the parameters; input loci without resolution are ignored
+        """
+        if 'LOCI_AND_RESOLUTIONS' in self.dictPara.keys():
+            resList = self.dictPara['LOCI_AND_RESOLUTIONS'].split(',')
+            self.dictRes = {}
+            for i in resList:
+                duo = i.split(':')
+                resF = duo[1].replace("f", "field")
+                self.dictRes[duo[0]] = resF
+            for i in self.listLoci:
+                if (i not in self.dictRes):
+                    self.dictRes[i] = 'ignore locus'
+        else:
+            for i in self.listLoci:
+                self.dictRes[i] = 'null'
+
     def validate_input_cut(self):
         """tests whether CUT_HAPLOTYPEFREQUENCIES settings are valid and complete
         """
@@ -902,30 +905,25 @@ class Parameters(QWidget):
         inpRun = os.path.join("..", self.textEdit_Input_tab1.text())
         resRun = os.path.join("..", self.textEdit_FoldRes_tab1.text())        
         # strResChanged = strRes.replace("1f", "2d").replace("2f", "4d").replace("3f", "6d").replace("4f", "8d")
-        paraFile = open(self.path, 'w+')
-        paraFile.truncate(0)
-        paraFile.write('#file name\n')
-        paraFile.write('FILENAME_INPUT='+self.textEdit_Input_tab1.text() +'\n')
-        paraFile.write('FILENAME_HAPLOTYPES='+ self.textEdit_ResHap_tab1.text() +'\n')
-        paraFile.write('FILENAME_GENOTYPES='+ self.textEdit_ResGen_tab1.text() +'\n')
-        paraFile.write('FILENAME_HAPLOTYPEFREQUENCIES='+ self.textEdit_ResHTF_tab1.text() +'\n')
-        paraFile.write('FILENAME_EPSILON_LOGL='+ self.textEdit_ResEps_tab1.text() +'\n')
-        paraFile.write('FILENAME_ANALYTICS=results/analytics.dat'+'\n')
-        paraFile.write('#reports\n')
-        paraFile.write('LOCI_AND_RESOLUTIONS='+ strRes +'\n')
-        paraFile.write('MINIMAL_FREQUENCY_GENOTYPES='+ self.textEdit_MinFreq_tab1.text() +'\n')
-        paraFile.write('DO_AMBIGUITYFILTER='+ self.combo_Amb_tab1.currentText() +'\n')
-        paraFile.write('EXPAND_LINES_AMBIGUITYFILTER='+ self.combo_ExpLines_tab1.currentText() +'\n')
-        paraFile.write('WRITE_GENOTYPES='+ self.combo_WriteGeno_tab1.currentText() +'\n')
-        paraFile.write('DO_ANALYTICS=false'+'\n')
-        paraFile.write('#EM-algorithm\n')
-        paraFile.write('INITIALIZATION_HAPLOTYPEFREQUENCIES='+ self.combo_Ini_tab1.currentText() +'\n')
-        paraFile.write('EPSILON='+ self.textEdit_Epsilon_tab1.text() +'\n')
-        paraFile.write('CUT_HAPLOTYPEFREQUENCIES='+ self.textEdit_Cut_tab1.text() +'\n')
-        paraFile.write('RENORMALIZE_HAPLOTYPEFREQUENCIES='+ self.combo_Norm_tab1.currentText() +'\n')
-        paraFile.write('SEED='+ self.textEdit_Seed_tab1.text() +'\n')
-        
-        paraFile.close()
+        params = {
+            'FILENAME_INPUT': self.textEdit_Input_tab1.text(),
+            'FILENAME_HAPLOTYPES': self.textEdit_ResHap_tab1.text(),
+            'FILENAME_GENOTYPES': self.textEdit_ResGen_tab1.text(),
+            'FILENAME_HAPLOTYPEFREQUENCIES': self.textEdit_ResHTF_tab1.text(),
+            'FILENAME_EPSILON_LOGL': self.textEdit_ResEps_tab1.text(),
+            'LOCI_AND_RESOLUTIONS': strRes,
+            'MINIMAL_FREQUENCY_GENOTYPES': self.textEdit_MinFreq_tab1.text(),
+            'DO_AMBIGUITYFILTER': self.combo_Amb_tab1.currentText(),
+            'EXPAND_LINES_AMBIGUITYFILTER': self.combo_ExpLines_tab1.currentText(),
+            'WRITE_GENOTYPES': self.combo_WriteGeno_tab1.currentText(),
+            'INITIALIZATION_HAPLOTYPEFREQUENCIES': self.combo_Ini_tab1.currentText(),
+            'EPSILON': self.textEdit_Epsilon_tab1.text(),
+            'CUT_HAPLOTYPEFREQUENCIES': self.textEdit_Cut_tab1.text(),
+            'RENORMALIZE_HAPLOTYPEFREQUENCIES': self.combo_Norm_tab1.currentText(),
+            'SEED': self.textEdit_Seed_tab1.text()
+        }
+        params.update(Core_Params.FIXED_PARAMETERS)
+        Core_Params.write_parameters(self.path, params)
         
         # save copies of parameter file
         try:
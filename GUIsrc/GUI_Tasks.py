@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+GUI_Tasks.py
+Background tasks: file parsing and other blocking work runs in a thread pool with progress
+reports and cancellation, results are delivered to the GUI thread by signals
+
+@author: Ute Solloch
+'''
+
+# import modules:
+import threading
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QLabel, QProgressBar, QToolButton
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class TaskCancelled(Exception):
+    """raised inside a task by its progress callback once the task is cancelled
+    """
+    pass
+
+
+class TaskSignals(QObject):
+    """signals of a task, created in the GUI thread so that connected slots run there
+    """
+    progress = pyqtSignal(object, object)   # done, total (total 0: unknown)
+    done = pyqtSignal(object)               # result of the function
+    failed = pyqtSignal(object)             # exception raised by the function
+    cancelled = pyqtSignal()
+
+
+class Task(QRunnable):
+    """runs function(*args) in a pool thread; with withProgress the function gets the keyword
+    argument progress, a callable (done, total) that raises TaskCancelled once cancelled
+    """
+    def __init__(self, name, function, args, withProgress=True):
+        """constructor
+        """
+        super().__init__()
+        self.setAutoDelete(False)
+        self.name = name
+        self.function = function
+        self.args = args
+        self.withProgress = withProgress
+        self.signals = TaskSignals()
+        self.stopped = threading.Event()
+
+    def report(self, done, total=0):
+        if self.stopped.is_set():
+            raise TaskCancelled()
+        self.signals.progress.emit(done, total)
+
+    def cancel(self):
+        self.stopped.set()
+
+    def is_cancelled(self):
+        return self.stopped.is_set()
+
+    def run(self):
+        try:
+            if self.withProgress:
+                result = self.function(*self.args, progress=self.report)
+            else:
+                result = self.function(*self.args)
+        except TaskCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            if self.stopped.is_set():
+                self.signals.cancelled.emit()
+            else:
+                self.signals.done.emit(result)
+
+
+class TaskManager(QObject):
+    """starts tasks in a thread pool and calls done/failed in the GUI thread; a new task with the
+    key of a running one cancels it, so only the result of the latest request is delivered
+    """
+    busyChanged = pyqtSignal(bool)
+    progress = pyqtSignal(str, object, object)     # name, done, total
+
+    def __init__(self, parent=None, pool=None):
+        """constructor
+        """
+        super().__init__(parent)
+        self.pool = pool if pool is not None else QThreadPool.globalInstance()
+        self.tasks = {}         # key -> running task
+        self.started = set()    # all tasks not ended yet, also cancelled ones (keeps them alive)
+
+    def start(self, key, name, function, *args, done=None, failed=None, withProgress=True):
+        """runs function(*args) in the background; name is shown in the progress indicator
+        """
+        previous = self.tasks.get(key)
+        if previous is not None:
+            previous.cancel()
+        wasBusy = self.is_busy()
+        task = Task(name, function, args, withProgress)
+        task.signals.progress.connect(lambda n, total: self.progress.emit(task.name, n, total))
+        task.signals.done.connect(lambda result: self.end_Task(key, task, done, result))
+        task.signals.failed.connect(lambda error: self.end_Task(key, task, failed, error))
+        task.signals.cancelled.connect(lambda: self.end_Task(key, task, None, None))
+        self.tasks[key] = task
+        self.started.add(task)
+        self.pool.start(task)
+        if not wasBusy:
+            self.busyChanged.emit(True)
+        return task
+
+    def end_Task(self, key, task, callback, value):
+        """removes an ended task and passes its result (if still wanted) to callback
+        """
+        self.started.discard(task)
+        if self.tasks.get(key) is task:
+            del self.tasks[key]
+            if not self.tasks:
+                self.busyChanged.emit(False)
+        if callback is not None and not task.is_cancelled():
+            callback(value)
+
+    def cancel(self, key):
+        task = self.tasks.pop(key, None)
+        if task is not None:
+            task.cancel()
+            if not self.tasks:
+                self.busyChanged.emit(False)
+
+    def cancel_all(self):
+        for key in list(self.tasks):
+            self.cancel(key)
+
+    def is_busy(self):
+        return bool(self.tasks)
+
+    def wait(self, msecs=-1):
+        """waits for all tasks of the pool (e.g. before the application quits)
+        """
+        return self.pool.waitForDone(msecs)
+
+
+class TaskIndicator(QWidget):
+    """small progress display of a TaskManager: name of the task, progress bar and
+    cancel button; hidden while no task is running
+    """
+    def __init__(self, tasks, parent=None):
+        """constructor
+        """
+        super().__init__(parent)
+        self.tasks = tasks
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.labTask = QLabel()
+        self.barTask = QProgressBar()
+        self.barTask.setMaximumWidth(150)
+        self.barTask.setMaximumHeight(14)
+        self.barTask.setTextVisible(False)
+        self.btnCancel = QToolButton()
+        self.btnCancel.setText('Cancel')
+        self.btnCancel.setToolTip('Cancel background tasks')
+        layout.addWidget(self.labTask)
+        layout.addWidget(self.barTask)
+        layout.addWidget(self.btnCancel)
+        self.setLayout(layout)
+        self.btnCancel.clicked.connect(self.tasks.cancel_all)
+        self.tasks.busyChanged.connect(self.set_Busy)
+        self.tasks.progress.connect(self.show_Progress)
+        self.set_Busy(self.tasks.is_busy())
+
+    def set_Busy(self, busy):
+        if busy:
+            self.labTask.setText('')
+            self.barTask.setRange(0, 0)     # busy indicator until the first progress report
+            self.show()
+        else:
+            self.hide()
+
+    def show_Progress(self, name, done, total):
+        self.labTask.setText(name)
+        if total and total > 0:
+            self.barTask.setRange(0, 1000)
+            self.barTask.setValue(int(1000*min(1.0, done/total)))
+        else:
+            self.barTask.setRange(0, 0)
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+HaplomatBatch.py
+Command line batch runner: runs Hapl-o-Mat for one or many parameter files without GUI,
+several at a time
+
+    python HaplomatBatch.py [--haplomat DIR] [--jobs N] [--memory MB] [--force] [--no-cache]
+                             [--json FILE] [--verbose] PARAMETERFILE [PARAMETERFILE ...]
+    python HaplomatBatch.py --detach [--priority N] ... PARAMETERFILE [PARAMETERFILE ...]
+
+Exit codes: 0 all runs finished, 1 at least one run failed or was cancelled,
+2 invalid arguments or parameter files, 3 Hapl-o-Mat not found, 130 interrupted
+
+@author: Ute Solloch
+'''
+
+# import modules:
+import os
+import sys
+import json
+import argparse
+
+# import own modules
+import Core_Params, Core_Run, Core_Scheduler, Core_Cache, Core_Columnar, Core_Limits, Core_Supervisor, Core_Input
+
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_NO_HAPLOMAT = 3
+EXIT_INTERRUPTED = 130
+
+
+def default_haplomat_dir():
+    """Hapl-o-Mat folder saved by the GUI ('pathHaplomat' next to this file), None if not set
+    """
+    pathHapPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pathHaplomat")
+    try:
+        with open(pathHapPath, 'r') as pathHapFile:
+            dirHap = pathHapFile.readline().rstrip('\r\n')
+    except OSError:
+        return None
+    return dirHap if dirHap != '' else None
+
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(description='Runs Hapl-o-Mat for the given parameter files, several at a time.')
+    parser.add_argument('parameterFiles', nargs='+', metavar='PARAMETERFILE',
+                        help='Hapl-o-Mat parameter file; relative file names inside are relative to the Hapl-o-Mat folder')
+    parser.add_argument('--haplomat', metavar='DIR', default=None,
+                        help='Hapl-o-Mat folder (default: folder saved by the GUI)')
+    parser.add_argument('--json', metavar='FILE', default=None,
+                        help="writes a summary of all runs as JSON ('-' for standard output)")
+    parser.add_argument('--jobs', metavar='N', type=int, default=None,
+                        help='number of concurrent runs (default: number of physical cores)')
+    parser.add_argument('--memory', metavar='MB', type=int, default=None,
+                        help='memory budget of all concurrent runs in MB (default: 80%% of the available memory)')
+    parser.add_argument('--force', action='store_true',
+                        help='runs Hapl-o-Mat even if the result cache holds the result')
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help='neither uses nor fills the result cache')
+    parser.add_argument('--input-fifo', dest='inputFifo', action='store_true',
+                        help='pipes compressed input files to Hapl-o-Mat instead of decompressing them to the run folder')
+    parser.add_argument('--max-memory', dest='maxMemory', metavar='MB', type=int, default=None,
+                        help='terminates a run whose memory (RSS) exceeds MB (default: 90%% of the physical memory, 0: no limit)')
+    parser.add_argument('--max-address-space', dest='maxAddressSpace', metavar='MB', type=int, default=None,
+                        help='address space limit of each run in MB')
+    parser.add_argument('--max-time', dest='maxTime', metavar='MIN', type=float, default=None,
+                        help='terminates a run after MIN minutes')
+    parser.add_argument('--cpus', metavar='LIST', default='',
+                        help="CPUs the runs may use, e.g. '0-3,6'")
+    parser.add_argument('--nice', metavar='N', type=int, default=None, help='nice increment of the runs')
+    parser.add_argument('--detach', action='store_true',
+                        help='hands the runs over to the run supervisor of the Hapl-o-Mat folder and returns at once')
+    parser.add_argument('--priority', metavar='N', type=int, default=0,
+                        help='priority of the runs; runs of higher priority suspend running runs of lower priority')
+    parser.add_argument('--verbose', action='store_true', help='prints the Hapl-o-Mat output')
+    return parser.parse_args(argv)
+
+def make_limits(args):
+    """resource limits of the runs from the command line options
+    """
+    limits = Core_Limits.default_limits()
+    if args.maxMemory is not None:
+        limits.memory = args.maxMemory*1024*1024 if args.maxMemory > 0 else None
+    if args.maxAddressSpace:
+        limits.addressSpace = args.maxAddressSpace*1024*1024
+    if args.maxTime:
+        limits.wallTime = args.maxTime*60
+    limits.cpus = Core_Limits.parse_cpus(args.cpus)
+    limits.nice = args.nice
+    return limits
+
+def load_runs(paths, dirHap, listener, cache=None, forceRun=False, inputFifo=False, limits=None):
+    """reads and checks all parameter files before the first run is started
+    """
+    runs = []
+    for path in paths:
+        params = Core_Params.read_parameters(path)
+        Core_Params.check_parameters(params)
+        run = Core_Run.HaplomatRun(dirHap, params, listener=listener)
+        run.cache = cache
+        run.forceRun = forceRun
+        run.inputFifo = inputFifo
+        run.limits = limits
+        run.recordHistory = True
+        runs.append(run)
+    return runs
+
+def detach_runs(args, dirHap, runs, limits):
+    """submits the runs to the run supervisor (started if needed) and prints their job IDs
+    """
+    if not Core_Supervisor.available():
+        print('Error: the run supervisor is not supported on this system.', file=sys.stderr)
+        return EXIT_FAILED
+    try:
+        client = Core_Supervisor.start_supervisor(dirHap)
+        for path, run in zip(args.parameterFiles, runs):
+            jobId = client.submit(parameters=run.params, inputFormat=run.inputForm, log=run.pathLog,
+                                  priority=args.priority, forceRun=args.force, inputFifo=args.inputFifo,
+                                  limits=limits.to_dict(), tag='batch', cache=args.cache)
+            print('job ' + str(jobId) + '  ' + path + ', log: ' + run.pathLog)
+    except (OSError, ValueError, Core_Supervisor.SupervisorError) as e:
+        print('Error: ' + str(e), file=sys.stderr)
+        return EXIT_FAILED
+    return EXIT_OK
+
+def write_statistics(run):
+    """saves summary and statistics of a run as '<RunID>_stats.json' next to its log file
+    """
+    summary = run.summary()
+    pathStats = os.path.join(os.path.dirname(run.pathLog), (run.runID + "_" if run.runID != "" else "") + 'stats.json')
+    try:
+        with open(pathStats, 'w') as fStats:
+            json.dump(summary, fStats, indent=2)
+    except OSError as e:
+        print('Error: ' + str(e), file=sys.stderr)
+    return summary
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    dirHap = args.haplomat if args.haplomat is not None else default_haplomat_dir()
+    if dirHap is None or not os.path.isdir(dirHap):
+        print('Error: Hapl-o-Mat folder not found, use --haplomat DIR.', file=sys.stderr)
+        return EXIT_NO_HAPLOMAT
+    listener = None
+    if args.verbose:
+        listener = lambda text: (sys.stdout.write(text), sys.stdout.flush())
+    try:
+        cache = Core_Cache.default_cache(dirHap) if args.cache else None
+        limits = make_limits(args)
+        runs = load_runs(args.parameterFiles, dirHap, listener, cache, args.force, args.inputFifo, limits)
+    except (ValueError, Core_Params.ParameterError) + Core_Input.READ_ERRORS as e:
+        print('Error: ' + str(e), file=sys.stderr)
+        return EXIT_USAGE
+    program = Core_Run.haplomat_command(dirHap, 'MAC')[0]
+    if not os.path.isfile(program):
+        print('Error: ' + program + ' not found.', file=sys.stderr)
+        return EXIT_NO_HAPLOMAT
+
+    if args.detach:
+        return detach_runs(args, dirHap, runs, limits)
+
+    scheduler = Core_Scheduler.Scheduler(args.jobs, args.memory*1024*1024 if args.memory else None)
+    jobPaths = {}
+    for path, run in zip(args.parameterFiles, runs):
+        jobPaths[scheduler.submit(run, priority=args.priority).jobId] = path
+    print('Hapl-o-Mat: ' + str(len(runs)) + ' run(s), up to ' + str(scheduler.maxJobs) + ' at a time', file=sys.stderr)
+
+    def report(job):
+        state = job.state
+        if state == 'running':
+            print(('resumed  ' if job.run.suspended else 'started  ') + jobPaths[job.jobId], file=sys.stderr)
+        elif state in ('paused', 'suspended'):
+            print(state.ljust(8) + ' ' + jobPaths[job.jobId], file=sys.stderr)
+        elif state == 'error' and job.error is not None:
+            print('error    ' + jobPaths[job.jobId] + ': ' + job.error, file=sys.stderr)
+        elif state == 'killed':
+            write_statistics(job.run)
+            print('killed   ' + jobPaths[job.jobId] + ': ' + job.run.killReason + ', log: ' + job.run.pathLog, file=sys.stderr)
+        elif state != 'queued':
+            write_statistics(job.run)
+            if job.run.cached:
+                state += ' (cache)'
+            print(state.ljust(8) + ' ' + jobPaths[job.jobId] + ', log: ' + job.run.pathLog, file=sys.stderr)
+
+    exitCode = EXIT_OK
+    try:
+        scheduler.wait_all(callback=report)
+    except KeyboardInterrupt:
+        scheduler.cancel_all()
+        scheduler.wait_all(interval=0.1, callback=report)
+        print('Interrupted.', file=sys.stderr)
+        exitCode = EXIT_INTERRUPTED
+    summaries = []
+    for job in scheduler.jobs:
+        summary = job.summary()
+        summary['parameterFile'] = jobPaths[job.jobId]
+        summaries.append(summary)
+        if exitCode == EXIT_OK and job.state != 'finished':
+            exitCode = EXIT_FAILED
+
+    if args.json is not None:
+        overview = {'haplomat': os.path.abspath(dirHap), 'exitCode': exitCode, 'runs': summaries}
+        if args.json == '-':
+            json.dump(overview, sys.stdout, indent=2)
+            sys.stdout.write('\n')
+        else:
+            with open(args.json, 'w') as fJson:
+                json.dump(overview, fJson, indent=2)
+    Core_Columnar.wait_pending()
+    return exitCode
+
+
+###################################################################
+# main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hapl-o-Mat: A software for haplotype frequency estimation
+
+Copyright (C) 2020, DKMS gGmbH
+
+Ute Solloch / Dr. Juergen Sauter
+Kressbach 1
+72072 Tuebingen, Germany
+
+T +49 7071 943-2061
+F +49 7071 943-2090
+solloch(at)dkms.de
+
+This file is part of Hapl-o-Mat
+
+Hapl-o-Mat is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3, or (at your option) any later version.
+
+Hapl-o-Mat is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with Hapl-o-Mat;
+see the file COPYING. If not, see <http://www.gnu.org/licenses/>.
+
+Hapl-o-Mat software makes use of several libraries that are separately licensed.
+These are listed in 'licenses.txt'.
+numpy; Copyright (c) 2005-2020, NumPy Developers.
+
+Created on 18.10.2026
+
+HaplomatSupervisor.py
+Run supervisor of a Hapl-o-Mat folder: owns runs handed over by the GUI (current run, job queue and plans),
+by 'HaplomatBatch.py --detach' or submitted through the job API, so that they share one scheduler and detached
+runs survive restarts of the GUI; started by the GUI when needed, ends when idle
+
+    python HaplomatSupervisor.py [--haplomat DIR] [--jobs N] [--memory MB] [--idle-timeout S] [--http-port PORT]
+    python HaplomatSupervisor.py [--haplomat DIR] --status | --stop [--cancel]
+
+Job API: JSON-RPC 2.0, one request per line on the Unix socket 'supervisor/supervisor.sock' of the
+Hapl-o-Mat folder, or with --http-port as body of a POST to http://127.0.0.1:PORT/ with the header
+'Authorization: Bearer <token>' (port and token in 'supervisor/http.json'). Methods:
+
+    submit(parameters, input, [inputFormat, resultDir, runID, log, priority, forceRun, limits])  -> job ID
+    progress(jobId)   -> state, iterations, epsilon, logL, rss, peakRss, cpuTime, runningTime
+    result(jobId)     -> statistics of the finished run and its files
+    job(jobId), jobs([tag, jobIds]), cancel(jobId), pause(jobId), resume(jobId), set_priority(jobId, priority), ping()
+    configure([maxJobs, memoryBudget])  -> changes the scheduler shared by all clients (memoryBudget in bytes, 0: none)
+
+Exit codes: 0 ok, 1 supervisor not running (--status, --stop) or already running, 3 Hapl-o-Mat not found
+
+@author: Ute Solloch
+'''
+
+# import modules:
+import os
+import sys
+import time
+import argparse
+
+# import own modules
+import Core_Supervisor
+from HaplomatBatch import default_haplomat_dir, EXIT_OK, EXIT_FAILED, EXIT_NO_HAPLOMAT
+
+
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(description='Runs the supervisor owning the Hapl-o-Mat runs of a Hapl-o-Mat folder.')
+    parser.add_argument('--haplomat', metavar='DIR', default=None,
+                        help='Hapl-o-Mat folder (default: folder saved by the GUI)')
+    parser.add_argument('--jobs', metavar='N', type=int, default=None,
+                        help='number of concurrent runs (default: number of physical cores)')
+    parser.add_argument('--memory', metavar='MB', type=int, default=None,
+                        help='memory budget of all concurrent runs in MB (default: 80%% of the available memory)')
+    parser.add_argument('--idle-timeout', dest='idleTimeout', metavar='S', type=float, default=Core_Supervisor.IDLE_TIMEOUT,
+                        help='ends the supervisor after S seconds without jobs and requests')
+    parser.add_argument('--http-port', dest='httpPort', metavar='PORT', type=int, default=None,
+                        help='also serves the job API over HTTP on localhost (0: any free port)')
+    parser.add_argument('--status', action='store_true', help='lists the jobs of the running supervisor')
+    parser.add_argument('--stop', action='store_true', help='ends the running supervisor when its jobs have ended')
+    parser.add_argument('--cancel', action='store_true', help='with --stop: cancels all jobs')
+    return parser.parse_args(argv)
+
+def print_jobs(entries):
+    for entry in entries:
+        start = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['start'])) if entry['start'] else ''
+        print('\t'.join([str(entry['jobID']), entry['state'], str(entry['priority']), entry['runID'], start,
+                         str(entry['iterations']), entry['log']]))
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    dirHap = args.haplomat if args.haplomat is not None else default_haplomat_dir()
+    if dirHap is None or not os.path.isdir(dirHap):
+        print('Error: Hapl-o-Mat folder not found, use --haplomat DIR.', file=sys.stderr)
+        return EXIT_NO_HAPLOMAT
+    if not Core_Supervisor.available():
+        print('Error: the run supervisor is not supported on this system.', file=sys.stderr)
+        return EXIT_FAILED
+    if args.status or args.stop:
+        client = Core_Supervisor.SupervisorClient(dirHap)
+        try:
+            if args.stop:
+                client.call('shutdown', cancel=args.cancel)
+            else:
+                print_jobs(client.call('jobs'))
+        except (OSError, ValueError, Core_Supervisor.SupervisorError) as e:
+            print('Error: ' + str(e), file=sys.stderr)
+            return EXIT_FAILED
+        return EXIT_OK
+    supervisor = Core_Supervisor.Supervisor(dirHap, args.jobs, args.memory*1024*1024 if args.memory else None,
+                                            args.idleTimeout)
+    print(time.ctime() + ': supervisor ' + str(os.getpid()) + ' started for ' + supervisor.dirHap, flush=True)
+    if not supervisor.serve(args.httpPort):
+        print('Error: a supervisor is already running for ' + supervisor.dirHap, file=sys.stderr)
+        return EXIT_FAILED
+    print(time.ctime() + ': supervisor ' + str(os.getpid()) + ' ended', flush=True)
+    return EXIT_OK
+
+
+###################################################################
+# main
+
+if __name__ == '__main__':
+    sys.exit(main())
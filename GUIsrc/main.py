@@ -48,8 +48,8 @@ Main window
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtWidgets import (QWidget, QRadioButton, QPushButton, QLabel,  
         QApplication, QVBoxLayout, QHBoxLayout, QGridLayout, QSplitter, QLineEdit,
-        QCheckBox, QGroupBox, QFrame, QMainWindow, QMessageBox, QFileDialog, QToolTip)   
-from PyQt5.QtCore import Qt, QDateTime, QTimer, pyqtSlot
+        QCheckBox, QGroupBox, QFrame, QMainWindow, QMessageBox, QFileDialog, QToolTip, QComboBox)   
+from PyQt5.QtCore import Qt, QTimer, QFileSystemWatcher, pyqtSlot
 from PyQt5.QtGui import QPixmap, QPainter, QColor
 from functools import partial
 from pathlib import Path
@@ -59,7 +59,8 @@ from pyqtgraph.Qt import QtCore, QtGui
 import numpy as np
 
 # import own modules
-import GUI_BuildData, GUI_SetParameters, GUI_miscFeatures
+import GUI_BuildData, GUI_SetParameters, GUI_miscFeatures, GUI_ResultTable, GUI_Console, GUI_Queue, GUI_Plans, GUI_History, GUI_Tasks, GUI_Limits
+import Core_Results, Core_Epsilon, Core_LocusIndex, Core_Params, Core_Run, Core_Cache, Core_Telemetry, Core_Limits, Core_Supervisor
 
 # # fbs app special
 # class AppContext(ApplicationContext):
@@ -88,11 +89,19 @@ class MainW(QMainWindow):
         
         
     def closeEvent(self, event):
-        reply = QMessageBox.question(self, 'Exit Application', 'Are you sure you want to exit the application?',
+        question = 'Are you sure you want to exit the application?'
+        detached = self.signalBusy == 1 and isinstance(self.run, Core_Supervisor.SupervisedRun) and self.run.entry['tag'] == 'gui'
+        if detached:
+            question = 'Hapl-o-Mat keeps running and is shown again at the next start.\n' + question
+        reply = QMessageBox.question(self, 'Exit Application', question,
                 QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         if reply == QMessageBox.Yes:
             # # fbs special
             # print("Press Ctrl+C to return to prompt.")
+            self.queuePanel.cancel_all()
+            if self.signalBusy == 1 and self.run is not None and not detached:
+                self.run.kill()
+            self.tasks.cancel_all()
             for widget in QApplication.topLevelWidgets():
                 widget.close()
             event.accept()
@@ -108,13 +117,23 @@ class MainW(QMainWindow):
         self.setCentralWidget(central_widget)
         self.grid = QGridLayout()
         self.statusBar().showMessage('Ready')
+        # background tasks (file parsing), shown in the status bar
+        self.tasks = GUI_Tasks.TaskManager(self)
+        # requests to the run supervisor (not cancelled from the task indicator: the run state depends on them)
+        self.supervisorTasks = GUI_Tasks.TaskManager(self)
+        self.taskIndicator = GUI_Tasks.TaskIndicator(self.tasks)
+        self.statusBar().addPermanentWidget(self.taskIndicator)
 
         central_widget.setLayout(self.grid)
         
         QToolTip.setFont(QtGui.QFont('SansSerif', 10))        
         self.setStyleSheet("QGroupBox { font-weight: bold; font-size: 12pt } ")        
         self.htfnr = 0
+        self.htfRes = None
+        self.epsNr = 0
         self.dirHap = ''
+        self.run = None
+        self.pauseCurve = None
         
         # Pixmaps
         global pixmap_TT
@@ -151,6 +170,7 @@ class MainW(QMainWindow):
         self.create_BuildDataFrame()
         self.create_ResultsFrame()
         self.create_RunFrame()
+        self.create_QueueFrame()
         
         # Set layout MainWindow     
         central_widget.setLayout(self.grid)
@@ -172,6 +192,7 @@ class MainW(QMainWindow):
         self.create_PathFrame()
         
         self.showMaximized()
+        QTimer.singleShot(0, self.reattach_Run)
         
     #HeaderFrame
     def create_HeaderFrame(self):
@@ -315,8 +336,7 @@ class MainW(QMainWindow):
         """
         runFrame = QGroupBox("Run Hapl-o-Mat")
         LayoutRun = QVBoxLayout()          
-        self.labOutputRun = QtWidgets.QTextBrowser() 
-        self.labOutputRun.setStyleSheet("color: white; background-color: black;")
+        self.labOutputRun = GUI_Console.ConsoleView() 
         self.labOutputRun.verticalScrollBar().setStyleSheet('background: #d8d6d6; color: #000000')
         self.labLog = QLabel()
         self.labLog.setStyleSheet(GUI_miscFeatures.label_style_info)
@@ -328,9 +348,47 @@ class MainW(QMainWindow):
                              "QPushButton { background-color: QLinearGradient( x1: 0, y1: 0, x2: 1, y2: 1, stop: 0 #ADFF2F, stop: 1 #78D64A); }" )  
         self.btnKillHaplomat =QPushButton("Abort", self)
         self.btnKillHaplomat.setStyleSheet(GUI_miscFeatures.button_style_cancel)
+        self.btnKillHaplomat.clicked.connect(self.kill_Haplomat)
+        self.btnPauseHaplomat = QPushButton("Pause", self)
+        self.btnPauseHaplomat.setToolTip("""Pauses the running Hapl-o-Mat without losing its progress; push again to resume.""")
+        self.btnPauseHaplomat.setEnabled(Core_Run.PAUSE_SUPPORTED)
+        self.btnPauseHaplomat.clicked.connect(self.pause_Haplomat)
+        btnQueue = QPushButton("Queue", self)
+        btnQueue.setToolTip("""Adds a run with the current parameters to the job queue. Queued runs are started concurrently.""")
+        btnPlans = QPushButton("Plans", self)
+        btnPlans.setToolTip("""Several runs derived from the current parameters, run concurrently in the job queue and evaluated together.""")
+        menuPlans = QtWidgets.QMenu(self)
+        menuPlans.addAction("Ensemble (seeds) ...", self.open_Ensemble)
+        menuPlans.addAction("Parameter sweep ...", self.open_Sweep)
+        menuPlans.addAction("Multi-resolution ...", self.open_Resolutions)
+        menuPlans.addAction("Locus subsets ...", self.open_LocusSubsets)
+        btnPlans.setMenu(menuPlans)
+        self.checkForceRun = QCheckBox("Force rerun", self)
+        self.checkForceRun.setToolTip("""Results of runs with identical input, parameters and IPD-IMGT/HLA data are restored from the result cache.
+        Check to run Hapl-o-Mat anyway.""")
+        btnHistory = QPushButton("History", self)
+        btnHistory.setToolTip("""Browse and reopen past runs.""")
+        btnHistory.setStyleSheet(GUI_miscFeatures.button_style_info)
+        btnHistory.clicked.connect(self.open_History)
+        btnLimits = QPushButton("Limits", self)
+        btnLimits.setToolTip("""Memory and time limits, CPUs and nice level of the runs.""")
+        btnLimits.clicked.connect(self.open_Limits)
+        self.checkDetach = QCheckBox("Detached", self)
+        self.checkDetach.setToolTip("""Hands the run over to the run supervisor: Hapl-o-Mat keeps running when the GUI is closed
+        and is shown again at the next start.""")
+        self.checkDetach.setEnabled(Core_Supervisor.available())
+        self.checkDetach.setChecked(Core_Supervisor.available())
+        self.runLimits = Core_Limits.load_limits(os.path.join(os.getcwd(), Core_Limits.LIMITS_FILE))
         self.waitFrame = QFrame()
         LayoutRunLine.addWidget(self.waitFrame)
+        LayoutRunLine.addWidget(btnHistory)
+        LayoutRunLine.addWidget(btnLimits)
+        LayoutRunLine.addWidget(self.checkDetach)
+        LayoutRunLine.addWidget(self.checkForceRun)
+        LayoutRunLine.addWidget(self.btnPauseHaplomat)
         LayoutRunLine.addWidget(self.btnKillHaplomat)
+        LayoutRunLine.addWidget(btnPlans)
+        LayoutRunLine.addWidget(btnQueue)
         LayoutRunLine.addWidget(btnRun)
         LayoutRunLine.setAlignment(Qt.AlignRight)
         LayoutRun.addLayout(LayoutRunLine)
@@ -340,6 +398,18 @@ class MainW(QMainWindow):
         self.grid.addWidget(runFrame, 4,0,1,4)        
         # Button Actions
         btnRun.clicked.connect(self.run_Haplomat_Test)
+        btnQueue.clicked.connect(self.queue_Haplomat)
+
+    # Frame job queue
+    def create_QueueFrame(self):
+        """defines the frame with the queue of concurrent Hapl-o-Mat runs
+        """
+        self.queuePanel = GUI_Queue.QueuePanel(self, self.tasks)
+        self.queuePanel.jobSelected.connect(self.show_Job)
+        self.queuePanel.jobChanged.connect(self.check_Plans)
+        self.plans = []
+        self.planWindows = []
+        self.grid.addWidget(self.queuePanel, 5, 0, 1, 11)
 
     # Frame results
     def create_ResultsFrame(self):
@@ -368,6 +438,9 @@ class MainW(QMainWindow):
         labNrHtSum = QLabel('Sum of cut haplotype frequencies:')
         self.labStatSum = QtWidgets.QLabel()
         self.labStatSum.setStyleSheet(GUI_miscFeatures.label_style_info)        
+        labNrHtCov = QLabel('Haplotypes covering ' + ' / '.join('{:g}'.format(100*i)+'%' for i in Core_Results.COVERAGE_LEVELS) + ':')
+        self.labStatCov = QtWidgets.QLabel()
+        self.labStatCov.setStyleSheet(GUI_miscFeatures.label_style_info)
         
         layFrame1.addWidget(labStat)
         layFrame2.addWidget(labNrHt)
@@ -381,6 +454,9 @@ class MainW(QMainWindow):
         layFrame2.addStretch(1)
         layFrame2.addWidget(labNrHtSum)
         layFrame2.addWidget(self.labStatSum)
+        layFrame2.addStretch(1)
+        layFrame2.addWidget(labNrHtCov)
+        layFrame2.addWidget(self.labStatCov)
         layFrame2.addStretch(20)
         
         StatsFrame1.setLayout(layFrame1)
@@ -400,6 +476,9 @@ class MainW(QMainWindow):
         self.radioButton4 = QRadioButton("All haplotypes with cumulated frequency <=", self)
         self.radioButton1.setChecked(True)
         self.textEdit_Cum = QLineEdit('0.995', self)
+        labRank = QLabel('Go to rank:')
+        self.textEdit_Rank = QLineEdit(self)
+        self.textEdit_Rank.setMaximumWidth(100)
         ChoiceBox.addWidget(labDisp)
         ChoiceBox.addStretch(1)
         ChoiceBox.addWidget(self.radioButton1)
@@ -412,7 +491,9 @@ class MainW(QMainWindow):
         ChoiceBox.addWidget(self.radioButton4)
         ChoiceBox.addWidget(self.textEdit_Cum)
         ChoiceBox.addStretch(20)        
-        self.labTopHTF = QtWidgets.QTextBrowser()
+        ChoiceBox.addWidget(labRank)
+        ChoiceBox.addWidget(self.textEdit_Rank)
+        self.tableTopHTF = GUI_ResultTable.HTFTableView(tasks=self.tasks)
         
         #Plot Frame
         splitter1 = customSplitterHorizontal(Qt.Horizontal)
@@ -426,6 +507,11 @@ class MainW(QMainWindow):
         self.plot2.showGrid(True, True)
         self.plot2.setLogMode(False, True)    
         self.plot2.plotItem.ctrlMenu = None         
+        self.plot3 = pg.PlotWidget(title="Resources", bottom = "Time (s)", left = "Memory (MB)")
+        self.plot3.showGrid(True, True)
+        self.plot3.plotItem.ctrlMenu = None
+        self.plot3.addLegend()
+        self.resSeries = Core_Telemetry.ResourceSeries()
         
         FramePlot1 = QFrame()
         ChoiceBoxPlot1 = QVBoxLayout()  
@@ -459,6 +545,19 @@ class MainW(QMainWindow):
         ChoiceBoxPlot2.addLayout(LayoutChoice2)
         FramePlot2.setLayout(ChoiceBoxPlot2)
 
+        FramePlot3 = QFrame()
+        ChoiceBoxPlot3 = QVBoxLayout()
+        LayoutChoice3 = QHBoxLayout()
+        labPlot3 = QLabel('Display:')
+        self.comboPlot3 = QComboBox()
+        self.comboPlot3.addItems(['Memory', 'CPU', 'I/O'])
+        LayoutChoice3.addWidget(labPlot3)
+        LayoutChoice3.addWidget(self.comboPlot3)
+        LayoutChoice3.addStretch(1)
+        ChoiceBoxPlot3.addWidget(self.plot3)
+        ChoiceBoxPlot3.addLayout(LayoutChoice3)
+        FramePlot3.setLayout(ChoiceBoxPlot3)
+
         FrameReset = QFrame()
         layoutReset = QHBoxLayout()
         layoutReset.setSpacing(0)
@@ -471,6 +570,7 @@ class MainW(QMainWindow):
         self.Plot1CheckBoxY.stateChanged.connect(lambda:self.checkState1())
         self.Plot2CheckBoxX.stateChanged.connect(lambda:self.checkState2())
         self.Plot2CheckBoxY.stateChanged.connect(lambda:self.checkState2())
+        self.comboPlot3.currentIndexChanged.connect(lambda:self.display_Resources())
                 
         # Set Layout
         StatsBox.addWidget(StatsFrame1)
@@ -482,9 +582,10 @@ class MainW(QMainWindow):
         
         splitter1.addWidget(FramePlot1)
         splitter1.addWidget(FramePlot2)        
+        splitter1.addWidget(FramePlot3)
         splitter2 = customSplitterVertical(Qt.Vertical)        
         # splitter2.setHandleWidth(8)
-        splitter2.addWidget(self.labTopHTF)
+        splitter2.addWidget(self.tableTopHTF)
         splitter2.addWidget(splitter1)
         LayoutResFrame.addWidget(splitter2)  
         LayoutResFrame.addWidget(FrameReset) 
@@ -501,6 +602,7 @@ class MainW(QMainWindow):
         btnReset.clicked.connect(lambda:self.radioBtn_State())
         self.textEdit_TopX.returnPressed.connect(self.toggle_Rb1)
         self.textEdit_Cum.returnPressed.connect(self.toggle_Rb4)
+        self.textEdit_Rank.returnPressed.connect(self.goto_Rank)
 
 
 
@@ -686,18 +788,27 @@ class MainW(QMainWindow):
         else:
             self.labOutputBuildData.setText("Last data update:\n"+ str(atime_str))
             self.labTickBD.setPixmap(pixmap_Tick)
-        # available Loci
+        # available Loci (sidecar index, rebuilt in background if outdated)
         self.labOLociBuildData.clear()
-        dictLociBD = {}
-        self.listLociBD = []
-        f = open(self.path_data, 'r')
-        for line in f:
-            line = line.rstrip('\r\n')
-            loc = line.split('*')[0]
-            dictLociBD[loc] = 1
-        for key,val in dictLociBD.items():
-            self.listLociBD.append(key)
-        self.listLociBD.sort()
+        index = Core_LocusIndex.load_index(self.path_data)
+        if index is None:
+            self.listLociBD = []
+            self.strLoc = "Reading available loci ..."
+            self.labOLociBuildData.setText(self.strLoc)
+            self.rebuild_LocusIndex()
+        else:
+            self.show_Loci(index)
+
+    def rebuild_LocusIndex(self):
+        """starts the background rebuild of the locus index
+        """
+        self.tasks.start('loci', 'Reading available loci', Core_LocusIndex.build_index, self.path_data,
+                         done=self.show_Loci)
+
+    def show_Loci(self, index):
+        """displays the available loci of the locus index
+        """
+        self.listLociBD = list(index.loci)
         self.strLoc = "available Loci:<br><font color= '#0000ff'> "
         z = 0
         for i in self.listLociBD:
@@ -744,9 +855,11 @@ class MainW(QMainWindow):
         self.labStatGT.clear()
         self.labStatEps.clear()
         self.labStatSum.clear()
-        self.labTopHTF.clear()
+        self.labStatCov.clear()
+        self.tableTopHTF.clear()
         self.plot1.clear()
         self.plot2.clear()
+        self.plot3.clear()
         self.StatsFrame2.hide()
         self.switchLoadSet = 1
         
@@ -769,14 +882,15 @@ class MainW(QMainWindow):
         self.labStatGT.clear()
         self.labStatEps.clear()
         self.labStatSum.clear()
+        self.labStatCov.clear()
         self.labLog.clear()
         self.plot1.clear()
         self.plot2.clear()
-        self.labTopHTF.clear()
+        self.plot3.clear()
+        self.tableTopHTF.clear()
+        self.htfRes = None         # releases the mapping of the earlier result before the file is rewritten
         self.StatsFrame2.hide()
-        datetime = QDateTime.currentDateTime()
         
-        # remove old epsilon file
         if self.inpForm == 'MAC':
             paraFile = os.path.join(self.pathHapDir,"parametersMAC")
         elif self.inpForm == 'GLSC':
@@ -784,86 +898,347 @@ class MainW(QMainWindow):
         else:
             QMessageBox.about(self, "Error: Run parameters incomplete.", "Please set parameters before starting Hapl-o-Mat!")
             return
-        f = open(paraFile, 'r')
-        for line in f:
-            row = line.split('=')
-            if(row[0] == 'FILENAME_EPSILON_LOGL'): #Epsilon file
-                pathEpsilon = os.path.join("..", str(row[1]).strip())
-            else:
-                continue
-        if(os.path.isfile(pathEpsilon)):
-            os.remove(pathEpsilon)
+        try: dirParent
+        except NameError:        
+            QMessageBox.about(self, "Error: No directory.", "Please set working directory!") 
+            return
+        params = Core_Params.read_parameters(paraFile)
             
-        #run Process
-        self.currDir_US = os.getcwd()
-        self.labOutputRun.append('Hapl-o-Mat started.\n'+ datetime.toString())
+        #run Process (headless run: parameter file, process, log file and epsilon file)
         pathLog = self.resRun
-        # runIDLog = self.runID+'_'
         self.nameLog = str(os.path.join(pathLog, self.runIdIn+'log.dat'))        
-        self.logFile = open(self.nameLog, 'w')
+        self.consoleRun = GUI_Console.ConsoleBuffer(self.labOutputRun)
         self.procOK = 0
-        try: dirParent
-        except NameError:        
-            QMessageBox.about(self, "Error: No directory.", "Please set working directory!") 
-        else:
-            if platform.system() == "Windows":
-                self.processHaplo = QtCore.QProcess()
-                os.chdir(self.dirHap)   #Win special [05.10.2020]
-                self.processHaplo.readyReadStandardOutput.connect(lambda: self.labOutputRun.append(str(self.processHaplo.readAllStandardOutput().data().decode('UTF-8')))) 
-                if self.inpForm == 'MAC':
-                    QtCore.QTimer.singleShot(100, partial(self.processHaplo.start, "Hapl-o-Mat.exe", ["MAC"]))
-                elif self.inpForm == 'GLSC':
-                    QtCore.QTimer.singleShot(100, partial(self.processHaplo.start, "Hapl-o-Mat.exe", ["GLSC"]))           
-                self.processHaplo.waitForStarted()            
-                # write out epsilon
-                self.timer = QTimer()
-                self.timer.setInterval(10000)
-                self.timer.timeout.connect(self.display_Epsilon)
-                self.timer.start()
-                # Process handles
-                self.btnKillHaplomat.clicked.connect(self.processHaplo.kill)
-                self.processHaplo.finished.connect(self.status_Haplomat)
-            elif (platform.system() == "Linux") or (platform.system() == "Darwin"):
-                self.processHaplo = QtCore.QProcess()
-                self.processHaplo.setWorkingDirectory(os.path.join(self.pathHapDir))
-                self.processHaplo.readyReadStandardOutput.connect(lambda: self.labOutputRun.append(str(self.processHaplo.readAllStandardOutput().data().decode('UTF-8')))) 
-                if self.inpForm == 'MAC':
-                    QtCore.QTimer.singleShot(100, partial(self.processHaplo.start, os.path.join(".","haplomat MAC")))
-                elif self.inpForm == 'GLSC':
-                    QtCore.QTimer.singleShot(100, partial(self.processHaplo.start, os.path.join(".","haplomat GLSC")))            
-                self.processHaplo.waitForStarted()
-                # write out epsilon
-                self.timer = QTimer()
-                self.timer.setInterval(10000)
-                self.timer.timeout.connect(self.display_Epsilon)
-                self.timer.start()
-                # Process handles
-                self.btnKillHaplomat.clicked.connect(self.processHaplo.kill)
-                self.processHaplo.finished.connect(self.status_Haplomat)
+        self.run = None
+        if Core_Supervisor.available():      # scheduled with the queue, batch and pipeline runs
+            self.start_Supervised(params, 'gui' if self.checkDetach.isChecked() else 'session')
+            return
+        try:
+            self.run = Core_Run.HaplomatRun(self.pathHapDir, params, self.inpForm, self.nameLog, self.consoleRun.listen)
+            self.prepare_Run(self.run)
+            self.run.start()
+        except (OSError, ValueError, Core_Params.ParameterError) as e:
+            self.not_Started(e)
+            return
+        self.follow_Run()
+
+    def not_Started(self, error):
+        """reports a run that could not be started
+        """
+        self.consoleRun.close()
+        self.signalBusy = 0
+        self.statusBar().showMessage('Ready.')
+        QMessageBox.about(self, "Error: Hapl-o-Mat not started.", str(error))
+
+    def follow_Run(self):
+        """follows the started run: output, real time epsilon and resource display, end of the run
+        """
+        self.epsTail = self.run.epsTail
+        # write out epsilon and resources
+        self.resSeries = self.run.resource_series()
+        self.start_EpsilonFollower()
+        # Process handles
+        self.runTimer = QTimer(self)
+        self.runTimer.setInterval(200)
+        self.runTimer.timeout.connect(self.poll_Haplomat)
+        self.runTimer.start()
+
+    def start_Supervised(self, params, tag):
+        """hands the run over to the run supervisor of the Hapl-o-Mat folder (started if needed) in the background;
+        the run is followed as soon as the supervisor has queued it. tag 'gui': detached run, shown again after
+        a restart; 'session': cancelled when the GUI is closed
+        """
+        request = {'parameters': params, 'inputFormat': self.inpForm, 'log': os.path.abspath(self.nameLog),
+                   'forceRun': self.checkForceRun.isChecked(), 'limits': self.runLimits.to_dict(), 'tag': tag}
+        self.statusBar().showMessage('Handing Hapl-o-Mat over to the run supervisor ...')
+        self.supervisorTasks.start('submit', 'Submitting run', submit_Supervised, self.pathHapDir, request,
+                                   self.consoleRun.listen, done=self.follow_Supervised, failed=self.not_Started,
+                                   withProgress=False)
+
+    def follow_Supervised(self, run):
+        """follows a run queued by the run supervisor; its job entry and files are read in the background
+        """
+        self.run = run
+        self.run.start_following()
+        self.follow_Run()
+        self.statusBar().showMessage('Hapl-o-Mat running ...')
+
+    def reattach_Run(self):
+        """after a restart: follows the latest run handed over to the run supervisor that has not ended yet;
+        its log is replayed and the epsilon display continues
+        """
+        if self.dirHap == '' or not Core_Supervisor.available():
+            return
+        self.supervisorTasks.start('reattach', 'Looking for supervised runs', find_Supervised, self.pathHapDir,
+                                   done=self.reattach_Job, withProgress=False)
+
+    def reattach_Job(self, found):
+        """follows the latest active run of the GUI found at the run supervisor
+        """
+        if found is None or self.signalBusy == 1:
+            return
+        client, entry = found
+        self.signalBusy = 1
+        self.labOutputRun.clear()
+        self.labLog.clear()
+        self.plot1.clear()
+        self.plot2.clear()
+        self.plot3.clear()
+        self.tableTopHTF.clear()
+        self.htfRes = None
+        self.StatsFrame2.hide()
+        self.consoleRun = GUI_Console.ConsoleBuffer(self.labOutputRun)
+        self.procOK = 0
+        self.run = Core_Supervisor.SupervisedRun(client, entry, self.consoleRun.listen)
+        self.run.start_following()
+        self.nameLog = self.run.pathLog
+        self.follow_Run()
+        self.statusBar().showMessage('Hapl-o-Mat running ... (run ' + self.run.runID + ' reattached)')
+
+    def prepare_Run(self, run):
+        """result cache settings and resource limits of a new run
+        """
+        run.cache = Core_Cache.default_cache(self.pathHapDir)
+        run.forceRun = self.checkForceRun.isChecked()
+        run.recordHistory = True
+        run.limits = self.runLimits
+
+    def current_Params(self):
+        """parameters of the current parameter file, None (with message) if not set
+        """
+        if (self.switchLoadSet == 0) or self.inpForm not in ('MAC', 'GLSC'):
+            QMessageBox.about(self, "Error: Run parameters incomplete.", "Please set parameters before starting Hapl-o-Mat!")
+            return None
+        paraFile = os.path.join(self.pathHapDir, "parameters" + self.inpForm)
+        return Core_Params.read_parameters(paraFile)
+
+    def queue_Haplomat(self):
+        """adds a run with the current parameter file to the job queue
+        """
+        params = self.current_Params()
+        if params is None:
+            return
+        run = Core_Run.HaplomatRun(self.pathHapDir, params, self.inpForm)
+        self.prepare_Run(run)
+        self.queuePanel.submit([run], done=lambda jobs: self.statusBar().showMessage('Run ' + run.runID + ' queued.'),
+                               failed=lambda error: QMessageBox.about(self, "Error: Run not queued.", str(error)))
+
+    def open_Ensemble(self):
+        """opens the dialog for an ensemble run over several seeds
+        """
+        params = self.current_Params()
+        if params is not None:
+            self.planDialog = GUI_Plans.EnsembleDialog(self.pathHapDir, params, self.inpForm)
+            self.planDialog.planReady.connect(self.submit_Plan)
+
+    def open_Sweep(self):
+        """opens the dialog for a parameter sweep
+        """
+        params = self.current_Params()
+        if params is not None:
+            self.planDialog = GUI_Plans.SweepDialog(self.pathHapDir, params, self.inpForm)
+            self.planDialog.planReady.connect(self.submit_Plan)
+
+    def open_Resolutions(self):
+        """opens the dialog for runs at several resolutions
+        """
+        params = self.current_Params()
+        if params is not None:
+            self.planDialog = GUI_Plans.ResolutionDialog(self.pathHapDir, params, self.inpForm)
+            self.planDialog.planReady.connect(self.submit_Plan)
+
+    def open_LocusSubsets(self):
+        """opens the dialog for runs on several locus subsets
+        """
+        params = self.current_Params()
+        if params is not None:
+            self.planDialog = GUI_Plans.LocusSubsetDialog(self.pathHapDir, params, self.inpForm)
+            self.planDialog.planReady.connect(self.submit_Plan)
+
+    def submit_Plan(self, plan):
+        """queues all runs of a plan; the plan is evaluated when its last run has ended
+        """
+        for variant in plan.variants:
+            self.prepare_Run(variant.run)
+        self.queuePanel.submit([variant.run for variant in plan.variants], done=partial(self.queue_Plan, plan),
+                               failed=lambda error: QMessageBox.about(self, "Error: Plan not queued.", str(error)))
+
+    def queue_Plan(self, plan, jobs):
+        """follows the queued runs of a plan
+        """
+        for variant, job in zip(plan.variants, jobs):
+            variant.run = job.run       # followed through the scheduler
+        self.plans.append(plan)
+        self.statusBar().showMessage(str(len(plan.variants)) + ' runs of ' + plan.kind + ' ' + plan.runID + ' queued.')
+
+    def check_Plans(self, job):
+        """evaluates plans whose runs have all ended and shows the evaluation
+        """
+        for plan in [plan for plan in self.plans if job.run in plan.runs() and plan.is_done()]:
+            self.plans.remove(plan)
+            self.tasks.start('plan' + plan.runID, 'Evaluating ' + plan.kind, plan.finish,
+                             done=partial(self.show_Plan, plan), failed=self.show_TaskError, withProgress=False)
+
+    def show_Plan(self, plan, summary):
+        """shows the evaluation of a finished plan
+        """
+        self.planWindows.append(GUI_Plans.PlanView(plan, self.tasks))
+
+    def open_Limits(self):
+        """opens the dialog of the run limits
+        """
+        self.limitsWin = GUI_Limits.LimitsDialog(self.runLimits)
+        self.limitsWin.limitsChanged.connect(self.set_Limits)
+
+    def set_Limits(self, limits):
+        """uses and saves the limits for the following runs
+        """
+        self.runLimits = limits
+        try:
+            Core_Limits.save_limits(os.path.join(os.getcwd(), Core_Limits.LIMITS_FILE), limits)
+        except OSError as e:
+            QMessageBox.about(self, "Error: Limits not saved.", str(e))
+
+    def open_History(self):
+        """opens the browser of the run history
+        """
+        if self.dirHap == '':
+            QMessageBox.about(self, "Error: No directory.", "Please set Hapl-o-Mat directory!")
+            return
+        self.historyWin = GUI_History.HistoryWindow(self.pathHapDir)
+        self.historyWin.runSelected.connect(self.show_HistoryRun)
+
+    def show_HistoryRun(self, entry):
+        """displays a run of the history; statistics are taken from the history, not from the result files
+        """
+        if self.signalBusy == 1:
+            QMessageBox.about(self, "Hapl-o-Mat running.", "Past runs can be shown when the current run has finished.")
+            return
+        if entry['state'] == 'killed':
+            QMessageBox.about(self, "Run killed.", "Run " + entry['runID'] + " was killed: " + (entry['killReason'] or 'unknown reason') + ".")
+            return
+        if entry['state'] != 'finished' or not os.path.isfile(entry['files']['FILENAME_HAPLOTYPEFREQUENCIES']):
+            QMessageBox.about(self, "Error: No results.", "The result files of run " + entry['runID'] + " are not available.")
+            return
+        self.run = Core_Run.HaplomatRun(self.pathHapDir, entry['parameters'], entry['inputFormat'], entry['log'])
+        self.epsTail = self.run.epsTail
+        self.nameLog = entry['log']
+        self.show_Log(self.nameLog)
+        self.labLog.setText('Log file saved as ' + self.nameLog)
+        self.tableTopHTF.clear()
+        self.plot1.clear()
+        self.plot2.clear()
+        self.labStatEps.clear()
+        self.labStatSum.clear()
+        self.StatsFrame2.show()
+        self.htfnr = entry['haplotypes']
+        self.htfRes = None
+        self.epsNr = 0
+        self.tasks.start('results', 'Reading results', Core_Results.load_htf, entry['files']['FILENAME_HAPLOTYPEFREQUENCIES'],
+                         done=self.keep_Result, failed=self.show_TaskError)
+        self.labStatRes.setText(str(self.htfnr))
+        if entry['coverage']:
+            self.labStatCov.setText(' / '.join(str(entry['coverage'][str(i)]) for i in Core_Results.COVERAGE_LEVELS))
+        self.labStatGT.setText(str(entry['genotypes']))
+        self.procOK = 1
+        self.signalBusy = 2
+        if entry['genotypes']:
+            self.labStatSum.setText(str(entry['sumCut']))
+            self.labStatEps.setText('{:.3e}'.format(entry['epsilon2n']))
+            self.epsNr = entry['haplotypesAboveEpsilon2n']
+            self.radioBtn_State()
+        self.statusBar().showMessage('Run ' + entry['runID'] + ' of ' + time.ctime(entry['startTime']) + ' reopened.')
+
+    def keep_Result(self, result):
+        """keeps the haplotype frequencies of a reopened run, needed by display_Cum
+        """
+        self.htfRes = result
+        if self.signalBusy == 2 and self.radioButton4.isChecked():
+            self.display_Cum()
+
+    def show_Job(self, job):
+        """displays the results of a finished job of the queue
+        """
+        if self.signalBusy == 1:
+            QMessageBox.about(self, "Hapl-o-Mat running.", "Results of queued runs can be shown when the current run has finished.")
+            return
+        self.run = job.run
+        self.epsTail = job.run.epsTail
+        self.nameLog = job.run.pathLog
+        self.show_Log(self.nameLog)
+        self.labLog.setText('Log file saved as ' + self.nameLog)
+        self.tableTopHTF.clear()
+        self.plot1.clear()
+        self.plot2.clear()
+        self.procOK = 1
+        self.signalBusy = 2
+        self.make_Stats(job.run.exitCode, job.run.exitStatus)
+
+    def show_TaskError(self, error):
+        """reports a failed background task
+        """
+        QMessageBox.about(self, "Error", str(error))
+
+    def show_Log(self, pathLog):
+        """reads a log file in the background and shows it in the run output
+        """
+        self.labOutputRun.clear()
+        if os.path.isfile(pathLog):
+            self.tasks.start('log', 'Reading log file', read_Text, pathLog,
+                             done=self.labOutputRun.setPlainText, withProgress=False)
+
+    def poll_Haplomat(self):
+        """checks whether the running Hapl-o-Mat process has finished
+        """
+        if self.run.poll() is not None:
+            self.runTimer.stop()
+            self.status_Haplomat(self.run.exitCode, self.run.exitStatus)
+
+    def kill_Haplomat(self):
+        """aborts the running Hapl-o-Mat process
+        """
+        if self.run is not None:
+            self.run.kill()
+
+    def pause_Haplomat(self):
+        """pauses the running Hapl-o-Mat process or resumes the paused one
+        """
+        if self.run is None or self.signalBusy != 1:
+            return
+        if self.run.paused:
+            if self.run.resume():
+                self.btnPauseHaplomat.setText("Pause")
+                self.statusBar().showMessage('Hapl-o-Mat running ...')
+        elif self.run.pause():
+            self.btnPauseHaplomat.setText("Resume")
+            self.statusBar().showMessage('Hapl-o-Mat paused.')
+            self.mark_Pauses()
             
     def status_Haplomat(self, exitCode, exitStatus):
         """processes status output of Hapl-o_Mat process
         """
-        if platform.system() == "Windows":
-            os.chdir(self.currDir_US)        #Win special [05.10.2020]
         self.signalBusy = 2
-        self.timer.stop()
-        self.statusBar().showMessage('Ready.')
+        self.stop_EpsilonFollower()
+        self.btnPauseHaplomat.setText("Pause")
+        if self.run.cached:
+            self.statusBar().showMessage('Ready. Result restored from cache.')
+        elif self.run.killReason is not None:
+            self.statusBar().showMessage('Ready. Run killed: ' + self.run.killReason + '.')
+        else:
+            self.statusBar().showMessage('Ready.')
         infoLog = 'Log file saved as ' + self.nameLog
-        datetime = QDateTime.currentDateTime()
+        if self.run.killReason is not None:
+            infoLog = 'Killed: ' + self.run.killReason + '. ' + infoLog
+        elif self.run.error is not None:
+            infoLog = 'Error: ' + self.run.error + '. ' + infoLog
         if exitStatus == 0 and exitCode == 0:         # Status 0: regularly finished        
-            self.labOutputRun.append('\nFinished!\n'+ datetime.toString())
             self.procOK = 1
-        elif exitStatus == 1:       # Status 1: process killed          
-            self.labOutputRun.append('\nCancelled!\n' + datetime.toString()) 
-        elif exitCode != 0:
-            self.labOutputRun.append('\nError!\n' + datetime.toString())    
-        #Log
-        outputLog = self.labOutputRun.toPlainText()
-        self.logFile.write(outputLog)
-        self.logFile.close()
+        #Log (streamed to disk while running, status written by the run)
+        self.consoleRun.close()
         self.labLog.setText(infoLog)
         self.make_Stats(exitCode, exitStatus)
+        if self.run.error is not None:      # the run is staged in its own thread, errors arrive here
+            QMessageBox.about(self, "Error: Hapl-o-Mat run failed.", self.run.error)
             
     def toggle_Rb1(self):
         """radio button toggle after return pressed action
@@ -879,6 +1254,16 @@ class MainW(QMainWindow):
         self.rb4EntryCheck()        
         self.display_Cum()
         
+    def goto_Rank(self):
+        """scrolls the haplotype table to the rank entered
+        """
+        try:
+            rank = int(self.textEdit_Rank.text())
+        except ValueError:
+            return
+        if not self.tableTopHTF.scroll_to_rank(rank):
+            self.statusBar().showMessage('Rank ' + str(rank) + ' is not displayed.')
+
     def radioBtn_State(self):
         """processes check status of radio button choice for result display
         """ 
@@ -953,181 +1338,180 @@ class MainW(QMainWindow):
             else:
                 self.plot2.setLogMode(False, False)
                 
+    def get_ResultPaths(self):
+        """reads the result file names of the current run from its parameter file
+        """
+        if self.run is not None:
+            return dict((key, self.run.result_path(key)) for key in Core_Params.OUTPUT_KEYS)
+        params = Core_Params.read_parameters(os.path.join(self.pathHapDir, "parameters" + self.inpForm))
+        return dict((key, os.path.join("..", params[key].strip())) for key in Core_Params.OUTPUT_KEYS)
+
     def make_Stats(self,  exitCode, exitStatus):
+        self.htfRes = None
+        self.epsNr = 0
         self.labStatRes.clear()
         self.labStatGT.clear()
         self.labStatEps.clear()
         self.labStatSum.clear()
+        self.labStatCov.clear()
         self.StatsFrame2.show()
         if self.procOK == 1:       # Status 1: process terminated without errors   
-            if self.inpForm == 'MAC':
-                paraFile = os.path.join(self.pathHapDir,"parametersMAC")
-            elif self.inpForm == 'GLSC':
-                paraFile = os.path.join(self.pathHapDir,"parametersGLSC")
-            # number of ht; cumulated frequency hash
-            f = open(paraFile, 'r')
-            for line in f:
-                row = line.split('=')
-                if (row[0] == 'FILENAME_HAPLOTYPEFREQUENCIES'): # htf file
-                    pathHTF = os.path.join("..", str(row[1]).strip())
-                else:
-                    continue
-            fHTF = open(pathHTF, 'r')
-            self.htfnr = 0
-            freqSum = 0
-            self.cumList = []
-            for line in fHTF:            
-                self.htfnr += 1
-                raw = line.strip()
-                freq = float(raw.split('\t')[1])
-                freqSum = freqSum + freq
-                self.cumList.append(freqSum)
-            fHTF.close()
-            self.labStatRes.setText(str(self.htfnr))              
-            # read LOG-file
-            log = open(self.nameLog, 'r')
-            for line in log:
-                if 'Leftover genotypes' in line:
-                    raw = line.strip()
-                    gtnr = raw.split(': ')[1]
-                elif 'Sum cutted haplotype frequencies' in line:
-                    raw = line.strip()
-                    sumHT = raw.split(': ')[1]
-            self.labStatGT.setText(str(gtnr))
-            if int(gtnr) > 0:                  
-                self.labStatSum.setText(str(sumHT))
-                epsStat = 1/(2*int(gtnr))
-                epsStatForm ='{:.3e}'.format(epsStat)
-                self.labStatEps.setText(str(epsStatForm))
-                
-                # ht with htf >= epsilon or 
-                fHTF = open(pathHTF, 'r')
-                self.epsNr = 0
-                for line in fHTF:
-                    raw = line.strip()
-                    freq = float(raw.split('\t')[1])
-                    if freq >= epsStat:
-                        self.epsNr += 1
-                fHTF.close()
-                self.radioBtn_State()
-            else:
-                self.labOutputRun.append('\nNo genotypes evaluated.!\n')
+            # number of ht; cumulated frequencies (parsed once in the background, cached)
+            pathHTF = self.get_ResultPaths()['FILENAME_HAPLOTYPEFREQUENCIES']
+            self.tasks.start('results', 'Reading results', load_Stats, pathHTF, self.nameLog,
+                             done=self.show_Stats, failed=self.show_TaskError)
 
-                
+    def show_Stats(self, stats):
+        """displays the statistics of the result files loaded by make_Stats
+        """
+        self.htfRes, gtnr, sumHT = stats
+        self.htfnr = len(self.htfRes)
+        self.labStatRes.setText(str(self.htfnr))              
+        self.labStatCov.setText(' / '.join(str(i) for i in self.htfRes.coverage()))
+        self.labStatGT.setText(str(gtnr))
+        if int(gtnr) > 0:                  
+            self.labStatSum.setText(str(sumHT))
+            epsStat = 1/(2*int(gtnr))
+            epsStatForm ='{:.3e}'.format(epsStat)
+            self.labStatEps.setText(str(epsStatForm))
+            
+            # ht with htf >= epsilon
+            self.epsNr = self.htfRes.count_at_least(epsStat)
+            self.radioBtn_State()
+        else:
+            self.labOutputRun.append('\nNo genotypes evaluated.!\n')
+
+            
     def display_Results(self):
         """induces the display of the results of the finished Hapl-o-Mat run
         """
         if (self.signalBusy != 2):
-            self.labTopHTF.clear()
+            self.tableTopHTF.clear()
             self.plot1.clear()
             self.plot2.clear()
+            self.plot3.clear()
         else:
-            self.labTopHTF.clear()
+            self.tableTopHTF.clear()
             maxLine = int(self.textEdit_TopX.text())
-            if self.inpForm == 'MAC':
-                paraFile = os.path.join(self.pathHapDir,"parametersMAC")
-            elif self.inpForm == 'GLSC':
-                paraFile = os.path.join(self.pathHapDir,"parametersGLSC")
-            f = open(paraFile, 'r')
-            #open and display HTF file
-            for line in f:
-                row = line.split('=')
-                if (row[0] == 'FILENAME_HAPLOTYPEFREQUENCIES'): # htf file
-                    pathHTF = os.path.join("..", str(row[1]).strip())
-                elif(row[0] == 'FILENAME_EPSILON_LOGL'): #Epsilon file
-                    pathEpsilon = os.path.join("..", str(row[1]).strip())
-                else:
-                    continue
-            fHTF = open(pathHTF, 'r')
-            self.htfnr = 0
-            for line in fHTF:
-                if (self.htfnr < maxLine):
-                    raw = line.strip()
-                    self.labTopHTF.append(raw)
-                self.htfnr += 1
-            fHTF.close()
-                    
-            # plot1 - htf
-            self.plot1.clear()
-            freqList = []
-            nameList = []
-            indexList = []
-            tempFile = open('tempHTF.txt', 'w')
-            txt = self.labTopHTF.toPlainText()
-            tempFile.write(txt)
-            tempFile.close()
-            t = open('tempHTF.txt', 'r')
-            linr = 0
-            for line in t:
-                if (linr < maxLine):
-                    sp = line.split('\t')
-                    freq = sp[1].strip()
-                    freqList.append(freq)
-                    nameList.append(sp[0])
-                    indexList.append(linr + 1)
-                linr += 1
-            freqListN = np.asarray(freqList).astype(np.float32)
-            xra = np.arange(1, len(freqListN)+1)
-            self.plot1.plot(x=xra, y=freqListN, pen=None, symbolBrush=(255,0,0), symbolPen='w', symbolSize=6)
-            vb1 = self.plot1.getPlotItem()
-            vb1.enableAutoRange(axis='x', enable=True)
-            vb1.enableAutoRange(axis='y', enable=True)
-            
-            #open and display Epsilon file
-            epsList = []
-            self.plot2.clear()
-            fEps = open(pathEpsilon, 'r')
-            for line in fEps:
-                raw = line.strip()
-                sp = raw.split('\t')
-                epsList.append(sp[0])
-            fEps.close()
-            zEps = len(epsList)
-            xrae = np.arange(1, zEps+1)
-            # plot2
-            epsListN = np.asarray(epsList).astype(np.float32)
-            self.plot2.plot(x=xrae, y=epsListN, symbol='+', symbolBrush=(255,0,0), symbolPen='w', symbolSize=5)
-            vb2 = self.plot2.getPlotItem()
-            vb2.enableAutoRange(axis='x', enable=True)
-            vb2.enableAutoRange(axis='y', enable=True)
-            t.close()       #Win special [05.10.2020]
-            os.remove("tempHTF.txt")
-            
+            paths = self.get_ResultPaths()
+            # HTF from cached result and epsilon file, read in the background
+            self.tasks.start('display', 'Reading results', load_Display, paths['FILENAME_HAPLOTYPEFREQUENCIES'],
+                             os.path.abspath(paths['FILENAME_EPSILON_LOGL']), self.resource_Path(),
+                             done=partial(self.show_Results, maxLine), failed=self.show_TaskError)
+
+    def show_Results(self, maxLine, loaded):
+        """displays table and plots of the results loaded by display_Results
+        """
+        self.htfRes, self.epsTail, self.resSeries = loaded
+        self.htfnr = len(self.htfRes)
+        self.tableTopHTF.set_result(self.htfRes, maxLine)
+                
+        # plot1 - htf
+        self.plot1.clear()
+        names, freqs = self.htfRes.top(maxLine)
+        xra = np.arange(1, len(freqs)+1)
+        self.plot1.plot(x=xra, y=freqs, pen=None, symbolBrush=(255,0,0), symbolPen='w', symbolSize=6)
+        vb1 = self.plot1.getPlotItem()
+        vb1.enableAutoRange(axis='x', enable=True)
+        vb1.enableAutoRange(axis='y', enable=True)
+        
+        #display Epsilon file
+        self.plot2.clear()
+        self.epsCurve = self.plot2.plot(x=self.epsTail.iterations(), y=self.epsTail.epsilon, symbol='+', symbolBrush=(255,0,0), symbolPen='w', symbolSize=5)
+        vb2 = self.plot2.getPlotItem()
+        vb2.enableAutoRange(axis='x', enable=True)
+        vb2.enableAutoRange(axis='y', enable=True)
+        self.mark_Pauses()
+        self.display_Resources()
+        
+    def resource_Path(self):
+        """resource time series of the displayed run (saved next to its log file)
+        """
+        if self.run is not None:
+            return self.run.resource_path()
+        return os.path.join(os.path.dirname(self.nameLog), self.runIdIn + 'resources.dat')
+
+    def start_EpsilonFollower(self):
+        """starts the real time epsilon display: one persistent plot curve, updated on
+        file change notification and by a fast fallback poll
+        """
+        self.plot2.clear()
+        self.epsCurve = self.plot2.plot(x=[], y=[], symbol='+', symbolBrush=(255,0,0), symbolPen='w', symbolSize=5)
+        vb2 = self.plot2.getPlotItem()
+        vb2.enableAutoRange(axis='x', enable=True)
+        vb2.enableAutoRange(axis='y', enable=True)
+        self.epsWatcher = QFileSystemWatcher()
+        self.epsWatcher.addPath(os.path.dirname(self.epsTail.path))
+        self.epsWatcher.directoryChanged.connect(self.watch_EpsilonFile)
+        self.epsWatcher.fileChanged.connect(self.display_Epsilon)
+        self.timer = QTimer()
+        self.timer.setInterval(500)
+        self.timer.timeout.connect(self.display_Epsilon)
+        self.timer.start()
+
+    def stop_EpsilonFollower(self):
+        """stops the real time epsilon display and reads the remaining values
+        """
+        self.timer.stop()
+        self.epsWatcher.deleteLater()
+        self.epsTail.poll(final=True)
+        self.epsCurve.setData(x=self.epsTail.iterations(), y=self.epsTail.epsilon)
+        self.mark_Pauses()
+
+    def watch_EpsilonFile(self, path):
+        """adds the epsilon file to the file watcher as soon as Hapl-o-Mat has created it
+        """
+        if os.path.isfile(self.epsTail.path) and self.epsTail.path not in self.epsWatcher.files():
+            self.epsWatcher.addPath(self.epsTail.path)
+        self.display_Epsilon()
+
     def display_Epsilon(self):
-        """induces the real time display of epsilon of the running Hapl-o-Mat
+        """induces the real time display of epsilon of the running Hapl-o-Mat;
+        only lines appended since the last call are read
         """
         if (self.signalBusy != 0):
-            if platform.system() == "Windows":
-                os.chdir(self.currDir_US)       #Win special [05.10.2020]
-            epsList = []
-            self.plot2.clear()
-            if self.inpForm == 'MAC':
-                paraFile = os.path.join(self.pathHapDir,"parametersMAC")
-            elif self.inpForm == 'GLSC':
-                paraFile = os.path.join(self.pathHapDir,"parametersGLSC")
-            f = open(paraFile, 'r')
-            #htf file
-            for line in f:
-                row = line.split('=')
-                if(row[0] == 'FILENAME_EPSILON_LOGL'): #Epsilon file
-                    pathEpsilon = os.path.join("..", str(row[1]).strip())
-                else:
-                    continue        
-            if(os.path.isfile(pathEpsilon)):
-                fEps = open(pathEpsilon, 'r')
-                for line in fEps:
-                    raw = line.strip()
-                    sp = raw.split('\t')
-                    epsList.append(sp[0])
-                fEps.close()
-                zEps = len(epsList)
-                xrae = np.arange(1, zEps+1)
-                # plot2
-                epsListN = np.asarray(epsList).astype(np.float32)
-                self.plot2.plot(x=xrae, y=epsListN, symbol='+', symbolBrush=(255,0,0), symbolPen='w', symbolSize=5)
-                vb2 = self.plot2.getPlotItem()
-                vb2.enableAutoRange(axis='x', enable=True)
-                vb2.enableAutoRange(axis='y', enable=True)
+            if self.epsTail.poll() > 0:
+                self.epsCurve.setData(x=self.epsTail.iterations(), y=self.epsTail.epsilon)
+            if self.signalBusy == 1:
+                self.display_Resources()
+
+    def display_Resources(self):
+        """plots memory, CPU load or I/O of the resource series of the current run
+        """
+        values = self.resSeries.snapshot()
+        choice = self.comboPlot3.currentText()
+        self.plot3.clear()
+        t = values[:, 0]
+        if choice == 'Memory':
+            self.plot3.setLabel('left', 'Memory (MB)')
+            curves = [('RSS', t, values[:, 1]/2**20), ('Peak RSS', t, values[:, 2]/2**20)]
+        elif choice == 'CPU':
+            # load between two samples; 100% = one core
+            self.plot3.setLabel('left', 'CPU (%)')
+            dt = np.diff(t)
+            load = np.divide(100*np.diff(values[:, 3]), dt, out=np.zeros(len(dt)), where=dt > 0)
+            curves = [('CPU', t[1:], load)]
+        else:
+            self.plot3.setLabel('left', 'I/O (MB)')
+            curves = [('Read', t, values[:, 4]/2**20), ('Written', t, values[:, 5]/2**20)]
+        for i, (name, x, y) in enumerate(curves):
+            self.plot3.plot(x=x, y=y, pen=pg.mkPen(('r', 'b')[i], width=2), name=name)
+        # intervals in which the run was paused
+        for start, end in self.resSeries.stopped_intervals():
+            self.plot3.addItem(pg.LinearRegionItem(values=(start, end), movable=False, brush=(255, 200, 0, 60)))
+
+    def mark_Pauses(self):
+        """marks the last iteration before each pause of the displayed run in the epsilon plot
+        """
+        if self.pauseCurve is not None:
+            self.plot2.removeItem(self.pauseCurve)
+            self.pauseCurve = None
+        if self.run is None:
+            return
+        rows = [nIter-1 for start, end, nIter in self.run.suspended if 0 < nIter <= len(self.epsTail)]
+        if rows:
+            self.pauseCurve = self.plot2.plot(x=self.epsTail.iterations()[rows], y=self.epsTail.epsilon[rows],
+                                              pen=None, symbol='t', symbolBrush=(255,200,0), symbolPen='k', symbolSize=12)
 
     def display_All(self):
         """induces display of all htf
@@ -1147,20 +1531,53 @@ class MainW(QMainWindow):
         """induces display of ht with cululated sum <= given percentage
         """
         if (self.signalBusy == 2):
+            if self.htfRes is None:
+                self.statusBar().showMessage('Results are still being read.')
+                return
             cumFreq = float(self.textEdit_Cum.text())
-            for i in self.cumList:
-                cc = float(i)
-                hit = 0
-                if (cc > cumFreq):
-                    cumNr = self.cumList.index(cc)
-                    hit = 1
-                    break  
-            if (hit == 0):
-                cumNr = len(self.cumList)
+            cumNr = self.htfRes.count_cum_at_most(cumFreq)
             self.textEdit_TopX.setText(str(cumNr))
             self.display_Results()
 
 
+# functions run as background tasks
+
+def load_Stats(pathHTF, pathLog, progress=None):
+    """haplotype frequencies and log statistics of a finished run
+    """
+    result = Core_Results.load_htf(pathHTF, progress=progress)
+    gtnr, sumHT = Core_Results.read_log_stats(pathLog)
+    return result, gtnr, sumHT
+
+def load_Display(pathHTF, pathEpsilon, pathResources, progress=None):
+    """haplotype frequencies, epsilon values and resource series shown in the results frame
+    """
+    return (Core_Results.load_htf(pathHTF, progress=progress), Core_Epsilon.read_epsilon(pathEpsilon),
+            Core_Telemetry.read_resources(pathResources))
+
+def submit_Supervised(dirHap, request, listener):
+    """hands a run over to the run supervisor (started if needed), returns the SupervisedRun following it
+    """
+    client = Core_Supervisor.start_supervisor(dirHap)
+    jobId = client.submit(**request)
+    return Core_Supervisor.SupervisedRun(client, client.call('job', jobId=jobId), listener)
+
+def find_Supervised(dirHap):
+    """client and job entry of the latest active run of the GUI at the run supervisor, None if there is none
+    """
+    client = Core_Supervisor.SupervisorClient(dirHap)
+    try:
+        entries = client.call('jobs', tag='gui')
+    except (OSError, ValueError, Core_Supervisor.SupervisorError):     # no supervisor running
+        return None
+    entries = [entry for entry in entries if entry['state'] not in Core_Supervisor.ENDED_STATES]
+    return (client, entries[-1]) if entries else None
+
+def read_Text(path):
+    with open(path, 'r', encoding='UTF-8', errors='replace') as fText:
+        return fText.read()
+
+
 # make QSplitter handle visible            
 class Handle(QWidget):
     def paintEvent(self, e=None):